@@ -37,3 +37,12 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def temp_media_root(settings, tmp_path):
+    # загрузки и миниатюры из тестов не должны попадать в yatube/media
+    settings.MEDIA_ROOT = str(tmp_path)
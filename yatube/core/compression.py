@@ -0,0 +1,106 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'application/atom+xml',
+    'application/rss+xml',
+    'image/svg+xml',
+)
+SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+MIN_SIZE = getattr(settings, 'COMPRESSION_MIN_SIZE', 200)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q=([^\s;,]*))?')
+# Вес по RFC 7231: от 0 до 1, не больше трёх знаков после точки.
+QVALUE_RE = re.compile(r'0(\.[0-9]{0,3})?|1(\.0{0,3})?')
+
+
+def is_compressible(content_type):
+    content_type = content_type.split(';')[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def quality(value):
+    """Вес кодировки; нераспознанный вес считается нулевым."""
+    if value is None:
+        return 1.0
+    if not QVALUE_RE.fullmatch(value):
+        return 0.0
+    return float(value)
+
+
+def accepted_encodings(request):
+    """Возвращает поддерживаемые кодировки в порядке предпочтения: по
+    убыванию веса, при равном весе br раньше gzip."""
+    weights = {}
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for coding in header.split(','):
+        match = ACCEPT_ENCODING_RE.match(coding)
+        if match:
+            weights[match.group(1).lower()] = quality(match.group(2))
+    return sorted((
+        encoding for encoding in SUFFIXES
+        if weights.get(encoding) and (encoding != 'br' or brotli)
+    ), key=lambda encoding: -weights[encoding])
+
+
+def compress(data, encoding, best=False):
+    if encoding == 'br':
+        return brotli.compress(
+            data, quality=11 if best else BROTLI_QUALITY
+        )
+    return gzip.compress(data, compresslevel=9 if best else GZIP_LEVEL)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    yield from compress_sequence(chunks)
+
+
+def precompress_file(path):
+    """Сохраняет рядом с файлом сжатые копии .gz и .br, если они меньше."""
+    content_type, encoding = mimetypes.guess_type(path)
+    if encoding or not content_type or not is_compressible(content_type):
+        return []
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < MIN_SIZE:
+        return []
+    created = []
+    for encoding, suffix in SUFFIXES.items():
+        if encoding == 'br' and brotli is None:
+            continue
+        compressed = compress(data, encoding, best=True)
+        if len(compressed) >= len(data):
+            continue
+        with open(path + suffix, 'wb') as target:
+            target.write(compressed)
+        stat = os.stat(path)
+        os.utime(path + suffix, (stat.st_atime, stat.st_mtime))
+        created.append(path + suffix)
+    return created
@@ -0,0 +1,10 @@
+from notifications.inbox import unread_count
+
+
+def unread_notifications(request):
+    """Добавляет число непрочитанных уведомлений пользователя."""
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': unread_count(request.user.id),
+    }
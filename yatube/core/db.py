@@ -0,0 +1,58 @@
+from django.db import connections, models
+from django.db.models.deletion import get_candidate_relations_to_delete
+
+# Столько id подставляется в один DELETE ... WHERE IN.
+DELETE_BATCH = 500
+RAW_ON_DELETE = (models.CASCADE, models.SET_NULL, models.DO_NOTHING)
+
+
+def delete_rows(model, pks, using):
+    """Удаляет строки модели по первичным ключам прямыми DELETE и
+    возвращает их число."""
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), DELETE_BATCH):
+            batch = pks[start:start + DELETE_BATCH]
+            cursor.execute(
+                'DELETE FROM %s WHERE %s IN (%s)' % (
+                    quote_name(model._meta.db_table),
+                    quote_name(model._meta.pk.column),
+                    ', '.join(['%s'] * len(batch)),
+                ),
+                batch,
+            )
+            deleted += cursor.rowcount
+    return deleted
+
+
+def raw_delete(queryset):
+    """Удаляет строки queryset вместе с зависимыми строками прямыми
+    DELETE, не загружая объекты в память.
+
+    CASCADE обрабатывается рекурсивно, SET_NULL — одним UPDATE,
+    DO_NOTHING — пропуском. Если на модель ссылаются с другим on_delete
+    (PROTECT, SET_DEFAULT, SET(...)), удаление целиком уходит в обычный
+    QuerySet.delete() с Collector. Сигналы pre_delete/post_delete при
+    прямом удалении не отправляются, поэтому кэши и производные данные
+    вызывающий код сбрасывает сам.
+    """
+    model = queryset.model
+    using = queryset.db
+    relations = list(get_candidate_relations_to_delete(model._meta))
+    if any(relation.on_delete not in RAW_ON_DELETE
+           for relation in relations):
+        return queryset.delete()[0]
+    pks = list(queryset.values_list('pk', flat=True))
+    if not pks:
+        return 0
+    for relation in relations:
+        related = relation.related_model._base_manager.using(using).filter(
+            **{f'{relation.field.name}__in': pks}
+        )
+        if relation.on_delete is models.CASCADE:
+            raw_delete(related)
+        elif relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+    return delete_rows(model, pks, using)
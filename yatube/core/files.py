@@ -0,0 +1,145 @@
+import mimetypes
+import os
+import re
+
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified)
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.static import was_modified_since
+
+from .compression import SUFFIXES, accepted_encodings, is_compressible
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Файл, чтение которого ограничено диапазоном [start, end]."""
+
+    def __init__(self, file, start, end):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = end - start + 1
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Разбирает одиночный диапазон Range; None, если его нет или он
+    не поддерживается, и False, если он вне файла."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def range_allowed(request, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    date = parse_http_date_safe(if_range)
+    return date is not None and int(mtime) <= date
+
+
+def choose_variant(request, fullpath):
+    """Возвращает путь к лучшей принимаемой клиентом сжатой копии."""
+    for accepted in accepted_encodings(request):
+        if os.path.isfile(fullpath + SUFFIXES[accepted]):
+            return fullpath + SUFFIXES[accepted], accepted
+    return fullpath, None
+
+
+def ranged_response(request, path, mtime):
+    size = os.path.getsize(path)
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and range_allowed(request, mtime):
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range is None:
+        return FileResponse(open(path, 'rb'))
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    start, end = byte_range
+    response = FileResponse(
+        RangeFile(open(path, 'rb'), start, end), status=206
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+def not_modified(request, stat):
+    return not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'),
+        stat.st_mtime,
+        stat.st_size,
+    )
+
+
+def serve_file(request, fullpath, cache_control=None):
+    """Отдаёт файл с Last-Modified, Range и заранее сжатыми копиями.
+
+    Содержимое передаётся через FileResponse, поэтому WSGI-сервер с
+    wsgi.file_wrapper отправляет файл через sendfile.
+    """
+    if not os.path.isfile(fullpath):
+        raise Http404
+    stat = os.stat(fullpath)
+    if not_modified(request, stat):
+        return HttpResponseNotModified()
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    compressible = not encoding and is_compressible(content_type)
+    variant, content_encoding = fullpath, encoding
+    if compressible:
+        variant, content_encoding = choose_variant(request, fullpath)
+    response = ranged_response(request, variant, stat.st_mtime)
+    response['Content-Type'] = content_type
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    if compressible:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    return response
+
+
+def offload_file(request, fullpath, header, value, cache_control=None):
+    """Поручает отправку файла фронтенд-прокси заголовком X-Accel-Redirect
+    или X-Sendfile; Range прокси обрабатывает сам."""
+    if not os.path.isfile(fullpath):
+        raise Http404
+    stat = os.stat(fullpath)
+    if not_modified(request, stat):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(fullpath)
+    response = HttpResponse(
+        content_type=content_type or 'application/octet-stream'
+    )
+    response[header] = value
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    return response
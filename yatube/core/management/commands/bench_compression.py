@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core.compression import brotli, compress
+
+DEFAULT_URLS = ('/', '/?page=2')
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает объём и время сжатия типичных страниц ленты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', default=DEFAULT_URLS)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        client = Client()
+        encodings = ['gzip'] + (['br'] if brotli else [])
+        self.stdout.write(
+            f'{"url":<30} {"encoding":<8} {"bytes":>9} {"ratio":>6} '
+            f'{"cpu, ms":>8}'
+        )
+        for url in options['urls']:
+            response = client.get(url)
+            content = response.content
+            self.stdout.write(
+                f'{url:<30} {"identity":<8} {len(content):>9} '
+                f'{1:>6.2f} {0:>8.3f}'
+            )
+            for encoding in encodings:
+                started = time.process_time()
+                for _ in range(options['repeat']):
+                    compressed = compress(content, encoding)
+                elapsed = time.process_time() - started
+                self.stdout.write(
+                    f'{url:<30} {encoding:<8} {len(compressed):>9} '
+                    f'{len(content) / len(compressed):>6.2f} '
+                    f'{elapsed * 1000 / options["repeat"]:>8.3f}'
+                )
@@ -0,0 +1,48 @@
+import re
+
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .compression import (MIN_SIZE, accepted_encodings, compress,
+                          compress_stream, is_compressible)
+
+STRONG_ETAG_RE = re.compile(r'^"')
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает текстовые ответы в brotli или gzip по Accept-Encoding.
+
+    Поток text/event-stream не сжимается: сжатие буферизует события.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (
+            response.has_header('Content-Encoding')
+            or response.has_header('Content-Range')
+            or not is_compressible(content_type)
+            or content_type.startswith('text/event-stream')
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encodings = accepted_encodings(request)
+        if not encodings:
+            return response
+        encoding = encodings[0]
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            if len(response.content) < MIN_SIZE:
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        if response.has_header('ETag'):
+            response['ETag'] = STRONG_ETAG_RE.sub('W/"', response['ETag'])
+        response['Content-Encoding'] = encoding
+        return response
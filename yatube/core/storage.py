@@ -0,0 +1,50 @@
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                StaticFilesStorage)
+
+from .compression import precompress_file
+
+
+class PrecompressMixin:
+    """Создаёт при collectstatic сжатые копии .gz и .br статики."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set(paths)
+        parent = getattr(super(), 'post_process', None)
+        if parent is not None:
+            for name, hashed_name, processed in parent(
+                paths, dry_run, **options
+            ):
+                if isinstance(hashed_name, str):
+                    names.add(hashed_name)
+                yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(names):
+            if self.exists(name):
+                precompress_file(self.path(name))
+
+
+class CompressedStaticFilesStorage(PrecompressMixin, StaticFilesStorage):
+    pass
+
+
+class CompressedManifestStaticFilesStorage(
+    PrecompressMixin, ManifestStaticFilesStorage
+):
+    """Статика с хешем содержимого в имени и сжатыми копиями.
+
+    Пока collectstatic не запускался, файлы отдаются под исходными
+    именами вместо ошибки об отсутствии записи в манифесте.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def is_hashed(self, name):
+        if not hasattr(self, '_hashed_names'):
+            self._hashed_names = set(self.hashed_files.values())
+        return name in self._hashed_names
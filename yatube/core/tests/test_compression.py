@@ -0,0 +1,84 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.test import (Client, RequestFactory, TestCase,
+                         override_settings)
+from django.urls import reverse
+
+from ..compression import accepted_encodings, precompress_file
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp()
+STYLE = b'body { color: black; }\n' * 100
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_STATIC_ROOT, 'css'), exist_ok=True)
+        cls.style = os.path.join(TEMP_STATIC_ROOT, 'css', 'style.css')
+        with open(cls.style, 'wb') as style:
+            style.write(STYLE)
+        precompress_file(cls.style)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_dynamic_response_compressed(self):
+        """HTML-страница сжимается, если клиент принимает gzip."""
+        response = self.guest_client.get(
+            reverse('about:author'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('<html', gzip.decompress(response.content).decode())
+
+    def test_dynamic_response_identity(self):
+        """Без Accept-Encoding ответ не сжимается."""
+        response = self.guest_client.get(reverse('about:author'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_malformed_quality(self):
+        """Нераспознанный вес отбрасывает кодировку, а не роняет ответ."""
+        for header in ('gzip;q=.', 'gzip;q=1.2.3', 'gzip;q=x, br;q=1.5'):
+            response = self.guest_client.get(
+                reverse('about:author'), HTTP_ACCEPT_ENCODING=header
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_encodings_ordered_by_quality(self):
+        """Кодировки идут по убыванию веса, с нулевым весом пропускаются."""
+        cases = {
+            'gzip, br': ['br', 'gzip'],
+            'br;q=0.5, gzip': ['gzip', 'br'],
+            'br;q=0, gzip;q=0.1': ['gzip'],
+            'identity': [],
+        }
+        factory = RequestFactory()
+        for header, expected in cases.items():
+            request = factory.get('/', HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(accepted_encodings(request), expected)
+
+    def test_precompressed_static(self):
+        """Статика отдаётся заранее сжатой копией с Vary."""
+        self.assertTrue(os.path.isfile(self.style + '.gz'))
+        response = self.guest_client.get(
+            '/static/css/style.css', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        content = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(content), STYLE)
+        response = self.guest_client.get('/static/css/style.css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), STYLE)
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.test import TestCase
+
+from posts.models import Comment, Group, Post
+
+from .. import db
+
+User = get_user_model()
+
+
+class RawDeleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.post = Post.objects.create(
+            text='Текст', author=cls.user, group=cls.group
+        )
+        Comment.objects.create(text='Комментарий', author=cls.user,
+                               post=cls.post)
+
+    def test_cascade_and_set_null(self):
+        """CASCADE удаляет зависимые строки, SET_NULL обнуляет ссылку."""
+        self.assertEqual(db.raw_delete(Group.objects.all()), 1)
+        self.assertIsNone(Post.objects.get().group_id)
+        self.assertEqual(db.raw_delete(Post.objects.all()), 1)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_other_on_delete_uses_collector(self):
+        """Неподдерживаемый on_delete передаёт удаление Collector."""
+        with mock.patch.object(db, 'RAW_ON_DELETE', (models.DO_NOTHING,)), \
+                mock.patch.object(db, 'delete_rows') as delete_rows:
+            self.assertEqual(db.raw_delete(Post.objects.all()), 2)
+        delete_rows.assert_not_called()
+        self.assertFalse(Post.objects.exists())
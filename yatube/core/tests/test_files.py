@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.test import (Client, RequestFactory, SimpleTestCase,
+                         override_settings)
+
+from ..files import parse_range, serve_file
+
+TEMP_ROOT = tempfile.mkdtemp()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+class ServeFileTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.path = os.path.join(TEMP_ROOT, 'logo.png')
+        with open(cls.path, 'wb') as file:
+            file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_parse_range(self):
+        """Разбор одиночного диапазона байтов."""
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=1000-': (1000, 1023),
+            'bytes=-24': (1000, 1023),
+            'bytes=10-99999': (10, 1023),
+            'bytes=2000-': False,
+            'bytes=0-1,5-6': None,
+            'items=0-1': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, len(CONTENT)), expected)
+
+    def test_range_request(self):
+        """Запрос с Range получает 206 и только нужные байты."""
+        request = self.factory.get('/', HTTP_RANGE='bytes=16-31')
+        response = serve_file(request, self.path)
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], 'bytes 16-31/1024')
+        self.assertEqual(response['Content-Length'], '16')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[16:32])
+
+    def test_not_modified(self):
+        """If-Modified-Since с актуальной датой даёт 304."""
+        response = serve_file(self.factory.get('/'), self.path)
+        request = self.factory.get(
+            '/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        response = serve_file(request, self.path, {'max_age': 60})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ServeMediaTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'), exist_ok=True)
+        path = os.path.join(TEMP_MEDIA_ROOT, 'posts', 'small.gif')
+        with open(path, 'wb') as file:
+            file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_media_served_with_cache_headers(self):
+        """Загруженные картинки отдаются приложением с долгим кэшем."""
+        response = self.guest_client.get('/media/posts/small.gif')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertIn('max-age=2592000', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+    def test_media_offloaded_to_proxy(self):
+        """С X-Accel-Redirect файл передаёт прокси, тело пустое."""
+        response = self.guest_client.get('/media/posts/small.gif')
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/small.gif'
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_missing_media(self):
+        """Отсутствующий файл даёт 404."""
+        response = self.guest_client.get('/media/posts/missing.gif')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
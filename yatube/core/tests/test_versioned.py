@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..versioned import VersionedIndex
+
+
+class Counter(VersionedIndex):
+    version_key = 'tests:counter:version'
+
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+        self.value = 0
+
+    def build(self):
+        self.loads += 1
+        return {'value': 0}
+
+    def apply(self, delta):
+        self.value += delta
+
+    def increment(self):
+        self._apply(1)
+
+
+class VersionedIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.index = Counter()
+        self.other = Counter()
+
+    def test_apply_in_sync(self):
+        """Изменение применяется на месте без перечитывания."""
+        self.index._fresh()
+        self.index.increment()
+        self.assertEqual(self.index._fresh().value, 1)
+        self.assertEqual(self.index.loads, 1)
+
+    def test_other_process_change_applied(self):
+        """Изменения из другого процесса догоняются без перечитывания."""
+        self.index._fresh()
+        self.other._fresh()
+        self.other.increment()
+        self.index.increment()
+        self.assertEqual(self.index.value, 0)
+        self.assertEqual(self.index._fresh().value, 2)
+        self.assertEqual(self.other._fresh().value, 2)
+        self.assertEqual((self.index.loads, self.other.loads), (1, 1))
+
+    def test_lost_delta_reloads(self):
+        """Без сохранённого изменения отставший процесс перечитывает
+        индекс."""
+        self.index._fresh()
+        self.other._fresh()
+        self.other.increment()
+        cache.delete(self.other.delta_key(self.other._version))
+        self.index._fresh()
+        self.assertEqual(self.index.loads, 2)
+
+    def test_build_is_abstract(self):
+        """Индекс без build() и apply() создать нельзя."""
+        with self.assertRaises(TypeError):
+            VersionedIndex()
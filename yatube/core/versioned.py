@@ -0,0 +1,109 @@
+import time
+from abc import ABC, abstractmethod
+from threading import RLock
+
+from django.core.cache import cache
+
+# Изменения индексов хранятся в кэше для отставших процессов столько
+# секунд; отставшие сильнее или на большее число изменений перечитывают
+# индекс целиком.
+DELTA_TIMEOUT = 60 * 60
+MAX_DELTAS = 1000
+
+
+def seed():
+    """Начальный номер версии: после сброса кэша не совпадёт со старым."""
+    return int(time.time() * 1000)
+
+
+def current_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, seed(), None)
+        version = cache.get(key)
+    return version
+
+
+class VersionedIndex(ABC):
+    """Индекс в памяти процесса, загружаемый из базы целиком при первом
+    обращении и обновляемый сигналами.
+
+    Каждое изменение растит номер версии в общем кэше и кладёт туда же
+    описание изменения под ключом этой версии. Процесс, отставший от общей
+    версии, догоняет её, применяя пропущенные изменения по порядку, и
+    перечитывает индекс целиком, только если какого-то из них уже нет в
+    кэше или их больше MAX_DELTAS.
+    """
+
+    version_key = None
+
+    def __init__(self):
+        self._lock = RLock()
+        self._version = None
+
+    @abstractmethod
+    def build(self):
+        """Читает данные из базы; возвращает атрибуты индекса словарём."""
+
+    @abstractmethod
+    def apply(self, delta):
+        """Применяет к индексу изменение, переданное в _apply()."""
+
+    def delta_key(self, version):
+        return f'{self.version_key}:{version}'
+
+    def load(self):
+        version = current_version(self.version_key)
+        state = self.build()
+        with self._lock:
+            for name, value in state.items():
+                setattr(self, name, value)
+            self._version = version
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def _catch_up(self, version):
+        """Применяет изменения после своей версии до version; возвращает
+        False, если их не собрать."""
+        with self._lock:
+            if self._version is None or version is None:
+                return False
+            missed = range(self._version + 1, version + 1)
+            if not 0 < len(missed) <= MAX_DELTAS:
+                return version == self._version
+            keys = [self.delta_key(number) for number in missed]
+            found = cache.get_many(keys)
+            if len(found) != len(keys):
+                return False
+            for key in keys:
+                self.apply(found[key])
+            self._version = version
+            return True
+
+    def _fresh(self):
+        if self._version is None:
+            self.load()
+            return self
+        version = cache.get(self.version_key)
+        if version != self._version and not self._catch_up(version):
+            self.load()
+        return self
+
+    def _apply(self, delta):
+        """Публикует изменение delta для других процессов и применяет его
+        у себя как одно изменение версии. Отставший процесс применит его
+        при следующем _fresh() вместе с пропущенными."""
+        try:
+            version = cache.incr(self.version_key)
+        except ValueError:
+            version = None
+        if version is not None:
+            cache.set(self.delta_key(version), delta, DELTA_TIMEOUT)
+        with self._lock:
+            if version is None:
+                self._version = None
+            elif self._version is not None and version == self._version + 1:
+                self.apply(delta)
+                self._version = version
@@ -1,6 +1,16 @@
+import posixpath
 from http import HTTPStatus
 
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.http import urlquote
+
+from .files import offload_file, serve_file
+
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_MAX_AGE = 60 * 60 * 24 * 30
 
 
 def page_not_found(request, exception):
@@ -30,3 +40,39 @@ def server_error(request):
         'core/500.html',
         status=HTTPStatus.INTERNAL_SERVER_ERROR
     )
+
+
+def serve_static(request, path):
+    path = posixpath.normpath(path).lstrip('/')
+    is_hashed = getattr(staticfiles_storage, 'is_hashed', None)
+    if is_hashed and is_hashed(path):
+        cache_control = {
+            'public': True,
+            'max_age': STATIC_MAX_AGE,
+            'immutable': True,
+        }
+    else:
+        cache_control = {'public': True, 'no_cache': True}
+    return serve_file(
+        request,
+        safe_join(settings.STATIC_ROOT, path),
+        cache_control=cache_control,
+    )
+
+
+def serve_media(request, path):
+    path = posixpath.normpath(path).lstrip('/')
+    fullpath = safe_join(settings.MEDIA_ROOT, path)
+    cache_control = {'public': True, 'max_age': MEDIA_MAX_AGE}
+    header = settings.MEDIA_SENDFILE_HEADER
+    if header == 'X-Accel-Redirect':
+        return offload_file(
+            request,
+            fullpath,
+            header,
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + urlquote(path),
+            cache_control,
+        )
+    if header:
+        return offload_file(request, fullpath, header, fullpath, cache_control)
+    return serve_file(request, fullpath, cache_control)
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'task', 'status', 'priority', 'run_at', 'attempts', 'locked_by'
+    )
+    search_fields = ('task', 'dedup_key')
+    list_filter = ('status', 'task')
+    empty_value_display = '-пусто-'
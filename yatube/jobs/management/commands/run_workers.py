@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import work
+
+
+def run_threads(threads, poll, once):
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stop.set())
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+
+    def target(number):
+        try:
+            work(f'{prefix}:{number}', stop=stop, poll=poll, once=once)
+        finally:
+            connections.close_all()
+
+    pool = [
+        threading.Thread(target=target, args=(number,), daemon=True)
+        for number in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    while any(thread.is_alive() for thread in pool):
+        for thread in pool:
+            thread.join(timeout=poll)
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчиков очереди задач из базы данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOBS_WORKER_PROCESSES
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.JOBS_WORKER_THREADS
+        )
+        parser.add_argument('--poll', type=float, default=1.0)
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда готовых задач не останется'
+        )
+
+    def handle(self, *args, **options):
+        args = (options['threads'], options['poll'], options['once'])
+        if options['processes'] <= 1:
+            run_threads(*args)
+            return
+        stopping = multiprocessing.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+        connections.close_all()
+        processes = {}
+        while not stopping.is_set():
+            for slot in range(options['processes']):
+                process = processes.get(slot)
+                if process is not None and (
+                    process.is_alive() or options['once']
+                ):
+                    continue
+                if process is not None and process.exitcode:
+                    self.stderr.write(
+                        f'Обработчик {process.pid} упал '
+                        f'(код {process.exitcode}), перезапускаю'
+                    )
+                processes[slot] = multiprocessing.Process(
+                    target=run_threads, args=args
+                )
+                processes[slot].start()
+            if options['once'] and not any(
+                process.is_alive() for process in processes.values()
+            ):
+                break
+            stopping.wait(options['poll'])
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+            process.join()
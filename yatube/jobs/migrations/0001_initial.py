@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:54
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=200, verbose_name='Задача:')),
+                ('payload', models.TextField(default='{}', verbose_name='Аргументы (JSON):')),
+                ('priority', models.SmallIntegerField(default=0, help_text='Задачи с большим приоритетом выполняются раньше', verbose_name='Приоритет:')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Выполняется'), ('failed', 'Ошибка')], default='queued', max_length=10, verbose_name='Статус:')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Выполнить не раньше:')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток:')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='Максимум попыток:')),
+                ('dedup_key', models.CharField(blank=True, help_text='Пока задача не выполнена, вторая с тем же ключом не ставится', max_length=200, null=True, unique=True, verbose_name='Ключ дедупликации:')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Обработчик:')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу:')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка:')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания:')),
+            ],
+            options={
+                'ordering': ['-priority', 'run_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-priority', 'run_at'], name='job_pick_idx'),
+        ),
+    ]
@@ -0,0 +1,166 @@
+import json
+import random
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+BACKOFF_BASE = 10
+BACKOFF_MAX = 60 * 60
+CLAIM_BATCH = 10
+
+registry = {}
+
+
+def task(func=None, *, name=None):
+    """Регистрирует функцию как задачу очереди под именем module.func."""
+    def register(func):
+        func.task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[func.task_name] = func
+        return func
+    return register(func) if func else register
+
+
+def enqueue(task_name, payload=None, *, priority=0, run_at=None, delay=None,
+            dedup_key=None, max_attempts=5):
+    """Ставит задачу в очередь в текущей транзакции.
+
+    Пока задача с таким же dedup_key ждёт в очереди, новая не создаётся
+    и возвращается существующая.
+    """
+    task_name = getattr(task_name, 'task_name', task_name)
+    if run_at is None:
+        run_at = timezone.now()
+    if delay:
+        run_at += timedelta(seconds=delay)
+    job = Job(
+        task=task_name,
+        payload=json.dumps(payload or {}, cls=DjangoJSONEncoder),
+        priority=priority,
+        run_at=run_at,
+        dedup_key=dedup_key,
+        max_attempts=max_attempts,
+    )
+    if dedup_key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        job = Job.objects.filter(dedup_key=dedup_key).first() or enqueue(
+            task_name, payload, priority=priority, run_at=run_at,
+            dedup_key=dedup_key, max_attempts=max_attempts,
+        )
+    return job
+
+
+def lease_timeout():
+    return timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+
+
+LEASE_EXPIRED = 'Аренда истекла: обработчик упал или завис.'
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи обработчиков, не уложившихся в аренду.
+
+    Попытка засчитана ещё при захвате, поэтому задача, которая роняет
+    процесс обработчика, после max_attempts помечается упавшей, а не
+    повторяется бесконечно.
+    """
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - lease_timeout(),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error=LEASE_EXPIRED,
+        locked_by='', locked_at=None,
+    )
+    return failed + stale.update(
+        status=Job.QUEUED, last_error=LEASE_EXPIRED,
+        locked_by='', locked_at=None,
+    )
+
+
+def claim(worker_id):
+    """Атомарно забирает самую приоритетную готовую задачу."""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).order_by('-priority', 'run_at', 'id').values_list(
+        'id', flat=True
+    )[:CLAIM_BATCH]
+    for job_id in candidates:
+        claimed = Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+            dedup_key=None,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.75, 1.25))
+
+
+def run(job):
+    """Выполняет задачу: удаляет её при успехе, иначе планирует повтор.
+
+    Строка меняется, только пока задача ещё за этим обработчиком: после
+    истечения аренды её мог забрать другой.
+    """
+    owned = Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by
+    )
+    try:
+        func = registry[job.task]
+        func(**json.loads(job.payload))
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            owned.update(
+                status=Job.FAILED, last_error=error,
+                locked_by='', locked_at=None,
+            )
+        else:
+            owned.update(
+                status=Job.QUEUED, last_error=error,
+                run_at=timezone.now() + backoff(job.attempts),
+                locked_by='', locked_at=None,
+            )
+        return False
+    owned.delete()
+    return True
+
+
+def work(worker_id, stop=None, poll=1.0, once=False):
+    """Цикл обработчика: берёт и выполняет задачи, пока не попросят
+    остановиться; с once=True выходит, когда очередь пуста."""
+    processed = 0
+    while stop is None or not stop.is_set():
+        job = claim(worker_id)
+        if job is None:
+            if once:
+                break
+            requeue_stale()
+            if stop is None:
+                time.sleep(poll)
+            else:
+                stop.wait(poll)
+            continue
+        run(job)
+        processed += 1
+    return processed
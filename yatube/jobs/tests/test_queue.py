@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Job
+from ..queue import claim, enqueue, requeue_stale, run, task, work
+
+calls = []
+
+
+@task
+def remember(value):
+    calls.append(value)
+
+
+@task
+def explode():
+    raise RuntimeError('Ошибка задачи')
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_priority_order(self):
+        """Задачи выполняются по убыванию приоритета."""
+        enqueue(remember, {'value': 'низкий'})
+        enqueue(remember, {'value': 'высокий'}, priority=10)
+        self.assertEqual(work('test', once=True), 2)
+        self.assertEqual(calls, ['высокий', 'низкий'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_scheduled_job_waits(self):
+        """Отложенная задача не выполняется раньше срока."""
+        enqueue(remember, {'value': 'позже'}, delay=60)
+        self.assertIsNone(claim('test'))
+        self.assertEqual(calls, [])
+
+    def test_dedup_key(self):
+        """Вторая задача с тем же ключом не создаётся, пока первая ждёт."""
+        first = enqueue(remember, {'value': 1}, dedup_key='one')
+        second = enqueue(remember, {'value': 2}, dedup_key='one')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+        claim('test')
+        third = enqueue(remember, {'value': 3}, dedup_key='one')
+        self.assertNotEqual(first.pk, third.pk)
+
+    def test_retry_with_backoff(self):
+        """Упавшая задача откладывается, а после всех попыток помечается
+        ошибочной."""
+        job = enqueue(explode, max_attempts=2)
+        self.assertFalse(run(claim('test')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertFalse(run(claim('test')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_requeue_stale(self):
+        """Задача упавшего обработчика возвращается в очередь."""
+        job = enqueue(remember, {'value': 'снова'})
+        claim('crashed')
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(work('test', once=True), 1)
+        self.assertEqual(calls, ['снова'])
+
+    def test_crashing_job_fails_after_max_attempts(self):
+        """Задача, каждый раз ронявшая обработчик, после max_attempts
+        помечается упавшей, а не возвращается в очередь."""
+        job = enqueue(remember, {'value': 'никогда'}, max_attempts=2)
+        for _ in range(2):
+            claim('crashed')
+            Job.objects.filter(pk=job.pk).update(
+                locked_at=timezone.now() - timedelta(hours=1)
+            )
+            requeue_stale()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNone(claim('test'))
+
+    def test_lost_lease_not_overwritten(self):
+        """Обработчик с истёкшей арендой не трогает задачу, которую уже
+        забрал другой."""
+        job = enqueue(remember, {'value': 'дважды'})
+        stale = claim('slow')
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        requeue_stale()
+        claim('fast')
+        self.assertTrue(run(stale))
+        job.refresh_from_db()
+        self.assertEqual(job.locked_by, 'fast')
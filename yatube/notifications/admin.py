@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import EmailNotification, Notification
+
+
+@admin.register(EmailNotification)
+class EmailNotificationAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'kind', 'created', 'sent')
+    list_filter = ('kind', 'sent')
+    empty_value_display = '-пусто-'
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'actor', 'verb', 'is_read', 'created')
+    list_filter = ('verb', 'is_read')
+    raw_id_fields = ('recipient', 'actor', 'post', 'comment')
+    empty_value_display = '-пусто-'
@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from posts.freshness import bump
+
+from .models import Notification
+
+UNREAD_KEY = 'notifications:unread:{}'
+UNREAD_TIMEOUT = 60 * 60 * 24
+NOTIFY_BATCH = 1000
+
+
+def forget_unread(user_ids):
+    """Сбрасывает счётчики после фиксации транзакции, иначе параллельный
+    запрос успел бы закэшировать старое значение на UNREAD_TIMEOUT."""
+    user_ids = list(user_ids)
+
+    def forget():
+        cache.delete_many([UNREAD_KEY.format(user_id) for user_id in user_ids])
+        bump(*(f'viewer:{user_id}' for user_id in user_ids))
+    transaction.on_commit(forget)
+
+
+def post_recipients(post_ids):
+    """Получатели непрочитанных уведомлений о постах; их счётчики нужно
+    сбросить, когда посты удаляются каскадом в обход сигналов."""
+    return set(Notification.objects.filter(
+        post_id__in=post_ids, is_read=False
+    ).values_list('recipient_id', flat=True).distinct())
+
+
+def unread_count(user_id):
+    """Число непрочитанных уведомлений; COUNT только при промахе кэша."""
+    key = UNREAD_KEY.format(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient_id=user_id, is_read=False
+        ).count()
+        cache.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def notify(recipient_ids, actor_id, verb, post_id=None, comment_id=None):
+    """Создаёт уведомления для получателей пачками через bulk_create."""
+    recipient_ids = [
+        recipient_id for recipient_id in recipient_ids
+        if recipient_id != actor_id
+    ]
+    for start in range(0, len(recipient_ids), NOTIFY_BATCH):
+        batch = recipient_ids[start:start + NOTIFY_BATCH]
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=recipient_id,
+                actor_id=actor_id,
+                verb=verb,
+                post_id=post_id,
+                comment_id=comment_id,
+            )
+            for recipient_id in batch
+        ])
+        forget_unread(batch)
+    return len(recipient_ids)
+
+
+def mark_read(user_id, ids=None):
+    """Отмечает уведомления прочитанными одним UPDATE."""
+    notifications = Notification.objects.filter(
+        recipient_id=user_id, is_read=False
+    )
+    if ids is not None:
+        notifications = notifications.filter(id__in=ids)
+    updated = notifications.update(is_read=True)
+    if updated:
+        forget_unread([user_id])
+    return updated
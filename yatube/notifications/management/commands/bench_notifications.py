@@ -0,0 +1,57 @@
+import tempfile
+import time
+
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.core.management.base import BaseCommand
+
+BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает отправку уведомлений по одному письму и сводками '
+            'через одно соединение на файловом бэкенде.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notifications', type=int, default=2000)
+        parser.add_argument('--recipients', type=int, default=200)
+
+    def report(self, name, started, letters, count):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name:<10} писем: {letters:>6}  '
+            f'уведомлений/с: {count / elapsed:>10.1f}  '
+            f'время: {elapsed:.3f} с'
+        )
+
+    def handle(self, *args, **options):
+        count = options['notifications']
+        recipients = [
+            f'user{number}@example.com'
+            for number in range(options['recipients'])
+        ]
+        with tempfile.TemporaryDirectory() as path:
+            started = time.perf_counter()
+            for number in range(count):
+                send_mail(
+                    'Новое на Yatube',
+                    f'Уведомление {number}',
+                    None,
+                    [recipients[number % len(recipients)]],
+                    connection=get_connection(BACKEND, file_path=path),
+                )
+            self.report('по одному', started, count, count)
+
+        with tempfile.TemporaryDirectory() as path:
+            started = time.perf_counter()
+            lines = {recipient: [] for recipient in recipients}
+            for number in range(count):
+                lines[recipients[number % len(recipients)]].append(
+                    f'— Уведомление {number}'
+                )
+            messages = [
+                EmailMessage('Новое на Yatube', '\n'.join(body), to=[to])
+                for to, body in lines.items() if body
+            ]
+            with get_connection(BACKEND, file_path=path) as connection:
+                connection.send_messages(messages)
+            self.report('сводками', started, len(messages), count)
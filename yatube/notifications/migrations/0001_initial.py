@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailNotification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('follow', 'Новый подписчик'), ('comment', 'Новый комментарий')], max_length=10, verbose_name='Тип:')),
+                ('text', models.TextField(verbose_name='Текст:')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания:')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки:')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель:')),
+            ],
+            options={
+                'ordering': ['created'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='emailnotification',
+            index=models.Index(fields=['sent', 'recipient'], name='email_pending_idx'),
+        ),
+    ]
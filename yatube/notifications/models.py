@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class EmailNotification(models.Model):
+    FOLLOW = 'follow'
+    COMMENT = 'comment'
+    KIND_CHOICES = (
+        (FOLLOW, 'Новый подписчик'),
+        (COMMENT, 'Новый комментарий'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='email_notifications',
+        verbose_name='Получатель:'
+    )
+    kind = models.CharField(
+        max_length=10,
+        choices=KIND_CHOICES,
+        verbose_name='Тип:'
+    )
+    text = models.TextField(
+        verbose_name='Текст:'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания:'
+    )
+    sent = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата отправки:'
+    )
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['sent', 'recipient'],
+                name='email_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class Notification(models.Model):
+    FOLLOW = 'follow'
+    COMMENT = 'comment'
+    POST = 'post'
+    VERB_CHOICES = (
+        (FOLLOW, 'подписался на вас'),
+        (COMMENT, 'прокомментировал ваш пост'),
+        (POST, 'опубликовал новый пост'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель:'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор события:'
+    )
+    verb = models.CharField(
+        max_length=10,
+        choices=VERB_CHOICES,
+        verbose_name='Событие:'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Пост:'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True,
+        verbose_name='Комментарий:'
+    )
+    is_read = models.BooleanField(
+        default=False,
+        verbose_name='Прочитано:'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания:'
+    )
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['recipient', '-id'],
+                name='notification_inbox_idx'
+            ),
+            models.Index(
+                fields=['recipient', 'is_read'],
+                name='notification_unread_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.actor} {self.get_verb_display()}'
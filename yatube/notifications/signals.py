@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from posts.follows import followed
+from posts.models import Comment, Post
+
+from .inbox import notify
+from .models import EmailNotification, Notification
+from .tasks import fan_out_post, schedule_digests
+
+
+User = get_user_model()
+
+
+@receiver(followed)
+def authors_followed(sender, user_id, author_ids, **kwargs):
+    notify(author_ids, user_id, Notification.FOLLOW)
+    username = User.objects.filter(pk=user_id).values_list(
+        'username', flat=True
+    ).get()
+    EmailNotification.objects.bulk_create([
+        EmailNotification(
+            recipient_id=author_id,
+            kind=EmailNotification.FOLLOW,
+            text=f'{username} подписался на ваши посты',
+        )
+        for author_id in author_ids
+    ])
+    schedule_digests()
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if not created or instance.author_id == instance.post.author_id:
+        return
+    notify(
+        [instance.post.author_id],
+        instance.author_id,
+        Notification.COMMENT,
+        instance.post_id,
+        instance.pk,
+    )
+    EmailNotification.objects.create(
+        recipient_id=instance.post.author_id,
+        kind=EmailNotification.COMMENT,
+        text=(
+            f'{instance.author.username} прокомментировал ваш пост '
+            f'«{instance.post}»: {instance.text[:100]}'
+        ),
+    )
+    schedule_digests()
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        enqueue(fan_out_post, {'post_id': instance.pk})
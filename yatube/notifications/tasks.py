@@ -0,0 +1,102 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Max
+from django.utils import timezone
+
+from jobs.queue import enqueue, task
+from posts.models import Follow, Post
+
+from .inbox import NOTIFY_BATCH, notify
+from .models import EmailNotification, Notification
+
+DIGEST_DEDUP_KEY = 'notifications:email-digests'
+DIGEST_BATCH = 500
+DIGEST_SUBJECT = 'Новое на Yatube'
+
+
+def schedule_digests(run_at=None):
+    """Ставит рассылку сводок, если она ещё не запланирована."""
+    if run_at is None:
+        run_at = timezone.now() + timedelta(
+            seconds=settings.NOTIFICATIONS_DIGEST_DELAY
+        )
+    enqueue(send_email_digests, run_at=run_at, dedup_key=DIGEST_DEDUP_KEY)
+
+
+def build_digest(recipient, notifications):
+    lines = [f'Здравствуйте, {recipient.username}!', '']
+    lines += [f'— {notification.text}' for notification in notifications]
+    return EmailMessage(DIGEST_SUBJECT, '\n'.join(lines), to=[recipient.email])
+
+
+def collect_digests(pending, last_sent, now):
+    interval = timedelta(seconds=settings.NOTIFICATIONS_EMAIL_INTERVAL)
+    by_recipient = defaultdict(list)
+    for notification in pending:
+        by_recipient[notification.recipient].append(notification)
+    digests, deferred = [], []
+    for recipient, notifications in by_recipient.items():
+        allowed_at = last_sent.get(recipient.pk, now - interval) + interval
+        if allowed_at > now:
+            deferred.append(allowed_at)
+            continue
+        digests.append((
+            build_digest(recipient, notifications),
+            [notification.pk for notification in notifications],
+        ))
+    return digests, deferred
+
+
+@task
+def send_email_digests():
+    """Отправляет накопленные уведомления сводками по одному письму на
+    пользователя через одно SMTP-соединение.
+
+    Каждая пачка отмечается отправленной сразу после доставки, поэтому
+    после ошибки SMTP следующий запуск не повторит уже ушедшие письма.
+    Пользователю, получившему письмо недавно, сводка откладывается до
+    истечения NOTIFICATIONS_EMAIL_INTERVAL.
+    """
+    now = timezone.now()
+    pending = EmailNotification.objects.filter(
+        sent__isnull=True
+    ).exclude(recipient__email='').select_related('recipient').order_by(
+        'recipient_id', 'created'
+    )
+    recipient_ids = pending.values('recipient_id').distinct()
+    last_sent = dict(EmailNotification.objects.filter(
+        recipient_id__in=recipient_ids, sent__isnull=False
+    ).values('recipient_id').annotate(last=Max('sent')).values_list(
+        'recipient_id', 'last'
+    ))
+    digests, deferred = collect_digests(pending, last_sent, now)
+    with get_connection() as connection:
+        for start in range(0, len(digests), DIGEST_BATCH):
+            batch = digests[start:start + DIGEST_BATCH]
+            connection.send_messages([message for message, _ in batch])
+            EmailNotification.objects.filter(
+                pk__in=[pk for _, ids in batch for pk in ids]
+            ).update(sent=now)
+    if deferred:
+        schedule_digests(min(deferred))
+
+
+@task
+def fan_out_post(post_id):
+    """Уведомляет подписчиков автора о новом посте."""
+    post = Post.objects.filter(pk=post_id).values('author_id').first()
+    if post is None:
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=post['author_id']
+    ).values_list('user_id', flat=True).order_by('user_id').iterator()
+    batch = []
+    for follower_id in follower_ids:
+        batch.append(follower_id)
+        if len(batch) == NOTIFY_BATCH:
+            notify(batch, post['author_id'], Notification.POST, post_id)
+            batch = []
+    notify(batch, post['author_id'], Notification.POST, post_id)
@@ -0,0 +1,87 @@
+import smtplib
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+
+from jobs.models import Job
+from posts.models import Comment, Follow, Post
+
+from ..models import EmailNotification
+from .. import tasks
+from ..tasks import DIGEST_DEDUP_KEY, send_email_digests
+
+User = get_user_model()
+
+
+class EmailDigestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='calypsol', email='calypsol@example.com'
+        )
+        cls.reader = User.objects.create_user(username='calyps')
+        cls.post = Post.objects.create(author=cls.author, text='Тестовый')
+
+    def test_notifications_queued_not_sent(self):
+        """Подписка и комментарий только ставят уведомления в очередь."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        self.assertEqual(
+            EmailNotification.objects.filter(recipient=self.author).count(), 2
+        )
+        self.assertEqual(
+            Job.objects.filter(dedup_key=DIGEST_DEDUP_KEY).count(), 1
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_digest_is_one_letter(self):
+        """Уведомления уходят одним письмом, повтор ограничен по частоте."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        send_email_digests()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Комментарий', mail.outbox[0].body)
+        self.assertIn('подписался', mail.outbox[0].body)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Ещё один'
+        )
+        send_email_digests()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertTrue(
+            EmailNotification.objects.filter(sent__isnull=True).exists()
+        )
+
+    def test_sent_batches_marked_before_error(self):
+        """Пачка, ушедшая до ошибки SMTP, отмечена и не повторяется."""
+        other = User.objects.create_user(
+            username='other', email='other@example.com'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=other)
+        send = EmailBackend.send_messages
+        calls = []
+
+        def fail_second(backend, messages):
+            calls.append(messages)
+            if len(calls) > 1:
+                raise smtplib.SMTPServerDisconnected
+            return send(backend, messages)
+        with mock.patch.object(tasks, 'DIGEST_BATCH', 1), \
+                mock.patch.object(EmailBackend, 'send_messages', fail_second):
+            with self.assertRaises(smtplib.SMTPServerDisconnected):
+                send_email_digests()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            EmailNotification.objects.filter(sent__isnull=False).count(), 1
+        )
+        send_email_digests()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertNotEqual(mail.outbox[0].to, mail.outbox[1].to)
@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from jobs.queue import work
+from posts.models import Comment, Follow, Post
+
+from ..inbox import UNREAD_KEY, unread_count
+from ..models import Notification
+
+User = get_user_model()
+
+
+class InboxTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='calypsol')
+        cls.reader = User.objects.create_user(username='calyps')
+        cls.post = Post.objects.create(author=cls.author, text='Тестовый')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_follow_and_comment_notify_author(self):
+        """Подписка и комментарий создают уведомления автору."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        verbs = set(self.author.notifications.values_list('verb', flat=True))
+        self.assertEqual(verbs, {Notification.FOLLOW, Notification.COMMENT})
+        self.assertEqual(unread_count(self.author.id), 2)
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост в фоне рассылается подписчикам автора."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        work('test', once=True)
+        self.assertTrue(Notification.objects.filter(
+            recipient=self.reader, verb=Notification.POST, post=post
+        ).exists())
+
+    def test_inbox_marks_read(self):
+        """Просмотр ящика отмечает уведомления прочитанными."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.author_client.get(reverse('notifications:inbox'))
+        self.assertContains(response, 'Новое:')
+        self.assertEqual(unread_count(self.author.id), 0)
+        self.assertFalse(
+            self.author.notifications.filter(is_read=False).exists()
+        )
+
+    def test_unread_count_cached(self):
+        """Счётчик в шапке не требует COUNT на каждой странице."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(unread_count(self.author.id), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.author.id), 1)
+        response = self.author_client.get(reverse('about:author'))
+        self.assertContains(response, 'Уведомления (1)')
+
+    def test_cursor_pagination(self):
+        """Ящик листается курсором before."""
+        for number in range(12):
+            Comment.objects.create(
+                post=self.post, author=self.reader, text=f'Номер {number}'
+            )
+        response = self.author_client.get(reverse('notifications:inbox'))
+        cursor = response.context['next_cursor']
+        self.assertEqual(len(response.context['notifications']), 10)
+        response = self.author_client.get(
+            reverse('notifications:inbox') + f'?before={cursor}'
+        )
+        self.assertEqual(len(response.context['notifications']), 2)
+        self.assertIsNone(response.context['next_cursor'])
+
+
+class UnreadInvalidationTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='calypsol')
+        self.reader = User.objects.create_user(username='calyps')
+
+    def test_worker_fan_out_resets_cached_count(self):
+        """Счётчик, закэшированный веб-процессом, сбрасывает воркер."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(unread_count(self.reader.id), 0)
+        Post.objects.create(author=self.author, text='Новый пост')
+        work('test', once=True)
+        self.assertEqual(unread_count(self.reader.id), 1)
+
+    def test_count_cached_inside_transaction_is_dropped(self):
+        """Значение, прочитанное до фиксации, не переживает фиксацию."""
+        with transaction.atomic():
+            Follow.objects.create(user=self.reader, author=self.author)
+            cache.set(UNREAD_KEY.format(self.author.id), 0)
+        self.assertEqual(unread_count(self.author.id), 1)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from .inbox import mark_read
+
+
+@login_required
+def inbox(request):
+    notifications = request.user.notifications.select_related(
+        'actor', 'post'
+    )
+    before = request.GET.get('before')
+    if before and before.isdigit():
+        notifications = notifications.filter(id__lt=before)
+    page = list(notifications[:settings.LIMIT_POST + 1])
+    next_cursor = None
+    if len(page) > settings.LIMIT_POST:
+        page = page[:settings.LIMIT_POST]
+        next_cursor = page[-1].id
+    mark_read(
+        request.user.id,
+        [notification.id for notification in page if not notification.is_read]
+    )
+    context = {
+        'notifications': page,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'notifications/inbox.html', context)
+
+
+@login_required
+@require_POST
+def mark_all_read(request):
+    mark_read(request.user.id)
+    return redirect('notifications:inbox')
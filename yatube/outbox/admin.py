@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import Checkpoint, OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'topic', 'object_id', 'action', 'created')
+    list_filter = ('topic', 'action')
+
+
+@admin.register(Checkpoint)
+class CheckpointAdmin(admin.ModelAdmin):
+    list_display = ('consumer', 'position', 'updated')
@@ -0,0 +1,161 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Checkpoint, OutboxEvent
+
+BATCH_SIZE = 500
+
+consumers = {}
+
+
+def topic_of(model):
+    return model._meta.label_lower
+
+
+def record(topic, object_id, action, payload=None):
+    return OutboxEvent.objects.create(
+        topic=topic,
+        object_id=object_id,
+        action=action,
+        payload=json.dumps(payload or {}, cls=DjangoJSONEncoder),
+    )
+
+
+def record_many(topic, action, rows):
+    """Пишет события одним INSERT для строк, изменённых в обход сигналов;
+    rows — пары (id объекта, данные)."""
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            topic=topic,
+            object_id=object_id,
+            action=action,
+            payload=json.dumps(payload or {}, cls=DjangoJSONEncoder),
+        )
+        for object_id, payload in rows
+    ])
+
+
+def track(model, payload):
+    """Пишет в журнал каждое сохранение и удаление модели.
+
+    Модель должна наследовать OutboxMixin: тогда запись попадает в ту же
+    транзакцию, что и само изменение. Удаление и так идёт в транзакции
+    Collector. QuerySet.update() и bulk_create() журнал не видит.
+    """
+    topic = topic_of(model)
+
+    def saved(sender, instance, created, raw=False, **kwargs):
+        if not raw:
+            action = OutboxEvent.CREATED if created else OutboxEvent.UPDATED
+            record(topic, instance.pk, action, payload(instance))
+
+    def deleted(sender, instance, **kwargs):
+        record(topic, instance.pk, OutboxEvent.DELETED, payload(instance))
+
+    post_save.connect(saved, sender=model, weak=False,
+                      dispatch_uid=f'outbox:{topic}:saved')
+    post_delete.connect(deleted, sender=model, weak=False,
+                        dispatch_uid=f'outbox:{topic}:deleted')
+
+
+def consumer(name, topics=None):
+    """Регистрирует обработчик пачек событий журнала под именем name."""
+    def register(func):
+        consumers[name] = (func, topics)
+        return func
+    return register
+
+
+def read(after=0, topics=None, limit=BATCH_SIZE, missing=()):
+    """События после after и ещё не прочитанные события из missing."""
+    events = OutboxEvent.objects.filter(Q(id__gt=after) | Q(id__in=missing))
+    if topics:
+        events = events.filter(topic__in=topics)
+    return list(events.order_by('id')[:limit])
+
+
+def find_missing(after, upto, missing=()):
+    """Id до upto включительно, которых ещё нет в журнале.
+
+    Id выдаётся при INSERT, а виден после COMMIT, поэтому событие с
+    меньшим id может появиться позже уже прочитанного. Такие id ждут
+    OUTBOX_GAP_SECONDS: если после пропуска есть событие старше этого
+    срока, транзакция с пропущенным id откатилась, и он забывается.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.OUTBOX_GAP_SECONDS)
+    horizon = OutboxEvent.objects.filter(
+        id__gt=min([after, *missing]), created__lt=cutoff
+    ).aggregate(horizon=Max('id'))['horizon'] or 0
+    low = max(after, horizon)
+    expected = {pk for pk in missing if pk > horizon}
+    expected.update(range(low + 1, upto + 1))
+    if not expected:
+        return []
+    present = OutboxEvent.objects.filter(
+        Q(id__gt=low, id__lte=upto) | Q(id__in=missing)
+    ).values_list('id', flat=True)
+    return sorted(expected.difference(present))
+
+
+def process(name, batch_size=BATCH_SIZE):
+    """Передаёт потребителю следующую пачку событий после его контрольной
+    точки вместе с появившимися пропусками ниже неё. Обработчик и сдвиг
+    точки выполняются в одной транзакции."""
+    func, topics = consumers[name]
+    checkpoint, _ = Checkpoint.objects.get_or_create(consumer=name)
+    missing = json.loads(checkpoint.missing)
+    events = read(checkpoint.position, topics, batch_size, missing)
+    position = max([
+        checkpoint.position,
+        *(event.id for event in events if event.id > checkpoint.position),
+    ])
+    if position == checkpoint.position and not missing:
+        return 0
+    still_missing = find_missing(checkpoint.position, position, missing)
+    if not events and still_missing == missing:
+        return 0
+    with transaction.atomic():
+        if events:
+            func(events)
+        Checkpoint.objects.filter(pk=checkpoint.pk).update(
+            position=position, missing=json.dumps(still_missing),
+            updated=timezone.now(),
+        )
+    return len(events)
+
+
+def drain(name, batch_size=BATCH_SIZE):
+    processed = 0
+    while True:
+        count = process(name, batch_size)
+        if not count:
+            return processed
+        processed += count
+
+
+def reset(name, position=0):
+    """Отматывает потребителя назад, чтобы пересобрать его данные."""
+    Checkpoint.objects.update_or_create(
+        consumer=name, defaults={'position': position, 'missing': '[]'}
+    )
+
+
+def prune():
+    """Удаляет старые события, которые прочитали все потребители."""
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    events = OutboxEvent.objects.filter(created__lt=cutoff)
+    positions = Checkpoint.objects.filter(
+        consumer__in=consumers
+    ).values_list('position', flat=True)
+    if len(positions) < len(consumers):
+        return 0
+    if consumers:
+        events = events.filter(id__lte=min(positions))
+    return events.delete()[0]
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from outbox.log import BATCH_SIZE, consumers, drain, prune, reset
+
+
+class Command(BaseCommand):
+    help = 'Передаёт новые события журнала изменений потребителям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'consumers', nargs='*',
+            help='Имена потребителей; по умолчанию все'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Начать с первого события, чтобы пересобрать данные'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не выходить, а опрашивать журнал каждые --poll секунд'
+        )
+        parser.add_argument('--poll', type=float, default=1.0)
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Удалить старые события, прочитанные всеми потребителями'
+        )
+
+    def handle(self, *args, **options):
+        names = options['consumers'] or sorted(consumers)
+        unknown = set(names) - set(consumers)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные потребители: {", ".join(sorted(unknown))}'
+            )
+        if options['reset']:
+            for name in names:
+                reset(name)
+        while True:
+            for name in names:
+                processed = drain(name, options['batch_size'])
+                if processed:
+                    self.stdout.write(f'{name}: {processed}')
+            if options['prune']:
+                self.stdout.write(f'Удалено событий: {prune()}')
+            if not options['loop']:
+                return
+            time.sleep(options['poll'])
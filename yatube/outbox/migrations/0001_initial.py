@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=100, unique=True, verbose_name='Потребитель:')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Последнее обработанное событие:')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлено:')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=100, verbose_name='Модель:')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Объект:')),
+                ('action', models.CharField(choices=[('created', 'Создан'), ('updated', 'Изменён'), ('deleted', 'Удалён')], max_length=7, verbose_name='Действие:')),
+                ('payload', models.TextField(default='{}', verbose_name='Данные (JSON):')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата:')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['topic', 'id'], name='outbox_topic_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0002_archived_action'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checkpoint',
+            name='missing',
+            field=models.TextField(default='[]', verbose_name='Пропущенные id ниже позиции (JSON):'),
+        ),
+    ]
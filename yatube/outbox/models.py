@@ -0,0 +1,82 @@
+import json
+
+from django.db import models, transaction
+
+
+class OutboxMixin:
+    """Сохраняет модель в транзакции, чтобы запись в журнал изменений
+    из post_save попала в неё же."""
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class OutboxEvent(models.Model):
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ARCHIVED = 'archived'
+    ACTIONS = (
+        (CREATED, 'Создан'),
+        (UPDATED, 'Изменён'),
+        (DELETED, 'Удалён'),
+        (ARCHIVED, 'В архиве'),
+    )
+
+    topic = models.CharField(
+        max_length=100,
+        verbose_name='Модель:'
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name='Объект:'
+    )
+    action = models.CharField(
+        max_length=10,
+        choices=ACTIONS,
+        verbose_name='Действие:'
+    )
+    payload = models.TextField(
+        default='{}',
+        verbose_name='Данные (JSON):'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата:'
+    )
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['topic', 'id'], name='outbox_topic_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.pk}: {self.action} {self.topic} #{self.object_id}'
+
+    @property
+    def data(self):
+        return json.loads(self.payload)
+
+
+class Checkpoint(models.Model):
+    consumer = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Потребитель:'
+    )
+    position = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Последнее обработанное событие:'
+    )
+    missing = models.TextField(
+        default='[]',
+        verbose_name='Пропущенные id ниже позиции (JSON):'
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Обновлено:'
+    )
+
+    def __str__(self):
+        return f'{self.consumer}: {self.position}'
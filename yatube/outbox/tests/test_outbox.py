@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.models import Follow, Group, Post
+
+from .. import log
+from ..models import Checkpoint, OutboxEvent
+
+User = get_user_model()
+
+
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.author = User.objects.create_user(username='calyps')
+
+    def setUp(self):
+        self.batches = []
+        log.consumers['test'] = (self.batches.append, ['posts.post'])
+        self.addCleanup(log.consumers.pop, 'test')
+
+    def test_changes_are_recorded(self):
+        """Создание, правка и удаление пишутся в журнал по порядку."""
+        group = Group.objects.create(title='Группа', slug='group')
+        post = Post.objects.create(text='Текст', author=self.user,
+                                   group=group)
+        post.text = 'Новый текст'
+        post.save()
+        Follow.objects.create(user=self.user, author=self.author)
+        post_id = post.pk
+        post.delete()
+        events = list(OutboxEvent.objects.values_list(
+            'topic', 'object_id', 'action'
+        ))
+        self.assertEqual(events, [
+            ('posts.group', group.pk, 'created'),
+            ('posts.post', post_id, 'created'),
+            ('posts.post', post_id, 'updated'),
+            ('posts.follow', Follow.objects.get().pk, 'created'),
+            ('posts.post', post_id, 'deleted'),
+        ])
+        self.assertEqual(
+            OutboxEvent.objects.filter(topic='posts.post').first().data,
+            {'author_id': self.user.pk, 'group_id': group.pk},
+        )
+
+    def test_consumer_checkpoint(self):
+        """Потребитель получает события пачками и продолжает с контрольной
+        точки."""
+        for number in range(5):
+            Post.objects.create(text=f'Текст {number}', author=self.user)
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(log.drain('test', batch_size=2), 5)
+        self.assertEqual([len(batch) for batch in self.batches], [2, 2, 1])
+        Post.objects.create(text='Ещё', author=self.user)
+        self.assertEqual(log.drain('test'), 1)
+        self.assertEqual(
+            Checkpoint.objects.get(consumer='test').position,
+            OutboxEvent.objects.filter(topic='posts.post').last().pk,
+        )
+
+    def test_late_commit_is_delivered(self):
+        """Событие, зафиксированное позже следующего за ним, не теряется."""
+        posts = [
+            Post.objects.create(text=f'Текст {number}', author=self.user)
+            for number in range(3)
+        ]
+        late = OutboxEvent.objects.get(object_id=posts[1].pk)
+        late_id = late.id
+        late.delete()
+        self.assertEqual(log.drain('test'), 2)
+        self.assertEqual(
+            Checkpoint.objects.get(consumer='test').missing, f'[{late_id}]'
+        )
+        late.id = late_id
+        late.save(force_insert=True)
+        self.assertEqual(log.drain('test'), 1)
+        self.assertEqual(self.batches[-1], [late])
+        self.assertEqual(Checkpoint.objects.get(consumer='test').missing, '[]')
+
+    def test_rolled_back_gap_expires(self):
+        """Пропуск забывается, когда после него есть событие старше
+        OUTBOX_GAP_SECONDS."""
+        for number in range(3):
+            Post.objects.create(text=f'Текст {number}', author=self.user)
+        events = list(OutboxEvent.objects.all())
+        events[1].delete()
+        log.drain('test')
+        OutboxEvent.objects.filter(id=events[2].id).update(
+            created=timezone.now() - timedelta(hours=1)
+        )
+        log.drain('test')
+        self.assertEqual(Checkpoint.objects.get(consumer='test').missing, '[]')
+
+    def test_failed_batch_is_retried(self):
+        """Если обработчик упал, контрольная точка не сдвигается."""
+        def fail(events):
+            raise RuntimeError
+        log.consumers['test'] = (fail, None)
+        Post.objects.create(text='Текст', author=self.user)
+        with self.assertRaises(RuntimeError):
+            log.process('test')
+        self.assertEqual(Checkpoint.objects.get(consumer='test').position, 0)
+
+    def test_reset(self):
+        """С reset журнал отдаётся заново с начала."""
+        Post.objects.create(text='Текст', author=self.user)
+        call_command('process_outbox', 'test', stdout=StringIO())
+        call_command('process_outbox', 'test', reset=True, stdout=StringIO())
+        self.assertEqual(len(self.batches), 2)
@@ -3,11 +3,26 @@ from django.contrib import admin
 from .models import Group, Post
 
 
+class DuplicateFilter(admin.SimpleListFilter):
+    title = 'почти повторы'
+    parameter_name = 'duplicate'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'Да'), ('no', 'Нет'))
+
+    def queryset(self, request, queryset):
+        if self.value() in ('yes', 'no'):
+            return queryset.filter(duplicate_of__isnull=self.value() == 'no')
+        return queryset
+
+
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'duplicate_of'
+    )
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', DuplicateFilter)
     list_editable = ('group',)
     empty_value_display = '-пусто-'
 
@@ -0,0 +1,362 @@
+import json
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import JsonResponse
+
+from .autocomplete import autocomplete
+from .follow_graph import follow_graph
+from .follows import follow, unfollow
+from .freshness import conditional_page
+from .models import Group, Post, User
+from .utils import decode_cursor, encode_cursor
+from .views import group_scopes, index_scopes, post_scopes, profile_scopes
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'author', 'group', 'image')
+AUTHOR_FIELDS = ('id', 'username', 'first_name', 'last_name')
+GROUP_FIELDS = ('id', 'slug', 'title', 'description')
+MAX_LIMIT = 100
+AUTOCOMPLETE_LIMIT = 20
+BATCH_LIMIT = 100
+OBJECT_CACHE_TIMEOUT = 60 * 60
+
+POST_KEY = 'api:post:{}'
+USER_KEY = 'api:user:{}'
+USERNAME_KEY = 'api:username:{}'
+GROUP_KEY = 'api:group:{}'
+
+
+class ApiError(Exception):
+    def __init__(self, detail, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def api_view(view):
+    """Превращает ApiError в JSON-ответ с нужным статусом."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'detail': error.detail}, status=error.status)
+    return wrapper
+
+
+def requested_fields(request, allowed=POST_FIELDS):
+    """Разбирает ?fields=id,text,author; без параметра — все поля."""
+    fields = request.GET.get('fields')
+    if not fields:
+        return allowed
+    fields = tuple(field.strip() for field in fields.split(',') if field)
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.LIMIT_POST))
+    except ValueError:
+        raise ApiError('Некорректный limit')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def load_cached(ids, key, queryset):
+    """Читает объекты по id из кэша через get_many, а промахи — одним
+    IN-запросом, и кладёт их в кэш."""
+    keys = {key.format(object_id): object_id for object_id in set(ids)}
+    found = {
+        keys[cache_key]: row
+        for cache_key, row in cache.get_many(list(keys)).items()
+    }
+    missing = set(keys.values()) - set(found)
+    if missing:
+        loaded = {row['id']: row for row in queryset.filter(id__in=missing)}
+        cache.set_many(
+            {key.format(object_id): row for object_id, row in loaded.items()},
+            OBJECT_CACHE_TIMEOUT,
+        )
+        found.update(loaded)
+    return found
+
+
+def load_users(ids):
+    return load_cached(
+        ids, USER_KEY, User.objects.values(*AUTHOR_FIELDS, 'is_active')
+    )
+
+
+def load_groups(ids):
+    return load_cached(ids, GROUP_KEY, Group.objects.values(
+        'id', 'slug', 'title'
+    ))
+
+
+def load_posts(ids):
+    return load_cached(ids, POST_KEY, post_rows(Post.objects.all()))
+
+
+def forget_object(key, object_id):
+    cache.delete(key.format(object_id))
+
+
+def public_author(author):
+    return author and {field: author[field] for field in AUTHOR_FIELDS}
+
+
+def serialize_posts(rows, fields):
+    """Собирает посты из строк .values() и встраивает авторов и группы.
+
+    Авторы и группы читаются из кэша объектов, промахи догружаются
+    одним запросом на модель.
+    """
+    authors = {}
+    groups = {}
+    if 'author' in fields:
+        authors = load_users(row['author_id'] for row in rows)
+    if 'group' in fields:
+        groups = load_groups(
+            row['group_id'] for row in rows if row['group_id']
+        )
+    results = []
+    for row in rows:
+        item = {}
+        for field in fields:
+            if field == 'author':
+                item['author'] = public_author(authors.get(row['author_id']))
+            elif field == 'group':
+                item['group'] = groups.get(row['group_id'])
+            elif field == 'image':
+                item['image'] = row['image'] and default_storage.url(
+                    row['image']
+                )
+            else:
+                item[field] = row[field]
+        results.append(item)
+    return results
+
+
+def post_rows(posts):
+    return posts.values(
+        'id', 'text', 'pub_date', 'author_id', 'group_id', 'image'
+    )
+
+
+def post_page(request, posts):
+    """Страница постов с курсорной пагинацией по (pub_date, id)."""
+    fields = requested_fields(request)
+    limit = page_limit(request)
+    posts = posts.order_by('-pub_date', '-id')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        cursor = decode_cursor(cursor)
+        if cursor is None:
+            raise ApiError('Некорректный курсор')
+        pub_date, post_id = cursor
+        posts = posts.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=post_id)
+        )
+    rows = list(post_rows(posts)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['pub_date'], rows[-1]['id'])
+    return JsonResponse({
+        'results': serialize_posts(rows, fields),
+        'next': next_cursor,
+    })
+
+
+def get_or_error(queryset, **lookup):
+    row = queryset.filter(**lookup).first()
+    if row is None:
+        raise ApiError('Не найдено', HTTPStatus.NOT_FOUND)
+    return row
+
+
+@api_view
+@conditional_page(index_scopes)
+def posts_list(request):
+    return post_page(request, Post.objects.all())
+
+
+@api_view
+@conditional_page(post_scopes)
+def post_item(request, post_id):
+    fields = requested_fields(request)
+    row = get_or_error(post_rows(Post.objects.all()), id=post_id)
+    return JsonResponse(serialize_posts([row], fields)[0])
+
+
+@api_view
+@conditional_page(lambda request: ['groups'])
+def groups_list(request):
+    fields = requested_fields(request, GROUP_FIELDS)
+    return JsonResponse({
+        'results': list(Group.objects.order_by('title').values(*fields)),
+    })
+
+
+@api_view
+@conditional_page(group_scopes)
+def group_posts(request, slug):
+    group = get_or_error(Group.objects.values('id'), slug=slug)
+    return post_page(request, Post.objects.filter(group_id=group['id']))
+
+
+@api_view
+@conditional_page(profile_scopes)
+def profile(request, username):
+    author = get_or_error(User.objects.values(*AUTHOR_FIELDS),
+                          username=username)
+    author.update(
+        posts_count=Post.objects.filter(author_id=author['id']).count(),
+        followers_count=follow_graph.followers_count(author['id']),
+        following_count=follow_graph.following_count(author['id']),
+    )
+    return JsonResponse(author)
+
+
+@api_view
+@conditional_page(profile_scopes)
+def profile_posts(request, username):
+    author = get_or_error(User.objects.values('id'), username=username)
+    return post_page(request, Post.objects.filter(author_id=author['id']))
+
+
+def follow_scopes(request):
+    return ['posts', f'author:{request.user.id}']
+
+
+@api_view
+@conditional_page(follow_scopes)
+def follow_posts(request):
+    if not request.user.is_authenticated:
+        raise ApiError('Требуется авторизация', HTTPStatus.UNAUTHORIZED)
+    return post_page(
+        request, Post.objects.filter(author__following__user=request.user)
+    )
+
+
+def parse_batch(request, name):
+    values = [value for value in request.GET.get(name, '').split(',') if value]
+    if len(values) > BATCH_LIMIT:
+        raise ApiError(f'Не больше {BATCH_LIMIT} значений в {name}')
+    return list(dict.fromkeys(values))
+
+
+def batch_posts(values, fields):
+    results = {}
+    ids = {}
+    for value in values:
+        if value.isdigit():
+            ids[int(value)] = value
+        else:
+            results[value] = {'error': 'invalid'}
+    posts = load_posts(ids)
+    authors = load_users(post['author_id'] for post in posts.values())
+    visible = []
+    for post_id, value in ids.items():
+        post = posts.get(post_id)
+        if post is None:
+            results[value] = {'error': 'not_found'}
+        elif not authors.get(post['author_id'], {}).get('is_active'):
+            results[value] = {'error': 'forbidden'}
+        else:
+            visible.append(post)
+    for post in serialize_posts(visible, fields):
+        results[str(post.get('id', ''))] = post
+    return results
+
+
+def batch_users(usernames):
+    keys = {USERNAME_KEY.format(username): username for username in usernames}
+    user_ids = cache.get_many(list(keys)).values()
+    users = {
+        user['username']: user for user in load_users(user_ids).values()
+    }
+    missing = set(usernames) - set(users)
+    if missing:
+        loaded = User.objects.filter(username__in=missing).values(
+            *AUTHOR_FIELDS, 'is_active'
+        )
+        for user in loaded:
+            users[user['username']] = user
+        cache.set_many({
+            USERNAME_KEY.format(user['username']): user['id']
+            for user in loaded
+        }, OBJECT_CACHE_TIMEOUT)
+    results = {}
+    for username in usernames:
+        user = users.get(username)
+        if user is None:
+            results[username] = {'error': 'not_found'}
+        elif not user['is_active']:
+            results[username] = {'error': 'forbidden'}
+        else:
+            results[username] = public_author(user)
+    return results
+
+
+@api_view
+def batch(request):
+    """Возвращает сразу много постов (?posts=1,2) и пользователей
+    (?users=a,b); ненайденные и скрытые отмечаются по отдельности."""
+    post_values = parse_batch(request, 'posts')
+    usernames = parse_batch(request, 'users')
+    fields = requested_fields(request)
+    if post_values and 'id' not in fields:
+        fields = ('id', *fields)
+    return JsonResponse({
+        'posts': batch_posts(post_values, fields),
+        'users': batch_users(usernames),
+    })
+
+
+@api_view
+def follow_bulk(request):
+    """POST подписывает, DELETE отписывает от авторов из тела
+    {"usernames": [...]}; в ответе — сколько подписок изменилось."""
+    if not request.user.is_authenticated:
+        raise ApiError('Требуется авторизация', HTTPStatus.UNAUTHORIZED)
+    if request.method not in ('POST', 'DELETE'):
+        raise ApiError('Метод не поддерживается',
+                       HTTPStatus.METHOD_NOT_ALLOWED)
+    try:
+        usernames = json.loads(request.body)['usernames']
+    except (ValueError, KeyError, TypeError):
+        raise ApiError('Ожидается JSON вида {"usernames": [...]}')
+    if not isinstance(usernames, list) or len(usernames) > BATCH_LIMIT:
+        raise ApiError(f'Ожидается список до {BATCH_LIMIT} имён')
+    authors = dict(User.objects.filter(
+        username__in=usernames
+    ).values_list('username', 'id'))
+    if request.method == 'POST':
+        changed = follow(request.user.id, authors.values())
+    else:
+        changed = unfollow(request.user.id, author_id__in=authors.values())
+    return JsonResponse({
+        'changed': changed,
+        'unknown': [name for name in usernames if name not in authors],
+    })
+
+
+@api_view
+def autocomplete_view(request):
+    """Пользователи и группы, имя, название или адрес которых начинается
+    с ?q=; ответ строится по индексу в памяти без запросов к базе."""
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        raise ApiError('Некорректный limit')
+    limit = max(1, min(limit, AUTOCOMPLETE_LIMIT))
+    return JsonResponse(
+        {'results': autocomplete.search(request.GET.get('q', ''), limit)}
+    )
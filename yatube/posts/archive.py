@@ -0,0 +1,60 @@
+from django.shortcuts import get_object_or_404
+
+from .models import ArchivedPost, Comment, Post
+from .utils import FEED_DEFERRED
+
+
+class ChainedPosts:
+    """Последовательность для Paginator: сначала посты из горячей таблицы,
+    за ними архивные. Архив запрашивается, только когда срез до него
+    доходит."""
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+        self.counts = [None] * len(querysets)
+
+    def _count(self, index):
+        if self.counts[index] is None:
+            self.counts[index] = self.querysets[index].count()
+        return self.counts[index]
+
+    def count(self):
+        return sum(self._count(index) for index in range(len(self.querysets)))
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        items = []
+        for index, queryset in enumerate(self.querysets):
+            if stop is not None and stop <= 0:
+                break
+            count = self._count(index)
+            if start < count:
+                items.extend(queryset[start:stop])
+            start = max(start - count, 0)
+            stop = None if stop is None else stop - count
+        return items
+
+
+def author_posts(author):
+    return ChainedPosts(
+        author.posts.select_related('group').defer(*FEED_DEFERRED),
+        author.archived_posts.select_related('group').defer(*FEED_DEFERRED),
+    )
+
+
+def get_post(post_id):
+    """Возвращает пост и его комментарии, при необходимости из архива."""
+    post = Post.objects.select_related('author', 'group').filter(
+        id=post_id
+    ).first()
+    if post is not None:
+        return post, Comment.objects.filter(post_id=post_id)
+    post = get_object_or_404(
+        ArchivedPost.objects.select_related('author', 'group'), id=post_id
+    )
+    return post, post.comments.select_related('author')
@@ -0,0 +1,146 @@
+from bisect import bisect_left, insort
+
+from django.urls import reverse
+
+from core.versioned import VersionedIndex
+
+VERSION_KEY = 'posts:autocomplete:version'
+USER = 'user'
+GROUP = 'group'
+
+
+def normalize(term):
+    return term.strip().lower()
+
+
+def user_terms(username):
+    return {normalize(username)}
+
+
+def group_terms(title, slug):
+    """Группа ищется по названию целиком, по каждому его слову и по
+    адресу."""
+    title = normalize(title)
+    return {title, *title.split(), normalize(slug)}
+
+
+class PrefixIndex:
+    """Отсортированный список (термин, тип, id) для поиска по префиксу
+    двоичным поиском."""
+
+    def __init__(self, items=()):
+        self.build(items)
+
+    def build(self, items):
+        """Строит индекс из (тип, id, подпись, термины)."""
+        self.labels = {}
+        self.terms = {}
+        entries = []
+        for kind, object_id, label, terms in items:
+            self.labels[kind, object_id] = label
+            self.terms[kind, object_id] = terms
+            entries.extend((term, kind, object_id) for term in terms)
+        entries.sort()
+        self.entries = entries
+
+    def put(self, kind, object_id, label, terms):
+        self.remove(kind, object_id)
+        self.labels[kind, object_id] = label
+        self.terms[kind, object_id] = terms
+        for term in terms:
+            insort(self.entries, (term, kind, object_id))
+
+    def remove(self, kind, object_id):
+        self.labels.pop((kind, object_id), None)
+        for term in self.terms.pop((kind, object_id), ()):
+            index = bisect_left(self.entries, (term, kind, object_id))
+            if (index < len(self.entries)
+                    and self.entries[index] == (term, kind, object_id)):
+                del self.entries[index]
+
+    def search(self, prefix, limit):
+        """Первые limit объектов, у которых есть термин с префиксом prefix,
+        в порядке терминов: точное совпадение идёт раньше продолжений."""
+        found = {}
+        entries = self.entries
+        index = bisect_left(entries, (prefix,))
+        while index < len(entries) and len(found) < limit:
+            term, kind, object_id = entries[index]
+            if not term.startswith(prefix):
+                break
+            found.setdefault((kind, object_id), self.labels[kind, object_id])
+            index += 1
+        return [
+            (kind, object_id, label)
+            for (kind, object_id), label in found.items()
+        ]
+
+
+class Autocomplete(VersionedIndex):
+    """Префиксный индекс активных пользователей и групп в памяти
+    процесса."""
+
+    version_key = VERSION_KEY
+
+    def __init__(self):
+        super().__init__()
+        self.index = PrefixIndex()
+
+    def build(self):
+        from .models import Group, User
+
+        users = User.objects.filter(is_active=True).values_list(
+            'id', 'username'
+        )
+        groups = Group.objects.values_list('id', 'title', 'slug')
+        return {'index': PrefixIndex([
+            *((USER, user_id, (username, username), user_terms(username))
+              for user_id, username in users.iterator()),
+            *((GROUP, group_id, (title, slug), group_terms(title, slug))
+              for group_id, title, slug in groups.iterator()),
+        ])}
+
+    def apply(self, delta):
+        method, *args = delta
+        getattr(self.index, method)(*args)
+
+    def _change(self, method, *args):
+        self._apply((method, *args))
+
+    def put_user(self, user_id, username, is_active=True):
+        if not is_active:
+            return self.remove_user(user_id)
+        self._change(
+            'put', USER, user_id, (username, username), user_terms(username)
+        )
+
+    def remove_user(self, user_id):
+        self._change('remove', USER, user_id)
+
+    def put_group(self, group_id, title, slug):
+        self._change(
+            'put', GROUP, group_id, (title, slug), group_terms(title, slug)
+        )
+
+    def remove_group(self, group_id):
+        self._change('remove', GROUP, group_id)
+
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            matches = self._fresh().index.search(prefix, limit)
+        results = []
+        for kind, object_id, (name, slug) in matches:
+            if kind == USER:
+                url = reverse('posts:profile', args=[slug])
+            else:
+                url = reverse('posts:group_list', args=[slug])
+            results.append(
+                {'type': kind, 'id': object_id, 'name': name, 'url': url}
+            )
+        return results
+
+
+autocomplete = Autocomplete()
@@ -0,0 +1,17 @@
+from outbox.log import consumer, topic_of
+from outbox.models import OutboxEvent
+
+from .models import Post
+from .related import update
+
+
+@consumer('related_posts', topics=[topic_of(Post)])
+def related_posts(events):
+    """Пересчитывает похожие посты для новых и изменённых постов;
+    удалённые уходят из таблицы каскадом."""
+    changed = {
+        event.object_id for event in events
+        if event.action in (OutboxEvent.CREATED, OutboxEvent.UPDATED)
+    }
+    if changed:
+        update(changed)
@@ -0,0 +1,150 @@
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .freshness import conditional_page, markers
+from .models import Group, Post, User
+from .views import group_scopes, index_scopes, profile_scopes
+
+FEED_ITEMS = 20
+FEED_KEY = 'posts:feed:{}'
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class PostsFeed(Feed):
+    """Последние FEED_ITEMS постов с готовым HTML из text_html."""
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).select_related('author').prefetch_related(
+            'post_tags__tag'
+        )[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return Truncator(item.text).chars(80)
+
+    def item_description(self, item):
+        return item.html
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.id])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [post_tag.tag.name for post_tag in item.post_tags.all()]
+
+
+class IndexFeed(PostsFeed):
+    def title(self, obj):
+        return 'Yatube: последние записи'
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def description(self, obj):
+        return 'Новые записи всех авторов'
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def description(self, obj):
+        return obj.description
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def description(self, obj):
+        return f'Записи пользователя {obj.username}'
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class IndexAtomFeed(AtomMixin, IndexFeed):
+    pass
+
+
+class GroupAtomFeed(AtomMixin, GroupFeed):
+    pass
+
+
+class AuthorAtomFeed(AtomMixin, AuthorFeed):
+    pass
+
+
+def cached_feed(feed, scopes_func):
+    """Отдаёт ленту с ETag и Last-Modified по версиям её областей.
+
+    Готовый XML хранится в кэше под ключом из этих версий, поэтому лента
+    рендерится один раз на изменение, а опросы без изменений получают 304.
+    """
+    def scopes(request, *args, **kwargs):
+        request._feed_scopes = scopes_func(request, *args, **kwargs)
+        return request._feed_scopes
+
+    @conditional_page(scopes)
+    def view(request, *args, **kwargs):
+        found = getattr(request, '_feed_scopes', None)
+        if not found:
+            return feed(request, *args, **kwargs)
+        versions, _ = markers(['site', *found])
+        raw = '|'.join([
+            type(feed).__name__, request.get_host(), request.path,
+            *map(str, versions),
+        ])
+        key = FEED_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, *args, **kwargs)
+            cached = response.content, response['Content-Type']
+            cache.set(key, cached, FEED_CACHE_TIMEOUT)
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+    return view
+
+
+index_rss = cached_feed(IndexFeed(), index_scopes)
+index_atom = cached_feed(IndexAtomFeed(), index_scopes)
+group_rss = cached_feed(GroupFeed(), group_scopes)
+group_atom = cached_feed(GroupAtomFeed(), group_scopes)
+profile_rss = cached_feed(AuthorFeed(), profile_scopes)
+profile_atom = cached_feed(AuthorAtomFeed(), profile_scopes)
@@ -0,0 +1,132 @@
+import re
+import zlib
+
+import numpy as np
+
+TOKEN_RE = re.compile(r'\w+')
+BANDS = 6
+ROWS = 3
+PRIME = (1 << 31) - 1
+SIMILARITY = 0.7
+MAX_CANDIDATES = 20
+WINDOW = 16
+
+# Параметры хеш-функций a * x + b mod PRIME; менять их можно только вместе
+# с RENDER_VERSION, иначе старые полосы перестанут совпадать с новыми.
+_generator = np.random.RandomState(20221030)
+MULTIPLIERS = _generator.randint(
+    1, PRIME, size=BANDS * ROWS, dtype=np.int64
+).astype(np.uint64)
+OFFSETS = _generator.randint(
+    0, PRIME, size=BANDS * ROWS, dtype=np.int64
+).astype(np.uint64)
+BAND_FIELDS = tuple(f'minhash_band{band}' for band in range(BANDS))
+
+
+def words(text):
+    return set(TOKEN_RE.findall(text.lower()))
+
+
+def signature(text):
+    """MinHash множества слов текста или None для текста без слов.
+
+    Доля совпадающих позиций двух подписей оценивает коэффициент
+    Жаккара множеств слов.
+    """
+    features = words(text)
+    if not features:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(word.encode()) & PRIME for word in features),
+        dtype=np.uint64, count=len(features),
+    )
+    return (
+        (MULTIPLIERS[:, None] * hashes[None, :] + OFFSETS[:, None]) % PRIME
+    ).min(axis=1)
+
+
+def band_values(signatures):
+    """Сворачивает каждые ROWS значений подписи в одно число полосы.
+
+    Тексты с коэффициентом Жаккара J совпадают хотя бы в одной полосе с
+    вероятностью 1 - (1 - J ** ROWS) ** BANDS: около 0.99 для J = 0.8 и
+    около 0.15 для J = 0.3.
+    """
+    rows = np.asarray(signatures, dtype=np.uint64).reshape(-1, BANDS, ROWS)
+    values = np.zeros(rows.shape[:2], dtype=np.uint64)
+    for row in range(ROWS):
+        values = (values * MULTIPLIERS[row] + rows[:, :, row]) % PRIME
+    return values
+
+
+def fingerprint_fields(text):
+    value = signature(text)
+    if value is None:
+        return dict.fromkeys(BAND_FIELDS)
+    return dict(zip(BAND_FIELDS, band_values(value)[0].tolist()))
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def find_duplicate(text, queryset, exclude_id=None):
+    """id самого раннего почти совпадающего поста или None.
+
+    Кандидаты ищутся равенством по индексированным полосам, а сходство
+    проверяется точно только для них.
+    """
+    fields = fingerprint_fields(text)
+    if fields[BAND_FIELDS[0]] is None:
+        return None
+    query = None
+    for field, value in fields.items():
+        condition = queryset.filter(**{field: value})
+        query = condition if query is None else query | condition
+    candidates = query.exclude(id=exclude_id).order_by('id').values_list(
+        'id', 'text'
+    )[:MAX_CANDIDATES]
+    features = words(text)
+    for post_id, candidate in candidates:
+        if jaccard(features, words(candidate)) >= SIMILARITY:
+            return post_id
+    return None
+
+
+def cluster(ids, signatures):
+    """Группирует посты с похожими подписями.
+
+    Внутри каждой полосы посты сортируются по значению полосы и id и
+    сравниваются с WINDOW соседями, поэтому даже огромные группы
+    одинаковых текстов обрабатываются за линейное время. Возвращает
+    корень группы для каждого поста — самый маленький id в ней.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    signatures = np.asarray(signatures, dtype=np.uint64).reshape(
+        -1, BANDS * ROWS
+    )
+    keys = band_values(signatures)
+    parent = np.arange(len(ids))
+
+    def root(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for band in range(BANDS):
+        order = np.lexsort((ids, keys[:, band]))
+        for shift in range(1, WINDOW + 1):
+            first, second = order[:-shift], order[shift:]
+            close = (keys[first, band] == keys[second, band]) & (
+                (signatures[first] == signatures[second]).mean(axis=1)
+                >= SIMILARITY
+            )
+            for left, right in zip(first[close], second[close]):
+                left, right = root(left), root(right)
+                if left != right:
+                    parent[max(left, right)] = min(left, right)
+    roots = np.array([root(node) for node in range(len(ids))], dtype=int)
+    return ids[roots]
@@ -0,0 +1,185 @@
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from core.versioned import VersionedIndex
+
+VERSION_KEY = 'posts:follow_graph:version'
+COMPACT_THRESHOLD = 1024
+
+
+class Adjacency:
+    """Списки смежности в формате CSR с журналом последних изменений."""
+
+    def __init__(self, pairs=()):
+        self.build(pairs)
+
+    def build(self, pairs):
+        """Строит индекс из пар (source, target), отсортированных по паре."""
+        nodes = array('q')
+        offsets = array('q', [0])
+        targets = array('q')
+        last = None
+        for source, target in pairs:
+            if source != last:
+                if last is not None:
+                    offsets.append(len(targets))
+                nodes.append(source)
+                last = source
+            targets.append(target)
+        if last is not None:
+            offsets.append(len(targets))
+        self.nodes = nodes
+        self.offsets = offsets
+        self.targets = targets
+        self._added = defaultdict(set)
+        self._removed = defaultdict(set)
+        self._pending = 0
+
+    def _row(self, source):
+        index = bisect_left(self.nodes, source)
+        if index < len(self.nodes) and self.nodes[index] == source:
+            return self.offsets[index], self.offsets[index + 1]
+        return 0, 0
+
+    def _in_base(self, source, target):
+        low, high = self._row(source)
+        index = bisect_left(self.targets, target, low, high)
+        return index < high and self.targets[index] == target
+
+    def contains(self, source, target):
+        if target in self._added.get(source, ()):
+            return True
+        if target in self._removed.get(source, ()):
+            return False
+        return self._in_base(source, target)
+
+    def contains_many(self, source, targets):
+        return {target for target in targets if self.contains(source, target)}
+
+    def neighbours(self, source):
+        low, high = self._row(source)
+        row = self.targets[low:high]
+        added = self._added.get(source)
+        removed = self._removed.get(source)
+        if not added and not removed:
+            return row.tolist()
+        return sorted(set(row).difference(removed or ()).union(added or ()))
+
+    def degree(self, source):
+        low, high = self._row(source)
+        return (
+            high - low
+            + len(self._added.get(source, ()))
+            - len(self._removed.get(source, ()))
+        )
+
+    def add(self, source, target):
+        self._removed[source].discard(target)
+        if not self._in_base(source, target):
+            self._added[source].add(target)
+        self._changed()
+
+    def remove(self, source, target):
+        self._added[source].discard(target)
+        if self._in_base(source, target):
+            self._removed[source].add(target)
+        self._changed()
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self):
+        """Вливает журнал изменений в основные массивы."""
+        sources = sorted(set(self.nodes).union(self._added))
+        self.build([
+            (source, target)
+            for source in sources
+            for target in self.neighbours(source)
+        ])
+
+
+class FollowGraph(VersionedIndex):
+    """Граф подписок в памяти процесса в обоих направлениях."""
+
+    version_key = VERSION_KEY
+
+    def __init__(self):
+        super().__init__()
+        self.following = Adjacency()
+        self.followers = Adjacency()
+
+    def build(self):
+        from .models import Follow
+
+        follows = Follow.objects.values_list('user_id', 'author_id')
+        return {
+            'following': Adjacency(
+                follows.order_by('user_id', 'author_id').iterator()
+            ),
+            'followers': Adjacency(
+                follows.order_by('author_id', 'user_id').values_list(
+                    'author_id', 'user_id'
+                ).iterator()
+            ),
+        }
+
+    def apply(self, delta):
+        action, pairs = delta
+        for user_id, author_id in pairs:
+            getattr(self.following, action)(user_id, author_id)
+            getattr(self.followers, action)(author_id, user_id)
+
+    def add_many(self, pairs):
+        """Добавляет пары (подписчик, автор) как одно изменение версии."""
+        self._apply(('add', [tuple(pair) for pair in pairs]))
+
+    def remove_many(self, pairs):
+        self._apply(('remove', [tuple(pair) for pair in pairs]))
+
+    def add(self, user_id, author_id):
+        self.add_many([(user_id, author_id)])
+
+    def remove(self, user_id, author_id):
+        self.remove_many([(user_id, author_id)])
+
+    def is_following(self, user_id, author_id):
+        return self._fresh().following.contains(user_id, author_id)
+
+    def is_mutual(self, user_id, other_id):
+        graph = self._fresh()
+        return (
+            graph.following.contains(user_id, other_id)
+            and graph.following.contains(other_id, user_id)
+        )
+
+    def following_many(self, user_id, author_ids):
+        """Возвращает множество авторов из author_ids, на которых подписан
+        пользователь."""
+        return self._fresh().following.contains_many(user_id, author_ids)
+
+    def followers_among(self, author_ids, user_ids):
+        """Для каждого автора — кто из user_ids на него подписан; граф
+        проверяется на свежесть один раз на весь вызов."""
+        followers = self._fresh().followers
+        return {
+            author_id: followers.contains_many(author_id, user_ids)
+            for author_id in author_ids
+        }
+
+    def following_of(self, user_id):
+        return self._fresh().following.neighbours(user_id)
+
+    def followers_of(self, author_id):
+        return self._fresh().followers.neighbours(author_id)
+
+    def following_count(self, user_id):
+        return self._fresh().following.degree(user_id)
+
+    def followers_count(self, author_id):
+        return self._fresh().followers.degree(author_id)
+
+
+follow_graph = FollowGraph()
@@ -0,0 +1,88 @@
+from django.db import connections, router, transaction
+from django.dispatch import Signal
+
+from outbox.log import record_many, topic_of
+from outbox.models import OutboxEvent
+
+from .models import Follow
+
+# Пакетные аналоги post_save и post_delete для подписок: один сигнал на
+# вызов со всеми авторами, чтобы граф, уведомления и версии страниц
+# обновлялись одной операцией, а не по строке.
+followed = Signal(providing_args=['user_id', 'author_ids'])
+unfollowed = Signal(providing_args=['user_id', 'author_ids'])
+
+
+def follow(user_id, author_ids):
+    """Подписывает пользователя на авторов и возвращает число новых
+    подписок.
+
+    Строки вставляются одним INSERT ... ON CONFLICT DO NOTHING, который
+    возвращает только действительно добавленные; журнал изменений и
+    сигнал followed получают ровно их.
+    """
+    author_ids = sorted(set(author_ids) - {user_id})
+    if not author_ids:
+        return 0
+    using = router.db_for_write(Follow)
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    sql = (
+        'INSERT INTO %s (%s, %s) VALUES %s '
+        'ON CONFLICT DO NOTHING RETURNING %s, %s'
+    ) % (
+        quote_name(Follow._meta.db_table), quote_name('user_id'),
+        quote_name('author_id'), ', '.join(['(%s, %s)'] * len(author_ids)),
+        quote_name('id'), quote_name('author_id'),
+    )
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(sql, [
+            value for author_id in author_ids for value in (user_id, author_id)
+        ])
+        created = cursor.fetchall()
+        if created:
+            record_many(topic_of(Follow), OutboxEvent.CREATED, (
+                (follow_id, {'user_id': user_id, 'author_id': author_id})
+                for follow_id, author_id in created
+            ))
+            followed.send(
+                sender=Follow, user_id=user_id,
+                author_ids=[author_id for _, author_id in created],
+            )
+    return len(created)
+
+
+def unfollow(user_id, **lookup):
+    """Удаляет подписки пользователя, подходящие под lookup, и возвращает
+    число удалённых строк.
+
+    Строки удаляются одним DELETE по id без Collector: на подписки ничто
+    не ссылается. RETURNING отдаёт только удалённые этим вызовом строки,
+    поэтому параллельная отписка не попадёт в журнал дважды.
+    """
+    using = router.db_for_write(Follow)
+    ids = list(Follow.objects.using(using).filter(
+        user_id=user_id, **lookup
+    ).values_list('id', flat=True))
+    if not ids:
+        return 0
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    sql = 'DELETE FROM %s WHERE %s IN (%s) RETURNING %s, %s' % (
+        quote_name(Follow._meta.db_table), quote_name('id'),
+        ', '.join(['%s'] * len(ids)), quote_name('id'),
+        quote_name('author_id'),
+    )
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(sql, ids)
+        deleted = cursor.fetchall()
+        if deleted:
+            record_many(topic_of(Follow), OutboxEvent.DELETED, (
+                (follow_id, {'user_id': user_id, 'author_id': author_id})
+                for follow_id, author_id in deleted
+            ))
+            unfollowed.send(
+                sender=Follow, user_id=user_id,
+                author_ids=[author_id for _, author_id in deleted],
+            )
+    return len(deleted)
@@ -0,0 +1,100 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from core.versioned import seed
+
+VERSION_KEY = 'posts:freshness:version:{}'
+CHANGED_KEY = 'posts:freshness:changed:{}'
+
+
+def bump(*scopes):
+    """Отмечает изменение областей: даёт им новые версии и время изменения
+    одним set_many. Версия только сравнивается на равенство, поэтому
+    вместо incr по ключу берётся случайное значение."""
+    if not scopes:
+        return
+    now = timezone.now()
+    values = {}
+    for scope in scopes:
+        values[VERSION_KEY.format(scope)] = uuid.uuid4().hex
+        values[CHANGED_KEY.format(scope)] = now
+    cache.set_many(values, None)
+
+
+def markers(scopes):
+    """Возвращает версии областей и время последнего изменения среди них."""
+    keys = {
+        scope: (VERSION_KEY.format(scope), CHANGED_KEY.format(scope))
+        for scope in scopes
+    }
+    found = cache.get_many([key for pair in keys.values() for key in pair])
+    now = timezone.now().replace(microsecond=0)
+    versions = []
+    changed = []
+    for version_key, changed_key in keys.values():
+        for key, default, result in (
+            (version_key, seed(), versions),
+            (changed_key, now, changed),
+        ):
+            value = found.get(key)
+            if value is None:
+                cache.add(key, default, None)
+                value = default
+            result.append(value)
+    return versions, max(changed)
+
+
+def viewer_scopes(request):
+    if request.user.is_authenticated:
+        return [f'viewer:{request.user.id}']
+    return []
+
+
+def conditional_page(scopes_func):
+    """Отдаёт 304 Not Modified, пока не изменились области страницы.
+
+    scopes_func(request, *args, **kwargs) возвращает список областей
+    страницы или None, если валидаторы посчитать нельзя. ETag учитывает
+    сессию пользователя, поэтому личные страницы не смешиваются.
+    """
+    def get_markers(request, *args, **kwargs):
+        if not hasattr(request, '_freshness_markers'):
+            scopes = scopes_func(request, *args, **kwargs)
+            request._freshness_markers = None if scopes is None else markers(
+                ['site', *scopes, *viewer_scopes(request)]
+            )
+        return request._freshness_markers
+
+    def etag_func(request, *args, **kwargs):
+        found = get_markers(request, *args, **kwargs)
+        if found is None:
+            return None
+        viewer = 'anonymous'
+        if request.user.is_authenticated:
+            viewer = request.session.session_key
+        raw = '|'.join(
+            [request.get_full_path(), viewer, *map(str, found[0])]
+        )
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        found = get_markers(request, *args, **kwargs)
+        return None if found is None else found[1]
+
+    def decorator(view):
+        conditional_view = condition(etag_func, last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True)
+            return response
+        return wrapper
+    return decorator
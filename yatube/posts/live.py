@@ -0,0 +1,185 @@
+import json
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+
+from outbox.log import find_missing, read, topic_of
+from outbox.models import OutboxEvent
+
+from .follow_graph import follow_graph
+from .models import Post
+
+TOPICS = [topic_of(Post)]
+POLL_BATCH = 500
+BACKLOG = 100
+BACKLOG_SCAN = 1000
+QUEUE_SIZE = 100
+RETRY_MS = 5000
+
+
+class Subscriber:
+    """Очередь событий одного клиента; с user_id в неё попадают только
+    посты авторов, на которых он подписан."""
+
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = False
+
+
+class Broadcaster:
+    """Один поток на процесс читает из журнала изменений новые события
+    постов и раздаёт их всем подписчикам; без подписчиков поток стоит.
+
+    Каждый поток клиента занимает синхронный воркер WSGI на время до
+    LIVE_STREAM_SECONDS, поэтому одновременно открыто не больше
+    LIVE_MAX_STREAMS потоков на процесс; остальные получают None.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.last_id = 0
+        self.missing = []
+        self.thread = None
+
+    def subscribe(self, user_id=None):
+        subscriber = Subscriber(user_id)
+        with self.lock:
+            if len(self.subscribers) >= settings.LIVE_MAX_STREAMS:
+                return None
+            if self.thread is None:
+                self.last_id = OutboxEvent.objects.aggregate(
+                    last_id=Max('id')
+                )['last_id'] or 0
+                self.missing = []
+                self.thread = threading.Thread(
+                    target=self.run, name='live-feed', daemon=True
+                )
+                self.thread.start()
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def poll(self):
+        """Читает новые события и события с пропущенными ранее id, чья
+        транзакция зафиксировалась позже, и раздаёт их подписчикам.
+        Видимость для ленты подписок решается одним обращением к графу на
+        всю пачку, а не по клиенту."""
+        events = [
+            event_dict(event)
+            for event in read(self.last_id, TOPICS, POLL_BATCH, self.missing)
+        ]
+        last_id = max([self.last_id, *(event['id'] for event in events)])
+        if last_id != self.last_id or self.missing:
+            self.missing = find_missing(self.last_id, last_id, self.missing)
+            self.last_id = last_id
+        if not events:
+            return events
+        with self.lock:
+            subscribers = list(self.subscribers)
+        user_ids = {subscriber.user_id for subscriber in subscribers
+                    if subscriber.user_id is not None}
+        readers = user_ids and follow_graph.followers_among(
+            {event['author'] for event in events}, user_ids
+        )
+        for subscriber in subscribers:
+            batch = events
+            if subscriber.user_id is not None:
+                batch = [event for event in events
+                         if subscriber.user_id in readers[event['author']]]
+            if not batch:
+                continue
+            try:
+                subscriber.queue.put_nowait(batch)
+            except queue.Full:
+                subscriber.dropped = True
+                self.unsubscribe(subscriber)
+        return events
+
+    def run(self):
+        try:
+            while True:
+                with self.lock:
+                    if not self.subscribers:
+                        self.thread = None
+                        return
+                self.poll()
+                time.sleep(settings.LIVE_POLL_INTERVAL)
+        finally:
+            connection.close()
+
+
+broadcaster = Broadcaster()
+
+
+def event_dict(event):
+    data = event.data
+    return {
+        'id': event.id,
+        'kind': event.action,
+        'post': event.object_id,
+        'author': data['author_id'],
+        'group': data['group_id'],
+    }
+
+
+def format_event(event, resumable=True):
+    """Событие SSE; без id клиент не сдвигает Last-Event-ID, так
+    отправляются события, зафиксированные позже уже отправленных."""
+    data = json.dumps({key: value for key, value in event.items()
+                       if key != 'id'})
+    event_id = f'id: {event["id"]}\n' if resumable else ''
+    return f'{event_id}event: post\ndata: {data}\n\n'
+
+
+def backlog(last_id, user_id=None):
+    events = [
+        event_dict(event) for event in read(last_id, TOPICS, BACKLOG_SCAN)
+    ]
+    if user_id is not None:
+        authors = follow_graph.following_many(
+            user_id, {event['author'] for event in events}
+        )
+        events = [event for event in events if event['author'] in authors]
+    return events[:BACKLOG]
+
+
+def event_stream(subscriber, last_id=None):
+    """Генератор text/event-stream: сначала пропущенные после Last-Event-ID
+    события из базы, затем новые от общего опросчика.
+
+    Отставший клиент отключается и догоняет по Last-Event-ID.
+    """
+    deadline = time.monotonic() + settings.LIVE_STREAM_SECONDS
+    sent = set()
+    seen = 0
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        if last_id is not None:
+            for event in backlog(last_id, subscriber.user_id):
+                sent.add(event['id'])
+                seen = event['id']
+                yield format_event(event)
+        while time.monotonic() < deadline and not subscriber.dropped:
+            try:
+                events = subscriber.queue.get(
+                    timeout=settings.LIVE_HEARTBEAT
+                )
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+            for event in events:
+                if event['id'] in sent:
+                    continue
+                yield format_event(event, event['id'] > seen)
+                seen = max(seen, event['id'])
+    finally:
+        broadcaster.unsubscribe(subscriber)
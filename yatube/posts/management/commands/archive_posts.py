@@ -0,0 +1,98 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.db import raw_delete
+from notifications.inbox import forget_unread, post_recipients
+from outbox.log import topic_of
+from outbox.models import OutboxEvent
+from posts.api import POST_KEY
+from posts.freshness import bump
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_FIELDS = (
+    'id', 'text', *ArchivedPost.rendered_fields, 'pub_date', 'author_id',
+    'group_id', 'image',
+)
+COMMENT_FIELDS = (
+    'id', 'post_id', 'author_id', 'text', *Comment.rendered_fields,
+    'created',
+)
+
+
+def archive_chunk(cutoff, chunk_size):
+    """Переносит в архив одну пачку постов старше cutoff вместе с
+    комментариями и возвращает перенесённые строки."""
+    with transaction.atomic():
+        rows = list(Post.objects.filter(pub_date__lt=cutoff).order_by(
+            'pub_date', 'id'
+        ).values(*POST_FIELDS)[:chunk_size])
+        if not rows:
+            return rows
+        ids = [row['id'] for row in rows]
+        ArchivedPost.objects.bulk_create(ArchivedPost(**row) for row in rows)
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**row) for row in Comment.objects.filter(
+                post_id__in=ids
+            ).values(*COMMENT_FIELDS)
+        )
+        recipients = post_recipients(ids)
+        raw_delete(Post.objects.filter(id__in=ids))
+        forget_unread(recipients)
+        OutboxEvent.objects.bulk_create(
+            OutboxEvent(
+                topic=topic_of(Post),
+                object_id=row['id'],
+                action=OutboxEvent.ARCHIVED,
+                payload=json.dumps({
+                    'author_id': row['author_id'],
+                    'group_id': row['group_id'],
+                }),
+            )
+            for row in rows
+        )
+        transaction.on_commit(lambda: forget(rows))
+    return rows
+
+
+def forget(rows):
+    cache.delete_many([POST_KEY.format(row['id']) for row in rows])
+    bump(
+        'posts',
+        *(f'post:{row["id"]}' for row in rows),
+        *{f'author:{row["author_id"]}' for row in rows},
+        *{f'group:{row["group_id"]}' for row in rows if row['group_id']},
+    )
+
+
+class Command(BaseCommand):
+    help = ('Переносит посты старше заданного возраста и их комментарии '
+            'в архивные таблицы небольшими транзакциями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POSTS_ARCHIVE_AFTER_DAYS
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.0,
+            help='Пауза между пачками, чтобы не держать базу занятой'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        total = 0
+        while True:
+            rows = archive_chunk(cutoff, options['chunk_size'])
+            if not rows:
+                break
+            total += len(rows)
+            self.stdout.write(f'Перенесено постов: {total}')
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Готово, в архиве: {total}'))
@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+
+from posts.models import Post
+from posts.utils import FEED_DEFERRED
+
+User = get_user_model()
+
+FULL_TEMPLATE = '{% for post in posts %}<p>{{ post.html }}</p>{% endfor %}'
+EXCERPT_TEMPLATE = (
+    '{% for post in posts %}<p>{{ post.excerpt }}</p>{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает страницу ленты с полным текстом постов и с готовым '
+            'началом текста: прочитанные байты, размер HTML и время.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument(
+            '--posts', type=int, default=0,
+            help='Создать столько временных постов (удаляются после замера)'
+        )
+        parser.add_argument('--length', type=int, default=5000)
+
+    def measure(self, name, queryset, template, columns, repeat):
+        template = engines['django'].from_string(template)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            posts = list(queryset[:settings.LIMIT_POST])
+            html = template.render({'posts': posts})
+        elapsed = (time.perf_counter() - started) / repeat
+        read = sum(
+            len(getattr(post, column).encode())
+            for post in posts for column in columns
+        )
+        self.stdout.write(
+            f'{name:<8} прочитано: {read:>9} Б  HTML: {len(html):>9} Б  '
+            f'время: {elapsed * 1000:>7.3f} мс'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['posts']:
+                author, _ = User.objects.get_or_create(username='bench-feed')
+                line = 'Длинный текст поста для замера ленты. '
+                text = (line * (options['length'] // len(line) + 1))[
+                    :options['length']
+                ]
+                for _ in range(options['posts']):
+                    Post.objects.create(author=author, text=text)
+            posts = Post.objects.select_related('group')
+            self.measure(
+                'полный', posts, FULL_TEMPLATE, FEED_DEFERRED,
+                options['repeat'],
+            )
+            self.measure(
+                'начало', posts.defer(*FEED_DEFERRED), EXCERPT_TEMPLATE,
+                ('excerpt_html',), options['repeat'],
+            )
+            transaction.set_rollback(True)
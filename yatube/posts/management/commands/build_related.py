@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from outbox.log import drain, reset
+from outbox.models import OutboxEvent
+from posts.related import CHUNK_SIZE, TOP_K, rebuild
+
+
+class Command(BaseCommand):
+    help = ('Полностью пересчитывает словарь TF-IDF и похожие посты. '
+            'Новые посты потом досчитывает потребитель related_posts '
+            'команды process_outbox.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--top', type=int, default=TOP_K)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        position = OutboxEvent.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        total = rebuild(options['chunk_size'], options['top'])
+        reset('related_posts', position)
+        drain('related_posts')
+        self.stdout.write(
+            f'Похожие посты для {total} постов за '
+            f'{time.perf_counter() - started:.2f} с'
+        )
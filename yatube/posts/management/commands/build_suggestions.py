@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import CHUNK_SIZE, TOP_K, build_suggestions
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рекомендации «на кого подписаться» по общим '
+            'подпискам пользователей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--top', type=int, default=TOP_K)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = build_suggestions(options['chunk_size'], options['top'])
+        self.stdout.write(
+            f'Рекомендации для {total} пользователей за '
+            f'{time.perf_counter() - started:.2f} с'
+        )
@@ -0,0 +1,63 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from posts.fingerprints import BANDS, ROWS, cluster, signature
+from posts.models import Post
+
+
+def load_signatures(chunk_size):
+    """Читает посты пачками по возрастанию id и считает их подписи; тексты
+    в памяти не копятся. Возвращает ids, подписи и текущие duplicate_of."""
+    ids, signatures, current = [], [], []
+    last_id = 0
+    while True:
+        chunk = list(Post.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).values_list('id', 'text', 'duplicate_of_id')[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        for post_id, text, duplicate_of in chunk:
+            value = signature(text)
+            if value is None:
+                continue
+            ids.append(post_id)
+            signatures.append(value)
+            current.append(duplicate_of or 0)
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(signatures, dtype=np.uint64).reshape(-1, BANDS * ROWS),
+        np.array(current, dtype=np.int64),
+    )
+
+
+def save_clusters(ids, current, roots, chunk_size):
+    """Записывает только изменившиеся ссылки duplicate_of, по одному
+    UPDATE на корень группы; возвращает число изменённых строк."""
+    wanted = np.where(roots == ids, 0, roots)
+    changed = np.flatnonzero(wanted != current)
+    for root in np.unique(wanted[changed]):
+        members = ids[changed[wanted[changed] == root]].tolist()
+        for start in range(0, len(members), chunk_size):
+            Post.objects.filter(
+                id__in=members[start:start + chunk_size]
+            ).update(duplicate_of_id=int(root) or None)
+    return len(changed)
+
+
+class Command(BaseCommand):
+    help = ('Группирует почти одинаковые посты по MinHash и отмечает в '
+            'каждой группе все посты, кроме самого раннего.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ids, signatures, current = load_signatures(options['chunk_size'])
+        roots = cluster(ids, signatures)
+        changed = save_clusters(ids, current, roots, options['chunk_size'])
+        duplicates = int((roots != ids).sum())
+        self.stdout.write(self.style.SUCCESS(
+            f'Постов: {len(ids)}, почти повторов: {duplicates}, '
+            f'изменено: {changed}'
+        ))
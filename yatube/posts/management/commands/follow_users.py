@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.follows import follow, unfollow
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Подписывает пользователя на авторов из списка или файла '
+            '(по имени в строке) и сообщает число новых подписок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('authors', nargs='*')
+        parser.add_argument('--file', help='Файл с именами авторов')
+        parser.add_argument('--unfollow', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_id = User.objects.filter(
+            username=options['username']
+        ).values_list('id', flat=True).first()
+        if user_id is None:
+            raise CommandError('Пользователь не найден')
+        names = list(options['authors'])
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as source:
+                names.extend(line.strip() for line in source if line.strip())
+        changed = unknown = 0
+        size = options['batch_size']
+        for start in range(0, len(names), size):
+            batch = names[start:start + size]
+            author_ids = list(User.objects.filter(
+                username__in=batch
+            ).values_list('id', flat=True))
+            unknown += len(set(batch)) - len(author_ids)
+            if options['unfollow']:
+                changed += unfollow(user_id, author_id__in=author_ids)
+            else:
+                changed += follow(user_id, author_ids)
+        self.stdout.write(f'Изменено подписок: {changed}, '
+                          f'не найдено авторов: {unknown}')
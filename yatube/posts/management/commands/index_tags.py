@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.freshness import bump
+from posts.tags import backfill
+
+
+class Command(BaseCommand):
+    help = ('Заново извлекает хештеги и упоминания из всех постов; нужна '
+            'для постов, сохранённых до появления индекса тегов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = backfill(options['chunk_size'])
+        if total:
+            bump('posts')
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано: {total}'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.freshness import bump
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+from posts.rendering import rerender
+
+
+class Command(BaseCommand):
+    help = ('Заново готовит HTML постов и комментариев, отрисованных '
+            'прошлой версией рендерера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed = 0
+        for model in (Post, Comment, ArchivedPost, ArchivedComment):
+            total = rerender(model, options['batch_size'])
+            changed += total
+            self.stdout.write(f'{model.__name__}: {total}')
+        if changed:
+            bump('site')
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0010_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowSuggestion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follow_suggestions', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь:')),
+                ('author_ids', models.TextField(default='[]', verbose_name='Авторы по убыванию оценки (JSON):')),
+                ('computed', models.DateTimeField(auto_now=True, verbose_name='Дата расчёта:')),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedVector',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='related_vector', serialize=False, to='posts.Post')),
+                ('columns', models.BinaryField()),
+                ('weights', models.BinaryField()),
+            ],
+        ),
+    ]
@@ -1,11 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.safestring import mark_safe
+
+from outbox.models import OutboxMixin
+
+from .fingerprints import BAND_FIELDS, fingerprint_fields
+from .rendering import (MAX_TAG_LENGTH, RENDER_VERSION, render_excerpt,
+                        render_text)
 
 
 User = get_user_model()
 
 
-class Group(models.Model):
+class Group(OutboxMixin, models.Model):
     title = models.CharField(
         max_length=200,
         verbose_name='Название группы:',
@@ -25,7 +32,63 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class RenderedText(models.Model):
+    """HTML поля text, который готовится при сохранении, а не в шаблоне."""
+    rendered_fields = ('text_html', 'render_version')
+
+    text_html = models.TextField(blank=True, editable=False)
+    render_version = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    def render(self):
+        self.text_html = render_text(self.text)
+        self.render_version = RENDER_VERSION
+
+    def save(self, *args, **kwargs):
+        self.render()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, *self.rendered_fields
+            }
+        super().save(*args, **kwargs)
+
+    @property
+    def html(self):
+        if self.render_version == RENDER_VERSION:
+            return mark_safe(self.text_html)
+        return mark_safe(render_text(self.text))
+
+
+class Excerpted(RenderedText):
+    """Добавляет готовое начало текста, чтобы ленты не читали text."""
+    rendered_fields = (*RenderedText.rendered_fields, 'excerpt_html',
+                       'is_truncated')
+
+    excerpt_html = models.TextField(blank=True, editable=False)
+    is_truncated = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def render(self):
+        super().render()
+        self.excerpt_html, self.is_truncated = render_excerpt(self.text)
+
+    @property
+    def excerpt(self):
+        if self.render_version == RENDER_VERSION:
+            return mark_safe(self.excerpt_html)
+        return mark_safe(render_excerpt(self.text)[0])
+
+
+class Post(OutboxMixin, Excerpted):
+    rendered_fields = (*Excerpted.rendered_fields, *BAND_FIELDS)
+
     text = models.TextField(
         verbose_name='Текст поста:'
     )
@@ -53,6 +116,33 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    minhash_band0 = models.IntegerField(
+        null=True, editable=False, db_index=True
+    )
+    minhash_band1 = models.IntegerField(
+        null=True, editable=False, db_index=True
+    )
+    minhash_band2 = models.IntegerField(
+        null=True, editable=False, db_index=True
+    )
+    minhash_band3 = models.IntegerField(
+        null=True, editable=False, db_index=True
+    )
+    minhash_band4 = models.IntegerField(
+        null=True, editable=False, db_index=True
+    )
+    minhash_band5 = models.IntegerField(
+        null=True, editable=False, db_index=True
+    )
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        related_name='duplicates',
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Почти повторяет пост:'
+    )
 
     class Meta:
         ordering = ['-pub_date']
@@ -61,8 +151,34 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные группу и картинку, чтобы сигналы видели
+        их прежние значения без лишнего запроса."""
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance._loaded_values = {
+            name: loaded[name] for name in ('group_id', 'image')
+            if name in loaded
+        }
+        return instance
+
+    def loaded_value(self, name):
+        return getattr(self, '_loaded_values', {}).get(name)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            'group_id': self.group_id, 'image': self.image.name,
+        }
+
+    def render(self):
+        super().render()
+        for field, value in fingerprint_fields(self.text).items():
+            setattr(self, field, value)
+
 
-class Comment(models.Model):
+class Comment(OutboxMixin, RenderedText):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -90,7 +206,7 @@ class Comment(models.Model):
         return self.text[:15]
 
 
-class Follow(models.Model):
+class Follow(OutboxMixin, models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -114,3 +230,230 @@ class Follow(models.Model):
 
     def __str__(self):
         return self.user
+
+
+class ArchivedPost(Excerpted):
+    """Старый пост, перенесённый из горячей таблицы; id сохраняется."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(
+        verbose_name='Текст поста:'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации:'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор:'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        blank=True,
+        null=True,
+        verbose_name='Группа:'
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    archived = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата архивации:'
+    )
+
+    class Meta:
+        ordering = ['-pub_date']
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(RenderedText):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Пост:'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор:'
+    )
+    text = models.TextField(
+        verbose_name='Текст комментария:'
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата публикации:'
+    )
+
+    class Meta:
+        ordering = ['-created']
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class FollowSuggestion(models.Model):
+    """Заранее посчитанные рекомендации, на кого подписаться."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_suggestions',
+        verbose_name='Пользователь:'
+    )
+    author_ids = models.TextField(
+        default='[]',
+        verbose_name='Авторы по убыванию оценки (JSON):'
+    )
+    computed = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата расчёта:'
+    )
+
+    def __str__(self):
+        return f'{self.user_id}: {self.author_ids}'
+
+
+class RelatedTerm(models.Model):
+    """Словарь TF-IDF для похожих постов: слово и его IDF."""
+    term = models.CharField(max_length=100, unique=True)
+    idf = models.FloatField()
+
+    def __str__(self):
+        return self.term
+
+
+class RelatedVector(models.Model):
+    """TF-IDF поста для похожих постов: номера слов словаря и их веса
+    в разреженном виде, массивы int32 и float32 в байтах."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='related_vector'
+    )
+    columns = models.BinaryField()
+    weights = models.BinaryField()
+
+
+class RelatedPost(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_links',
+        verbose_name='Пост:'
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_from',
+        verbose_name='Похожий пост:'
+    )
+    score = models.FloatField(
+        verbose_name='Косинусная близость:'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'related'],
+                name='unique_related_post'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['post', '-score'], name='related_post_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} → {self.related_id}'
+
+
+class Tag(models.Model):
+    """Хештег в нормализованном виде: без # и в нижнем регистре."""
+    name = models.CharField(
+        max_length=MAX_TAG_LENGTH,
+        unique=True,
+        verbose_name='Тег:'
+    )
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """Связь поста с тегом; pub_date копируется из поста, чтобы лента тега
+    читалась по индексу (tag, -pub_date) без соединения с постами."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Пост:'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Тег:'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации:'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'tag'],
+                name='unique_post_tag'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['tag', '-pub_date'], name='post_tag_feed_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} {self.tag_id}'
+
+
+class Mention(models.Model):
+    """Упоминание пользователя через @username в тексте поста."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Пост:'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Упомянутый пользователь:'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации:'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'user'],
+                name='unique_mention'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date'], name='mention_feed_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} @{self.user_id}'
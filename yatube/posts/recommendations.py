@@ -0,0 +1,199 @@
+import json
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .follow_graph import follow_graph
+from .freshness import bump
+from .models import Follow, FollowSuggestion, User
+
+TOP_K = 10
+CHUNK_SIZE = 1000
+# Через авторов с большим числом подписчиков похожие пользователи не
+# ищутся: разворот по ним растёт без границ и почти ничего не различает.
+MAX_FAN_OUT = 1000
+
+
+def csr(rows, cols, size):
+    """Сжатое построчное представление разреженной матрицы смежности."""
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+    return indptr, cols[order]
+
+
+def expand(indptr, indices, rows):
+    """Для каждой строки из rows выдаёт всех её соседей.
+
+    Возвращает пару массивов: номер строки в rows и соседа.
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    owners = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    return owners, indices[np.repeat(starts, lengths) + offsets]
+
+
+class CoFollowModel:
+    """Матрица «пользователь × автор» из Follow в разреженном виде.
+
+    Пользователи и авторы живут в одном пространстве индексов ids.
+    Похожесть двух пользователей — косинус по общим подпискам. Оценка
+    автора для пользователя — сумма похожестей тех, кто на него подписан.
+    Авторы из popular (по умолчанию — с числом подписчиков больше
+    MAX_FAN_OUT) в поиске похожих пользователей не участвуют.
+    """
+
+    def __init__(self, pairs, popular=None):
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        self.ids = np.unique(pairs)
+        size = len(self.ids)
+        users = np.searchsorted(self.ids, pairs[:, 0])
+        authors = np.searchsorted(self.ids, pairs[:, 1])
+        self.following = csr(users, authors, size)
+        self.followers = csr(authors, users, size)
+        self.degree = np.diff(self.following[0]).astype(np.float64)
+        if popular is None:
+            self.popular = np.diff(self.followers[0]) > MAX_FAN_OUT
+        else:
+            self.popular = np.isin(self.ids, list(popular))
+        self.size = size
+
+    @classmethod
+    def load(cls):
+        return cls(list(Follow.objects.values_list('user_id', 'author_id')))
+
+    @classmethod
+    def load_for(cls, user_ids):
+        """Часть графа, достаточная для оценок пользователей user_ids:
+        их подписки, подписчики их непопулярных авторов и подписки этих
+        подписчиков."""
+        authors = Follow.objects.filter(user_id__in=user_ids).values(
+            'author_id'
+        )
+        popular = list(Follow.objects.filter(author_id__in=authors).values(
+            'author_id'
+        ).annotate(fans=Count('id')).filter(
+            fans__gt=MAX_FAN_OUT
+        ).values_list('author_id', flat=True))
+        neighbours = Follow.objects.filter(author_id__in=authors).exclude(
+            author_id__in=popular
+        ).values('user_id')
+        return cls(list(Follow.objects.filter(
+            Q(user_id__in=user_ids) | Q(user_id__in=neighbours)
+        ).values_list('user_id', 'author_id')), popular)
+
+    def rows_for(self, user_ids):
+        """Строки пользователей user_ids, у которых есть подписки."""
+        rows = np.searchsorted(self.ids, np.asarray(user_ids, np.int64))
+        rows = rows[rows < self.size]
+        rows = rows[np.isin(self.ids[rows], user_ids)]
+        return np.unique(rows[self.degree[rows] > 0])
+
+    def active_rows(self):
+        return np.flatnonzero(self.degree)
+
+    def scores(self, rows):
+        """Оценки кандидатов для пачки пользователей: (строка, автор,
+        оценка) без уже подписанных авторов и самих пользователей."""
+        size = self.size
+        owners, authors = expand(*self.following, rows)
+        followed = owners * size + authors
+        spread = ~self.popular[authors]
+        positions, neighbours = expand(*self.followers, authors[spread])
+        owners_of = owners[spread][positions]
+        keep = neighbours != rows[owners_of]
+        similar, overlap = np.unique(
+            owners_of[keep] * size + neighbours[keep], return_counts=True
+        )
+        similar_rows, similar_users = np.divmod(similar, size)
+        weights = overlap / np.sqrt(
+            self.degree[rows[similar_rows]] * self.degree[similar_users]
+        )
+        positions, candidates = expand(*self.following, similar_users)
+        keys = similar_rows[positions] * size + candidates
+        keys, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=weights[positions])
+        candidate_rows, candidates = np.divmod(keys, size)
+        keep = ~np.isin(keys, followed) & (candidates != rows[candidate_rows])
+        return candidate_rows[keep], candidates[keep], totals[keep]
+
+    def top(self, rows, k=TOP_K):
+        """Лучшие k авторов для каждого пользователя пачки."""
+        owners, candidates, totals = self.scores(rows)
+        order = np.lexsort((candidates, -totals, owners))
+        owners, candidates = owners[order], candidates[order]
+        starts = np.searchsorted(owners, owners)
+        best = np.arange(len(owners)) - starts < k
+        result = {}
+        for owner, candidate in zip(owners[best], candidates[best]):
+            result.setdefault(int(self.ids[rows[owner]]), []).append(
+                int(self.ids[candidate])
+            )
+        return result
+
+
+def save_suggestions(model, rows, k):
+    """Заменяет рекомендации пользователей строк rows и сбрасывает их
+    личные области свежести."""
+    user_ids = model.ids[rows].tolist()
+    suggestions = model.top(rows, k)
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+        FollowSuggestion.objects.bulk_create(
+            FollowSuggestion(
+                user_id=user_id, author_ids=json.dumps(author_ids)
+            )
+            for user_id, author_ids in suggestions.items()
+        )
+    bump(*(f'viewer:{user_id}' for user_id in user_ids))
+    return len(suggestions)
+
+
+def build_suggestions(chunk_size=CHUNK_SIZE, k=TOP_K, user_ids=None):
+    """Пересчитывает рекомендации пачками пользователей; возвращает число
+    пользователей с рекомендациями.
+
+    Без user_ids пересчитываются все и удаляются устаревшие строки. С
+    user_ids читается только нужная им часть графа подписок.
+    """
+    if user_ids is not None:
+        model = CoFollowModel.load_for(user_ids)
+        rows = model.rows_for(user_ids)
+        stale = set(user_ids) - set(model.ids[rows].tolist())
+    else:
+        started = timezone.now()
+        model = CoFollowModel.load()
+        rows = model.active_rows()
+        stale = FollowSuggestion.objects.filter(
+            computed__lt=started
+        ).values_list('user_id', flat=True)
+    total = 0
+    for start in range(0, len(rows), chunk_size):
+        total += save_suggestions(model, rows[start:start + chunk_size], k)
+    stale = list(stale)
+    FollowSuggestion.objects.filter(user_id__in=stale).delete()
+    bump(*(f'viewer:{user_id}' for user_id in stale))
+    return total
+
+
+def suggested_authors(user_id, limit=5):
+    """Рекомендации для пользователя: одно чтение по первичному ключу и
+    один запрос за авторами; уже подписанные и неактивные отбрасываются."""
+    author_ids = FollowSuggestion.objects.filter(user_id=user_id).values_list(
+        'author_ids', flat=True
+    ).first()
+    if not author_ids:
+        return []
+    author_ids = json.loads(author_ids)
+    followed = follow_graph.following_many(user_id, author_ids)
+    author_ids = [
+        author_id for author_id in author_ids if author_id not in followed
+    ][:limit]
+    authors = User.objects.filter(is_active=True).in_bulk(author_ids)
+    return [authors[author_id] for author_id in author_ids
+            if author_id in authors]
@@ -0,0 +1,303 @@
+import math
+import re
+import tempfile
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Post, RelatedPost, RelatedTerm, RelatedVector
+from .utils import FEED_DEFERRED
+
+TOKEN_RE = re.compile(r'[^\W\d_]{3,}')
+MAX_FEATURES = 5000
+MAX_DF = 0.5
+MIN_SCORE = 0.05
+TOP_K = 5
+CHUNK_SIZE = 1000
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def iter_posts(queryset=None, chunk_size=CHUNK_SIZE):
+    """Отдаёт посты пачками (ids, texts) по возрастанию id."""
+    queryset = Post.objects.all() if queryset is None else queryset
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by('id').values_list(
+            'id', 'text'
+        )[:chunk_size])
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        ids, texts = zip(*rows)
+        yield np.array(ids, dtype=np.int64), texts
+
+
+class Vectorizer:
+    """TF-IDF с сублинейной частотой и нормировкой строк по L2."""
+
+    def __init__(self, terms, idf):
+        self.index = {term: number for number, term in enumerate(terms)}
+        self.terms = list(terms)
+        self.idf = np.asarray(idf, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, chunk_size=CHUNK_SIZE):
+        documents = 0
+        frequency = Counter()
+        for _, texts in iter_posts(chunk_size=chunk_size):
+            documents += len(texts)
+            for text in texts:
+                frequency.update(set(tokenize(text)))
+        terms = [
+            term for term, count in frequency.most_common()
+            if 1 < count <= max(MAX_DF * documents, 2)
+        ][:MAX_FEATURES]
+        idf = [
+            math.log((1 + documents) / (1 + frequency[term])) + 1
+            for term in terms
+        ]
+        return cls(terms, idf)
+
+    @classmethod
+    def load(cls):
+        rows = list(RelatedTerm.objects.order_by('id').values_list(
+            'term', 'idf'
+        ))
+        return cls(*zip(*rows)) if rows else None
+
+    def save(self):
+        RelatedTerm.objects.all().delete()
+        RelatedTerm.objects.bulk_create(
+            RelatedTerm(term=term, idf=float(idf))
+            for term, idf in zip(self.terms, self.idf)
+        )
+
+    def transform(self, texts, out=None):
+        matrix = out if out is not None else np.zeros(
+            (len(texts), len(self.terms)), dtype=np.float32
+        )
+        for row, text in enumerate(texts):
+            counts = Counter(
+                self.index[token] for token in tokenize(text)
+                if token in self.index
+            )
+            if not counts:
+                continue
+            columns = np.fromiter(counts.keys(), dtype=np.int64)
+            values = 1 + np.log(np.fromiter(counts.values(), np.float32))
+            values *= self.idf[columns]
+            matrix[row, columns] = values / np.linalg.norm(values)
+        return matrix
+
+
+def save_vectors(ids, matrix):
+    """Сохраняет строки matrix в RelatedVector в разреженном виде."""
+    vectors = []
+    for post_id, row in zip(ids, matrix):
+        columns = np.flatnonzero(row).astype(np.int32)
+        vectors.append(RelatedVector(
+            post_id=int(post_id),
+            columns=columns.tobytes(),
+            weights=row[columns].astype(np.float32).tobytes(),
+        ))
+    RelatedVector.objects.bulk_create(vectors)
+
+
+def unpack(rows, width):
+    """Собирает плотную матрицу из строк (id, columns, weights)."""
+    ids = np.zeros(len(rows), dtype=np.int64)
+    matrix = np.zeros((len(rows), width), dtype=np.float32)
+    for row, (post_id, columns, weights) in enumerate(rows):
+        ids[row] = post_id
+        matrix[row, np.frombuffer(columns, dtype=np.int32)] = np.frombuffer(
+            weights, dtype=np.float32
+        )
+    return ids, matrix
+
+
+def iter_vectors(width, chunk_size=CHUNK_SIZE):
+    """Отдаёт сохранённые векторы пачками (ids, матрица) по возрастанию
+    id без повторной токенизации текстов."""
+    vectors = RelatedVector.objects.order_by('post_id').values_list(
+        'post_id', 'columns', 'weights'
+    )
+    last_id = 0
+    while True:
+        rows = list(vectors.filter(post_id__gt=last_id)[:chunk_size])
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield unpack(rows, width)
+
+
+def merge_top(best_scores, best_ids, scores, ids, k):
+    """Сливает текущие лучшие k с новым блоком оценок построчно."""
+    scores = np.hstack([best_scores, scores])
+    ids = np.hstack([best_ids, np.broadcast_to(ids, (len(scores), len(ids)))])
+    if scores.shape[1] > k:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, top, axis=1)
+        ids = np.take_along_axis(ids, top, axis=1)
+    return scores, ids
+
+
+def nearest(block, block_ids, chunks, k=TOP_K):
+    """Ближайшие соседи строк block по косинусу; chunks — пачки
+    (ids, матрица), по которым идёт перемножение блоками."""
+    best_scores = np.full((len(block), 0), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(block), 0), dtype=np.int64)
+    for ids, matrix in chunks:
+        scores = block @ matrix.T
+        scores[block_ids[:, None] == ids[None, :]] = -np.inf
+        best_scores, best_ids = merge_top(
+            best_scores, best_ids, scores, ids, k
+        )
+    return best_scores, best_ids
+
+
+def links(post_ids, scores, ids):
+    order = np.argsort(-scores, axis=1)
+    for post_id, row_scores, row_ids, row_order in zip(
+        post_ids, scores, ids, order
+    ):
+        for column in row_order:
+            if row_scores[column] >= MIN_SCORE:
+                yield RelatedPost(
+                    post_id=int(post_id),
+                    related_id=int(row_ids[column]),
+                    score=float(row_scores[column]),
+                )
+
+
+def rebuild(chunk_size=CHUNK_SIZE, k=TOP_K):
+    """Полный пересчёт: словарь, TF-IDF всех постов во временном memmap и
+    соседи блочным перемножением. Векторы сохраняются в RelatedVector для
+    update(). Старые таблицы заменяются новыми в одной транзакции, так что
+    читатели до конца пересчёта видят прежних соседей. Возвращает число
+    постов."""
+    vectorizer = Vectorizer.fit(chunk_size)
+    last_id = Post.objects.order_by('-id').values_list(
+        'id', flat=True
+    ).first() or 0
+    posts = Post.objects.filter(id__lte=last_id)
+    with tempfile.NamedTemporaryFile() as storage, transaction.atomic():
+        shape = (max(posts.count(), 1), max(len(vectorizer.terms), 1))
+        matrix = np.memmap(storage, dtype=np.float32, mode='w+', shape=shape)
+        matrix[:] = 0
+        ids = np.zeros(shape[0], dtype=np.int64)
+        position = 0
+        vectorizer.save()
+        RelatedPost.objects.all().delete()
+        RelatedVector.objects.all().delete()
+        for chunk_ids, texts in iter_posts(posts, chunk_size):
+            end = position + len(chunk_ids)
+            ids[position:end] = chunk_ids
+            vectorizer.transform(texts, out=matrix[position:end])
+            save_vectors(chunk_ids, matrix[position:end])
+            position = end
+        ids = ids[:position]
+
+        def chunks():
+            for start in range(0, position, chunk_size):
+                yield (ids[start:start + chunk_size],
+                       matrix[start:start + chunk_size])
+
+        for start in range(0, position, chunk_size):
+            block_ids = ids[start:start + chunk_size]
+            scores, neighbours = nearest(
+                matrix[start:start + chunk_size], block_ids, chunks(), k
+            )
+            RelatedPost.objects.bulk_create(
+                links(block_ids, scores, neighbours)
+            )
+    return position
+
+
+def update(post_ids, chunk_size=CHUNK_SIZE, k=TOP_K):
+    """Досчитывает соседей новых и изменённых постов без пересчёта
+    словаря.
+
+    Токенизируются только сами посты из post_ids; их векторы
+    перемножаются с сохранёнными векторами остальных постов пачками.
+    Посты, у которых изменённый пост был соседом, теряют эту связь и
+    получают список соседей заново. Остальным постам новый сосед
+    добавляется, если он входит в их лучшие k.
+    """
+    vectorizer = Vectorizer.load()
+    if vectorizer is None:
+        return rebuild(chunk_size, k)
+    width = len(vectorizer.terms)
+    rows = list(Post.objects.filter(id__in=post_ids).values_list(
+        'id', 'text'
+    ))
+    sources = set(RelatedPost.objects.filter(
+        related_id__in=post_ids
+    ).exclude(post_id__in=post_ids).values_list('post_id', flat=True))
+    RelatedPost.objects.filter(
+        Q(post_id__in=post_ids) | Q(related_id__in=post_ids)
+        | Q(post_id__in=sources)
+    ).delete()
+    RelatedVector.objects.filter(post_id__in=post_ids).delete()
+    new_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    vectors = vectorizer.transform([row[1] for row in rows])
+    save_vectors(new_ids, vectors)
+    source_ids, source_vectors = unpack(list(
+        RelatedVector.objects.filter(post_id__in=sources).values_list(
+            'post_id', 'columns', 'weights'
+        )
+    ), width)
+    query_ids = np.concatenate([new_ids, source_ids])
+    if not len(query_ids):
+        return 0
+    queries = np.vstack([vectors, source_vectors])
+    skip = set(query_ids.tolist())
+    best_scores = np.full((len(query_ids), 0), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(query_ids), 0), dtype=np.int64)
+    for ids, matrix in iter_vectors(width, chunk_size):
+        scores = queries @ matrix.T
+        scores[query_ids[:, None] == ids[None, :]] = -np.inf
+        best_scores, best_ids = merge_top(
+            best_scores, best_ids, scores, ids, k
+        )
+        offer_neighbours(ids, new_ids, scores[:len(new_ids)].T, k, skip)
+    RelatedPost.objects.bulk_create(links(query_ids, best_scores, best_ids))
+    return len(rows)
+
+
+def offer_neighbours(ids, new_ids, scores, k, skip=()):
+    """Предлагает новые посты в соседи постов ids, кроме skip, и обрезает
+    их списки до k лучших."""
+    candidates = [
+        RelatedPost(
+            post_id=int(ids[row]), related_id=int(new_ids[column]),
+            score=float(scores[row, column]),
+        )
+        for row, column in zip(*np.nonzero(scores >= MIN_SCORE))
+        if int(ids[row]) not in skip
+    ]
+    if not candidates:
+        return
+    RelatedPost.objects.bulk_create(candidates)
+    affected = {candidate.post_id for candidate in candidates}
+    ranked = RelatedPost.objects.filter(post_id__in=affected).order_by(
+        'post_id', '-score'
+    ).values_list('id', 'post_id')
+    extra = []
+    seen = Counter()
+    for link_id, post_id in ranked:
+        seen[post_id] += 1
+        if seen[post_id] > k:
+            extra.append(link_id)
+    RelatedPost.objects.filter(id__in=extra).delete()
+
+
+def related_posts(post_id, k=TOP_K):
+    """Похожие посты одним запросом по индексу (post, -score)."""
+    return Post.objects.filter(related_from__post_id=post_id).defer(
+        *FEED_DEFERRED
+    ).order_by('-related_from__score')[:k]
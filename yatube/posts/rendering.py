@@ -0,0 +1,55 @@
+import re
+
+from django.template.defaultfilters import linebreaksbr
+from django.urls import reverse
+from django.utils.text import Truncator
+
+# Увеличивается при каждом изменении render_text, render_excerpt и
+# отпечатков постов: команда rerender_posts пересчитает строки со старой
+# версией.
+RENDER_VERSION = 5
+EXCERPT_LENGTH = 300
+# & исключён, чтобы не задеть экранированные сущности вида &#39;.
+HASHTAG_RE = re.compile(r'(?<![\w#&])#(\w+)')
+MAX_TAG_LENGTH = 100
+
+
+def link_tag(match):
+    """Ссылка на ленту тега; слишком длинные теги не индексируются,
+    поэтому остаются текстом."""
+    if len(match.group(1)) > MAX_TAG_LENGTH:
+        return match.group(0)
+    url = reverse('posts:tag_posts', args=[match.group(1).lower()])
+    return f'<a href="{url}">{match.group(0)}</a>'
+
+
+def render_text(text):
+    """Экранирует текст, переводит строки в <br>, как фильтр linebreaksbr,
+    и превращает хештеги в ссылки на их ленты."""
+    return HASHTAG_RE.sub(link_tag, str(linebreaksbr(text, autoescape=True)))
+
+
+def render_excerpt(text):
+    """HTML начала текста для лент; второе значение — обрезан ли текст."""
+    excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+    return render_text(excerpt), excerpt != text
+
+
+def rerender(model, batch_size=500, using='default'):
+    """Перерисовывает HTML строк со старой версией рендерера пачками по
+    возрастанию id и возвращает их число."""
+    total = 0
+    last_id = 0
+    while True:
+        rows = list(model.objects.using(using).filter(
+            id__gt=last_id
+        ).exclude(render_version=RENDER_VERSION).order_by('id').only(
+            'id', 'text'
+        )[:batch_size])
+        if not rows:
+            return total
+        for row in rows:
+            row.render()
+        model.objects.using(using).bulk_update(rows, model.rendered_fields)
+        total += len(rows)
+        last_id = rows[-1].id
@@ -0,0 +1,182 @@
+from django.apps import apps as global_apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from outbox.log import track
+
+from .api import GROUP_KEY, POST_KEY, USER_KEY, forget_object
+from .autocomplete import autocomplete
+from .follow_graph import follow_graph
+from .follows import followed, unfollowed
+from .freshness import bump
+from .models import ArchivedComment, ArchivedPost, Comment, Follow, Group, Post
+from .rendering import rerender
+from .tags import index_posts
+from .tasks import schedule_suggestions, warm_thumbnails
+
+User = get_user_model()
+
+track(Post, lambda post: {
+    'author_id': post.author_id, 'group_id': post.group_id,
+})
+track(Comment, lambda comment: {
+    'post_id': comment.post_id, 'author_id': comment.author_id,
+})
+track(Follow, lambda follow: {
+    'user_id': follow.user_id, 'author_id': follow.author_id,
+})
+track(Group, lambda group: {'slug': group.slug})
+
+
+def bump_on_commit(*scopes):
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def forget_on_commit(key, object_id):
+    transaction.on_commit(lambda: forget_object(key, object_id))
+
+
+@receiver(post_migrate)
+def posts_migrated(sender, using, apps=global_apps, **kwargs):
+    """Перерисовывает строки, сохранённые до появления колонок рендера или
+    прошлой версией рендерера, чтобы ленты не дочитывали text по строке.
+
+    Живой код рендера вызывается здесь, а не в миграции данных, поэтому
+    его будущие правки не меняют старые миграции.
+    """
+    if sender.name != 'posts':
+        return
+    for model in (Post, Comment, ArchivedPost, ArchivedComment):
+        try:
+            state = apps.get_model('posts', model.__name__)
+        except LookupError:
+            continue
+        fields = {field.name for field in state._meta.get_fields()}
+        if fields.issuperset(model.rendered_fields):
+            rerender(model, using=using)
+
+
+@receiver(post_migrate)
+def site_migrated(sender, **kwargs):
+    bump('site')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    forget_on_commit(POST_KEY, instance.pk)
+    group_ids = {instance.group_id, instance.loaded_value('group_id')}
+    bump_on_commit(
+        'posts',
+        f'post:{instance.pk}',
+        f'author:{instance.author_id}',
+        *(f'group:{group_id}' for group_id in group_ids if group_id),
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_text_saved(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields is None or 'text' in update_fields:
+        index_posts([instance])
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, **kwargs):
+    if instance.image and instance.image.name != instance.loaded_value(
+        'image'
+    ):
+        enqueue(
+            warm_thumbnails,
+            {'post_id': instance.pk},
+            dedup_key=f'thumbnails:{instance.pk}',
+        )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_on_commit(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    forget_on_commit(GROUP_KEY, instance.pk)
+    bump_on_commit('groups', f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=Group)
+def group_indexed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.put_group(
+        instance.pk, instance.title, instance.slug
+    ))
+
+
+@receiver(post_delete, sender=Group)
+def group_unindexed(sender, instance, **kwargs):
+    group_id = instance.pk
+    transaction.on_commit(lambda: autocomplete.remove_group(group_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    forget_on_commit(USER_KEY, instance.pk)
+    bump_on_commit('users', f'author:{instance.pk}', f'viewer:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def user_indexed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    transaction.on_commit(lambda: autocomplete.put_user(
+        instance.pk, instance.username, instance.is_active
+    ))
+
+
+@receiver(post_delete, sender=User)
+def user_unindexed(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: autocomplete.remove_user(user_id))
+
+
+def follow_scopes(user_id, author_ids):
+    return [f'author:{user_id}', *(f'author:{pk}' for pk in author_ids)]
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        followed.send(
+            sender=Follow, user_id=instance.user_id,
+            author_ids=[instance.author_id],
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    unfollowed.send(
+        sender=Follow, user_id=instance.user_id,
+        author_ids=[instance.author_id],
+    )
+
+
+@receiver(followed)
+def authors_followed(sender, user_id, author_ids, **kwargs):
+    pairs = [(user_id, author_id) for author_id in author_ids]
+    transaction.on_commit(lambda: follow_graph.add_many(pairs))
+    bump_on_commit(*follow_scopes(user_id, author_ids))
+    schedule_suggestions(user_id)
+
+
+@receiver(unfollowed)
+def authors_unfollowed(sender, user_id, author_ids, **kwargs):
+    pairs = [(user_id, author_id) for author_id in author_ids]
+    transaction.on_commit(lambda: follow_graph.remove_many(pairs))
+    bump_on_commit(*follow_scopes(user_id, author_ids))
+    schedule_suggestions(user_id)
@@ -0,0 +1,113 @@
+import re
+
+from django.db.models import Q
+
+from .models import Mention, Post, PostTag, Tag, User
+from .rendering import HASHTAG_RE, MAX_TAG_LENGTH
+from .utils import FEED_DEFERRED
+
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]+)')
+MAX_PER_POST = 20
+CHUNK_SIZE = 500
+
+
+def extract_tags(text):
+    """Теги текста в нормализованном виде, без повторов и в порядке
+    появления."""
+    names = dict.fromkeys(
+        name.lower() for name in HASHTAG_RE.findall(text)
+        if len(name) <= MAX_TAG_LENGTH
+    )
+    return list(names)[:MAX_PER_POST]
+
+
+def extract_mentions(text):
+    usernames = dict.fromkeys(
+        username.rstrip('.') for username in MENTION_RE.findall(text)
+    )
+    return [username for username in usernames if username][:MAX_PER_POST]
+
+
+def tag_ids(names):
+    """id тегов по именам; недостающие теги создаются одним INSERT."""
+    if not names:
+        return {}
+    existing = dict(Tag.objects.filter(name__in=names).values_list(
+        'name', 'id'
+    ))
+    missing = set(names) - set(existing)
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in missing], ignore_conflicts=True
+        )
+        existing.update(Tag.objects.filter(name__in=missing).values_list(
+            'name', 'id'
+        ))
+    return existing
+
+
+def index_posts(posts):
+    """Пересобирает теги и упоминания пачки постов: по одному запросу на
+    теги, пользователей, удаление старых связей и вставку новых."""
+    posts = list(posts)
+    tags = {post.id: extract_tags(post.text) for post in posts}
+    mentions = {post.id: extract_mentions(post.text) for post in posts}
+    ids_of_tags = tag_ids({name for names in tags.values() for name in names})
+    ids_of_users = dict(User.objects.filter(username__in={
+        username for usernames in mentions.values() for username in usernames
+    }).values_list('username', 'id'))
+    post_ids = [post.id for post in posts]
+    PostTag.objects.filter(post_id__in=post_ids).delete()
+    Mention.objects.filter(post_id__in=post_ids).delete()
+    PostTag.objects.bulk_create(
+        PostTag(post_id=post.id, tag_id=ids_of_tags[name],
+                pub_date=post.pub_date)
+        for post in posts for name in tags[post.id]
+    )
+    Mention.objects.bulk_create(
+        Mention(post_id=post.id, user_id=ids_of_users[username],
+                pub_date=post.pub_date)
+        for post in posts for username in mentions[post.id]
+        if username in ids_of_users
+    )
+
+
+def backfill(chunk_size=CHUNK_SIZE):
+    """Индексирует все посты пачками по возрастанию id и возвращает их
+    число."""
+    total = 0
+    last_id = 0
+    while True:
+        posts = list(Post.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).only('id', 'text', 'pub_date')[:chunk_size])
+        if not posts:
+            return total
+        index_posts(posts)
+        total += len(posts)
+        last_id = posts[-1].id
+
+
+def feed_page(links, before, limit):
+    """Страница ленты по связям PostTag или Mention с курсором
+    (pub_date, post_id): один запрос по индексу и один за постами.
+
+    Возвращает посты и пару для курсора следующей страницы или None.
+    """
+    links = links.order_by('-pub_date', '-post_id')
+    if before:
+        pub_date, post_id = before
+        links = links.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, post_id__lt=post_id)
+        )
+    rows = list(links.values_list('post_id', 'pub_date')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][1], rows[-1][0]
+    posts = Post.objects.select_related('author', 'group').defer(
+        *FEED_DEFERRED
+    ).in_bulk([post_id for post_id, _ in rows])
+    posts = [posts[post_id] for post_id, _ in rows if post_id in posts]
+    return posts, next_cursor
@@ -0,0 +1,38 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from jobs.queue import enqueue, task
+
+from .models import Post
+from .recommendations import build_suggestions
+
+THUMBNAIL_GEOMETRY = '960x339'
+SUGGESTIONS_DEDUP_KEY = 'posts:rebuild-suggestions:{}'
+
+
+@task
+def warm_thumbnails(post_id):
+    """Заранее создаёт миниатюру картинки поста для лент."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and post.image:
+        get_thumbnail(
+            post.image, THUMBNAIL_GEOMETRY, crop='center', upscale=True
+        )
+
+
+@task
+def rebuild_suggestions(user_ids):
+    """Пересчитывает рекомендации подписок пользователей user_ids."""
+    build_suggestions(user_ids=user_ids)
+
+
+def schedule_suggestions(user_id):
+    """Ставит пересчёт рекомендаций пользователя через
+    SUGGESTIONS_REBUILD_DELAY, если он ещё не запланирован. Остальных
+    пользователей догоняет периодический build_suggestions."""
+    enqueue(
+        rebuild_suggestions,
+        {'user_ids': [user_id]},
+        delay=settings.SUGGESTIONS_REBUILD_DELAY,
+        dedup_key=SUGGESTIONS_DEDUP_KEY.format(user_id),
+    )
@@ -0,0 +1,150 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+TESTING_POSTS = 13
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.reader = User.objects.create_user(username='calyps')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(TESTING_POSTS):
+            Post.objects.create(
+                text=f'Тестовый текст {number}',
+                author=cls.user,
+                group=cls.group,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_cursor_pagination(self):
+        """Лента листается курсором без пропусков и повторов."""
+        response = self.guest_client.get(reverse('api:posts'))
+        first = response.json()
+        self.assertEqual(len(first['results']), 10)
+        response = self.guest_client.get(
+            reverse('api:posts'), {'cursor': first['next']}
+        )
+        second = response.json()
+        self.assertEqual(len(second['results']), 3)
+        self.assertIsNone(second['next'])
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(
+            ids,
+            list(Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )),
+        )
+
+    def test_embedded_objects_in_fixed_queries(self):
+        """Авторы и группы встраиваются за фиксированное число запросов."""
+        with self.assertNumQueries(3):
+            response = self.guest_client.get(
+                reverse('api:posts'), {'limit': 13}
+            )
+        post = response.json()['results'][0]
+        self.assertEqual(post['author']['username'], self.user.username)
+        self.assertEqual(post['group']['slug'], self.group.slug)
+
+    def test_sparse_fields(self):
+        """Параметр fields ограничивает набор полей."""
+        response = self.guest_client.get(
+            reverse('api:group_posts', kwargs={'slug': self.group.slug}),
+            {'fields': 'id,text'},
+        )
+        self.assertEqual(
+            set(response.json()['results'][0]), {'id', 'text'}
+        )
+        response = self.guest_client.get(
+            reverse('api:posts'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_etag(self):
+        """Повторный запрос с ETag получает 304."""
+        url = reverse('api:profile', kwargs={'username': self.user.username})
+        response = self.guest_client.get(url)
+        self.assertEqual(response.json()['posts_count'], TESTING_POSTS)
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_follow_feed(self):
+        """Лента подписок доступна только авторизованному пользователю."""
+        response = self.guest_client.get(reverse('api:follow'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.guest_client.force_login(self.reader)
+        response = self.guest_client.get(reverse('api:follow'))
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_not_found(self):
+        """Несуществующий пост даёт 404 в JSON."""
+        response = self.guest_client.get(
+            reverse('api:post', kwargs={'post_id': 10 ** 6})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_batch(self):
+        """Пакетный запрос отмечает ненайденные и скрытые объекты."""
+        hidden = User.objects.create_user(username='hidden', is_active=False)
+        hidden_post = Post.objects.create(text='Скрытый', author=hidden)
+        post = Post.objects.filter(author=self.user).first()
+        response = self.guest_client.get(reverse('api:batch'), {
+            'posts': f'{post.pk},{hidden_post.pk},{10 ** 6},x',
+            'users': 'calypsol,hidden,nobody',
+        })
+        data = response.json()
+        self.assertEqual(data['posts'][str(post.pk)]['text'], post.text)
+        self.assertEqual(
+            data['posts'][str(hidden_post.pk)], {'error': 'forbidden'}
+        )
+        self.assertEqual(data['posts'][str(10 ** 6)], {'error': 'not_found'})
+        self.assertEqual(data['posts']['x'], {'error': 'invalid'})
+        self.assertEqual(data['users']['calypsol']['id'], self.user.pk)
+        self.assertEqual(data['users']['hidden'], {'error': 'forbidden'})
+        self.assertEqual(data['users']['nobody'], {'error': 'not_found'})
+
+    def test_batch_cache(self):
+        """Повторный пакетный запрос обходится без базы, а правка
+        объекта сбрасывает его запись в кэше после фиксации."""
+        ids = ','.join(map(str, Post.objects.values_list('id', flat=True)))
+        params = {'posts': ids, 'users': 'calypsol'}
+        self.guest_client.get(reverse('api:batch'), params)
+        with self.assertNumQueries(0):
+            self.guest_client.get(reverse('api:batch'), params)
+        post = Post.objects.first()
+        post.text = 'Новый текст'
+        with mock.patch.object(transaction, 'on_commit', lambda func: func()):
+            post.save()
+        response = self.guest_client.get(reverse('api:batch'), params)
+        self.assertEqual(
+            response.json()['posts'][str(post.pk)]['text'], 'Новый текст'
+        )
+
+    def test_batch_limit(self):
+        """Слишком длинный список id отклоняется."""
+        response = self.guest_client.get(
+            reverse('api:batch'), {'posts': ','.join(map(str, range(101)))}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from notifications.inbox import unread_count
+from notifications.models import Notification
+
+from ..models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+TESTING_POSTS = 13
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(TESTING_POSTS):
+            Post.objects.create(
+                text=f'Тестовый текст {number}',
+                author=cls.user,
+                group=cls.group,
+            )
+        cls.old_ids = list(Post.objects.order_by('id').values_list(
+            'id', flat=True
+        )[:8])
+        Post.objects.filter(id__in=cls.old_ids).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        cls.comment = Comment.objects.create(
+            post_id=cls.old_ids[0], author=cls.user, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def archive(self):
+        call_command('archive_posts', chunk_size=3, stdout=StringIO())
+
+    def test_old_posts_are_moved(self):
+        """Старые посты и их комментарии переезжают в архив пачками."""
+        self.archive()
+        self.assertEqual(Post.objects.count(), TESTING_POSTS - 8)
+        self.assertEqual(
+            sorted(ArchivedPost.objects.values_list('id', flat=True)),
+            self.old_ids,
+        )
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id, self.old_ids[0]
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Notification.objects.filter(
+            post_id__in=self.old_ids
+        ).exists())
+
+    def test_post_detail_reads_archive(self):
+        """Страница поста находит его и комментарии в архиве."""
+        self.archive()
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.old_ids[0]})
+        )
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(
+            list(response.context['comments']),
+            [ArchivedComment.objects.get()],
+        )
+
+    def test_profile_chains_archive(self):
+        """Профиль листает горячие посты, а за ними архивные."""
+        self.archive()
+        url = reverse('posts:profile', kwargs={'username': 'calypsol'})
+        first = self.guest_client.get(url).context['page_obj']
+        self.assertEqual(first.paginator.count, TESTING_POSTS)
+        self.assertIsInstance(first[0], Post)
+        self.assertIsInstance(first[9], ArchivedPost)
+        second = self.guest_client.get(url, {'page': 2}).context['page_obj']
+        self.assertEqual(len(second), 3)
+
+
+class ArchiveInvalidationTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='calypsol')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(
+            text='Старый пост', author=self.user
+        )
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+
+    def test_unread_counts_reset(self):
+        """Уведомления о перенесённых постах удаляются, а счётчики их
+        получателей сбрасываются после фиксации."""
+        Notification.objects.create(
+            recipient=self.reader, actor=self.user, verb=Notification.POST,
+            post_id=self.post.pk,
+        )
+        self.assertEqual(unread_count(self.reader.id), 1)
+        call_command('archive_posts', chunk_size=3, stdout=StringIO())
+        self.assertEqual(unread_count(self.reader.id), 0)
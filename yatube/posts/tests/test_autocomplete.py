@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from ..autocomplete import GROUP, USER, PrefixIndex, autocomplete
+from ..models import Group
+
+User = get_user_model()
+
+
+class PrefixIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = PrefixIndex([
+            (USER, 1, 'calypsol', {'calypsol'}),
+            (USER, 2, 'cal', {'cal'}),
+            (GROUP, 1, 'Кошки', {'кошки', 'cats'}),
+        ])
+
+    def test_search(self):
+        """Точное совпадение идёт раньше продолжений, лимит соблюдается."""
+        self.assertEqual(
+            self.index.search('cal', 10),
+            [(USER, 2, 'cal'), (USER, 1, 'calypsol')],
+        )
+        self.assertEqual(self.index.search('ca', 1), [(USER, 2, 'cal')])
+        self.assertEqual(self.index.search('ко', 10), [(GROUP, 1, 'Кошки')])
+        self.assertEqual(self.index.search('x', 10), [])
+
+    def test_put_and_remove(self):
+        """Записи добавляются и удаляются из индекса."""
+        self.index.put(USER, 2, 'leo', {'leo'})
+        self.index.remove(GROUP, 1)
+        self.assertEqual(self.index.search('cal', 10), [(USER, 1, 'calypsol')])
+        self.assertEqual(self.index.search('le', 10), [(USER, 2, 'leo')])
+        self.assertEqual(self.index.search('cats', 10), [])
+
+
+class AutocompleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        User.objects.create_user(username='calm', is_active=False)
+        cls.group = Group.objects.create(
+            title='Весёлые коты', slug='cats', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        autocomplete.invalidate()
+
+    def test_endpoint(self):
+        """Ищутся активные пользователи и группы по словам названия."""
+        url = reverse('api:autocomplete')
+        response = Client().get(url, {'q': 'Cal'})
+        self.assertEqual(response.json()['results'], [{
+            'type': USER, 'id': self.user.id, 'name': 'calypsol',
+            'url': reverse('posts:profile', args=['calypsol']),
+        }])
+        response = Client().get(url, {'q': 'кот'})
+        self.assertEqual(
+            response.json()['results'][0]['url'],
+            reverse('posts:group_list', args=['cats']),
+        )
+        self.assertEqual(
+            Client().get(url, {'q': 'c', 'limit': 'x'}).status_code, 400
+        )
+
+    def test_apply_changes(self):
+        """Изменения применяются без перечитывания, а изменения из другого
+        процесса приводят к перезагрузке."""
+        autocomplete.search('a')
+        autocomplete.put_group(self.group.id, 'Собаки', 'dogs')
+        autocomplete.remove_user(self.user.id)
+        self.assertEqual(autocomplete.search('cal'), [])
+        self.assertEqual(autocomplete.search('соб')[0]['id'], self.group.id)
+        cache.incr('posts:autocomplete:version')
+        self.assertEqual(
+            autocomplete.search('cal')[0]['id'], self.user.id
+        )
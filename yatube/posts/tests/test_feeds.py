@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..feeds import FEED_ITEMS
+from ..freshness import bump
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание группы'
+        )
+        cls.post = Post.objects.create(
+            text='Пост в группе #кошки', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds(self):
+        """Ленты сайта, группы и автора в RSS и Atom."""
+        for name, args in (
+            ('posts:index_rss', []),
+            ('posts:group_rss', ['group']),
+            ('posts:profile_rss', ['calypsol']),
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=args))
+                self.assertEqual(
+                    response['Content-Type'], 'application/rss+xml; '
+                    'charset=utf-8'
+                )
+                self.assertContains(response, '<category>кошки</category>')
+                self.assertContains(
+                    response, reverse('posts:post_detail', args=[
+                        self.post.id
+                    ])
+                )
+        response = self.client.get(reverse('posts:group_atom', args=['group']))
+        self.assertContains(response, '<subtitle>Описание группы</subtitle>')
+        response = self.client.get(reverse('posts:group_rss', args=['none']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_items_capped(self):
+        """В ленте не больше FEED_ITEMS записей."""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=self.user)
+            for number in range(FEED_ITEMS)
+        )
+        response = self.client.get(reverse('posts:index_rss'))
+        self.assertEqual(
+            response.content.count(b'<item>'), FEED_ITEMS
+        )
+
+    def test_cached_until_bump(self):
+        """Без изменения версий лента берётся из кэша и отдаёт 304."""
+        url = reverse('posts:profile_atom', args=['calypsol'])
+        response = self.client.get(url)
+        Post.objects.filter(id=self.post.id).update(
+            text='Новый текст', text_html='Новый текст'
+        )
+        cached = self.client.get(url)
+        self.assertEqual(cached.content, response.content)
+        not_modified = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        bump(f'author:{self.user.id}')
+        self.assertContains(self.client.get(url), 'Новый текст')
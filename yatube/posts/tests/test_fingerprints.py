@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..fingerprints import BAND_FIELDS, find_duplicate
+from ..models import Post
+
+User = get_user_model()
+
+TEXT = ('Сегодня гуляли по набережной, смотрели на закат и кормили чаек '
+        'остатками булки из ближайшей пекарни')
+NEAR = ('Сегодня гуляли по набережной, смотрели на закат и кормили чаек '
+        'остатками батона из ближайшей пекарни')
+OTHER = 'Рецепт борща со свёклой, капустой и говядиной на три литра'
+
+
+class FingerprintTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.post = Post.objects.create(text=TEXT, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bands_saved(self):
+        """Полосы считаются при сохранении и обновляются вместе с text."""
+        post = Post.objects.get(id=self.post.id)
+        bands = [getattr(post, field) for field in BAND_FIELDS]
+        self.assertNotIn(None, bands)
+        post.text = OTHER
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertNotEqual(
+            [getattr(post, field) for field in BAND_FIELDS], bands
+        )
+
+    def test_find_duplicate(self):
+        """Находится почти повтор, но не другой текст и не сам пост."""
+        self.assertEqual(
+            find_duplicate(NEAR, Post.objects.all()), self.post.id
+        )
+        self.assertIsNone(find_duplicate(OTHER, Post.objects.all()))
+        self.assertIsNone(find_duplicate(
+            TEXT, Post.objects.all(), exclude_id=self.post.id
+        ))
+
+    def test_post_create_flags_duplicate(self):
+        """Почти повтор сохраняется со ссылкой на исходный пост."""
+        client = Client()
+        client.force_login(self.user)
+        client.post(reverse('posts:post_create'), {'text': NEAR})
+        client.post(reverse('posts:post_create'), {'text': OTHER})
+        self.assertEqual(
+            Post.objects.get(text=NEAR).duplicate_of, self.post
+        )
+        self.assertIsNone(Post.objects.get(text=OTHER).duplicate_of)
+
+    def test_cluster_command(self):
+        """Команда отмечает все повторы группы ссылкой на самый ранний
+        пост и снимает устаревшие отметки."""
+        copies = [
+            Post.objects.create(text=text, author=self.user)
+            for text in (NEAR, TEXT, OTHER)
+        ]
+        Post.objects.filter(id=copies[2].id).update(
+            duplicate_of=self.post
+        )
+        call_command('cluster_duplicates', chunk_size=2, stdout=StringIO())
+        duplicates = dict(Post.objects.values_list('id', 'duplicate_of'))
+        self.assertEqual(duplicates[copies[0].id], self.post.id)
+        self.assertEqual(duplicates[copies[1].id], self.post.id)
+        self.assertIsNone(duplicates[copies[2].id])
+        self.assertIsNone(duplicates[self.post.id])
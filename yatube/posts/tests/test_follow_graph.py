@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from ..follow_graph import Adjacency, FollowGraph, follow_graph
+from ..models import Follow
+
+User = get_user_model()
+
+
+class AdjacencyTest(SimpleTestCase):
+    def setUp(self):
+        self.adjacency = Adjacency([(1, 2), (1, 5), (3, 1), (3, 2)])
+
+    def test_contains(self):
+        """Проверка наличия ребра в отсортированных массивах."""
+        self.assertTrue(self.adjacency.contains(1, 5))
+        self.assertFalse(self.adjacency.contains(1, 3))
+        self.assertFalse(self.adjacency.contains(2, 1))
+        self.assertEqual(self.adjacency.contains_many(3, [1, 2, 4]), {1, 2})
+
+    def test_incremental_changes(self):
+        """Добавление и удаление рёбер до и после уплотнения."""
+        self.adjacency.add(1, 3)
+        self.adjacency.remove(1, 2)
+        self.adjacency.add(4, 1)
+        self.assertEqual(self.adjacency.neighbours(1), [3, 5])
+        self.assertEqual(self.adjacency.degree(4), 1)
+        self.adjacency.compact()
+        self.assertEqual(self.adjacency.neighbours(1), [3, 5])
+        self.assertEqual(self.adjacency.neighbours(4), [1])
+        self.assertTrue(self.adjacency.contains(1, 3))
+        self.assertFalse(self.adjacency.contains(1, 2))
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.author = User.objects.create_user(username='calyps')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Follow.objects.create(user=cls.author, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        follow_graph.invalidate()
+
+    def test_load_from_follow(self):
+        """Граф загружается из таблицы подписок."""
+        self.assertTrue(
+            follow_graph.is_following(self.user.id, self.author.id)
+        )
+        self.assertTrue(follow_graph.is_mutual(self.user.id, self.author.id))
+        self.assertEqual(follow_graph.followers_of(self.author.id),
+                         [self.user.id])
+        self.assertEqual(follow_graph.following_count(self.user.id), 1)
+
+    def test_apply_changes(self):
+        """Изменения применяются без перечитывания графа."""
+        follow_graph.is_following(self.user.id, self.author.id)
+        follow_graph.remove(self.user.id, self.author.id)
+        self.assertFalse(
+            follow_graph.is_following(self.user.id, self.author.id)
+        )
+        self.assertFalse(follow_graph.is_mutual(self.user.id, self.author.id))
+
+    def test_other_process_change_without_reload(self):
+        """Изменение из другого процесса применяется без чтения таблицы
+        подписок."""
+        other = FollowGraph()
+        follow_graph.is_following(self.user.id, self.author.id)
+        other.is_following(self.user.id, self.author.id)
+        other.remove(self.user.id, self.author.id)
+        with self.assertNumQueries(0):
+            self.assertFalse(
+                follow_graph.is_following(self.user.id, self.author.id)
+            )
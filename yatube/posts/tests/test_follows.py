@@ -0,0 +1,111 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notifications.models import Notification
+from outbox.models import OutboxEvent
+
+from ..follows import follow, unfollow
+from ..models import Follow
+
+User = get_user_model()
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_follow_is_idempotent(self):
+        """Повторная подписка ничего не меняет, а уведомления и журнал
+        получают только созданные строки."""
+        author_ids = [author.id for author in self.authors]
+        self.assertEqual(follow(self.user.id, author_ids[:2]), 2)
+        self.assertEqual(follow(self.user.id, author_ids), 1)
+        # Точка сохранения, сам INSERT и её освобождение.
+        with self.assertNumQueries(3):
+            self.assertEqual(follow(self.user.id, author_ids), 0)
+        self.assertEqual(follow(self.user.id, [self.user.id]), 0)
+        self.assertEqual(Follow.objects.count(), 3)
+        self.assertEqual(
+            Notification.objects.filter(actor=self.user).count(), 3
+        )
+        self.assertEqual(
+            OutboxEvent.objects.filter(topic='posts.follow').count(), 3
+        )
+
+    def test_queries_do_not_grow_with_authors(self):
+        """Подписка на пачку авторов и отписка от неё обходятся тем же
+        числом запросов, что и для одного автора."""
+        many = [
+            User.objects.create_user(username=f'many{number}').id
+            for number in range(20)
+        ]
+        # Первая подписка ставит в очередь рассылку сводок.
+        follow(self.user.id, [self.authors[1].id])
+        counts = []
+        for author_ids in ([self.authors[0].id], many):
+            with CaptureQueriesContext(connection) as followed:
+                follow(self.user.id, author_ids)
+            with CaptureQueriesContext(connection) as unfollowed:
+                unfollow(self.user.id, author_id__in=author_ids)
+            counts.append((len(followed), len(unfollowed)))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_unfollow(self):
+        """Отписка удаляет строку один раз и пишет событие в журнал."""
+        follow(self.user.id, [self.authors[0].id])
+        self.assertEqual(
+            unfollow(self.user.id, author__username='author0'), 1
+        )
+        self.assertEqual(
+            unfollow(self.user.id, author__username='author0'), 0
+        )
+        self.assertEqual(
+            OutboxEvent.objects.filter(
+                topic='posts.follow', action='deleted'
+            ).count(), 1
+        )
+
+    def test_bulk_api(self):
+        """Пакетная подписка через API сообщает число изменённых строк."""
+        url = reverse('api:follow_bulk')
+        body = json.dumps({'usernames': ['author0', 'author1', 'nobody']})
+        response = self.authorized_client.post(
+            url, body, content_type='application/json'
+        )
+        self.assertEqual(
+            response.json(), {'changed': 2, 'unknown': ['nobody']}
+        )
+        response = self.authorized_client.delete(
+            url, body, content_type='application/json'
+        )
+        self.assertEqual(response.json()['changed'], 2)
+        response = Client().post(url, body, content_type='application/json')
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_command(self):
+        """Команда подписывает пользователя на перечисленных авторов."""
+        out = StringIO()
+        call_command(
+            'follow_users', 'calypsol', 'author0', 'author2', stdout=out
+        )
+        self.assertIn('Изменено подписок: 2', out.getvalue())
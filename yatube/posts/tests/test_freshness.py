@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..freshness import bump
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст',
+            group=cls.group,
+            author=cls.user,
+        )
+        cls.urls = {
+            reverse('posts:index'): 'posts',
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}): (
+                f'group:{cls.group.id}'
+            ),
+            reverse('posts:profile', kwargs={'username': cls.user}): (
+                f'author:{cls.user.id}'
+            ),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.id}): (
+                f'post:{cls.post.id}'
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_not_modified_until_scope_changes(self):
+        """Повторный запрос с ETag получает 304 до изменения области."""
+        for url, scope in self.urls.items():
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                bump(scope)
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_viewer(self):
+        """Гость и авторизованный пользователь получают разные ETag."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                guest = self.guest_client.get(url)
+                authorized = self.authorized_client.get(url)
+                self.assertNotEqual(guest['ETag'], authorized['ETag'])
+                self.assertIn('private', authorized['Cache-Control'])
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=guest['ETag']
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
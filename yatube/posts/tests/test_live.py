@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from outbox.models import OutboxEvent
+
+from ..follow_graph import follow_graph
+from ..live import Broadcaster, Subscriber, broadcaster
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(LIVE_STREAM_SECONDS=0)
+class LiveFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.author = User.objects.create_user(username='calyps')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        follow_graph.invalidate()
+        self.client = Client()
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(
+            broadcaster, 'subscribe', side_effect=Subscriber
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stream(self, last_id, **params):
+        response = self.client.get(
+            reverse('posts:live'), params, HTTP_LAST_EVENT_ID=str(last_id)
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode()
+
+    def test_resume_from_last_event_id(self):
+        """Клиент получает события после Last-Event-ID."""
+        first = Post.objects.create(text='Первый', author=self.author)
+        last_id = OutboxEvent.objects.get(
+            topic='posts.post', object_id=first.pk
+        ).id
+        second = Post.objects.create(text='Второй', author=self.author)
+        content = self.stream(last_id)
+        self.assertNotIn(f'"post": {first.pk},', content)
+        self.assertIn(f'"post": {second.pk},', content)
+
+    def test_follow_feed(self):
+        """Лента подписок пропускает посты чужих авторов."""
+        OutboxEvent.objects.all().delete()
+        Post.objects.create(text='Чужой', author=self.user)
+        post = Post.objects.create(text='Свой', author=self.author)
+        content = self.stream(0, feed='follow')
+        self.assertEqual(content.count('event: post'), 1)
+        self.assertIn(f'"post": {post.pk},', content)
+
+    def test_poll_fans_out(self):
+        """Один опрос раздаёт события всем подписчикам."""
+        live = Broadcaster()
+        subscribers = [Subscriber() for _ in range(3)]
+        live.subscribers.update(subscribers)
+        OutboxEvent.objects.all().delete()
+        Post.objects.create(text='Новый', author=self.author)
+        with self.assertNumQueries(3):
+            events = live.poll()
+        self.assertEqual(len(events), 1)
+        for subscriber in subscribers:
+            self.assertEqual(subscriber.queue.get_nowait(), events)
+
+    def test_poll_filters_follow_feeds_once(self):
+        """Видимость для ленты подписок решается на всю пачку, а не по
+        клиенту: число запросов не зависит от числа подписчиков."""
+        live = Broadcaster()
+        followers = [Subscriber(self.user.id) for _ in range(3)]
+        stranger = Subscriber(self.author.id)
+        live.subscribers.update([*followers, stranger])
+        OutboxEvent.objects.all().delete()
+        follow_graph.load()
+        Post.objects.create(text='Новый', author=self.author)
+        with self.assertNumQueries(3):
+            events = live.poll()
+        for subscriber in followers:
+            self.assertEqual(subscriber.queue.get_nowait(), events)
+        self.assertTrue(stranger.queue.empty())
+
+    def test_late_event_delivered(self):
+        """Пост, чья транзакция зафиксировалась позже следующего, всё равно
+        раздаётся подписчикам."""
+        live = Broadcaster()
+        subscriber = Subscriber()
+        live.subscribers.add(subscriber)
+        first = Post.objects.create(text='Первый', author=self.author)
+        Post.objects.create(text='Второй', author=self.author)
+        late = OutboxEvent.objects.get(topic='posts.post', object_id=first.pk)
+        late_id = late.id
+        late.delete()
+        live.poll()
+        self.assertEqual(live.missing, [late_id])
+        late.id = late_id
+        late.save(force_insert=True)
+        self.assertEqual(
+            [event['post'] for event in live.poll()], [first.pk]
+        )
+        self.assertEqual(live.missing, [])
+
+    @override_settings(LIVE_MAX_STREAMS=0)
+    def test_streams_capped(self):
+        """Сверх LIVE_MAX_STREAMS поток не открывается, клиент получает
+        503."""
+        self.assertIsNone(Broadcaster().subscribe())
+        with mock.patch.object(broadcaster, 'subscribe', return_value=None):
+            response = self.client.get(reverse('posts:live'))
+        self.assertEqual(response.status_code, 503)
@@ -1,7 +1,18 @@
+from io import StringIO
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from jobs.models import Job
 
 from ..models import Group, Post
+from ..signals import posts_migrated
+from ..tasks import warm_thumbnails
+from ..rendering import EXCERPT_LENGTH, RENDER_VERSION
 
 User = get_user_model()
 
@@ -32,3 +43,78 @@ class PostModelTest(TestCase):
         group = PostModelTest.group
         expected_group_name = group.title
         self.assertEqual(expected_group_name, str(group))
+
+    def test_text_rendered_on_save(self):
+        """HTML текста экранируется и готовится при сохранении."""
+        post = Post.objects.create(author=self.user, text='<b>a</b>\nb')
+        self.assertEqual(post.text_html, '&lt;b&gt;a&lt;/b&gt;<br>b')
+        post.text = 'c\nd'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.html, 'c<br>d')
+
+    def test_rerender_command(self):
+        """Команда перерисовывает строки со старой версией рендерера."""
+        Post.objects.update(text_html='', render_version=0)
+        call_command('rerender_posts', stdout=StringIO())
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.render_version, RENDER_VERSION)
+        self.assertEqual(post.text_html, 'Тестовый текст')
+
+    def test_stale_html_not_escaped(self):
+        """HTML старой версии рендерера готовится заново и не экранируется
+        шаблоном повторно."""
+        Post.objects.filter(pk=self.post.pk).update(
+            text='a\n#tag', text_html='', render_version=0
+        )
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertContains(response, 'a<br><a href="/tags/tag/">#tag</a>')
+
+    def test_stale_excerpt_not_escaped(self):
+        """Начало текста старой версии в ленте не экранируется повторно."""
+        cache.clear()
+        Post.objects.filter(pk=self.post.pk).update(
+            text='a\n#tag', excerpt_html='', render_version=0
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'a<br><a href="/tags/tag/">#tag</a>')
+
+    def test_rerendered_after_migrate(self):
+        """После миграций строки старой версии перерисовываются сами."""
+        Post.objects.update(text_html='', render_version=0)
+        posts_migrated(
+            apps.get_app_config('posts'), apps=apps, using='default'
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.render_version, RENDER_VERSION)
+        self.assertEqual(post.text_html, 'Тестовый текст')
+
+    def test_thumbnails_only_for_new_image(self):
+        """Миниатюры ставятся в очередь, только когда картинка изменилась."""
+        thumbnails = Job.objects.filter(task=warm_thumbnails.task_name)
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image='posts/first.gif'
+        )
+        self.assertEqual(thumbnails.count(), 1)
+        thumbnails.delete()
+        post = Post.objects.get(pk=post.pk)
+        post.text = 'Другой текст'
+        post.save()
+        self.assertFalse(thumbnails.exists())
+        post.image = 'posts/second.gif'
+        post.save()
+        self.assertEqual(thumbnails.count(), 1)
+
+    def test_excerpt(self):
+        """Ленты получают начало текста без загрузки полного текста."""
+        cache.clear()
+        post = Post.objects.create(author=self.user, text='Слово ' * 100)
+        self.assertTrue(post.is_truncated)
+        self.assertLessEqual(len(post.excerpt_html), EXCERPT_LENGTH)
+        self.assertFalse(self.post.is_truncated)
+        response = self.client.get(reverse('posts:index'))
+        listed = response.context['page_obj'][0]
+        self.assertIn('text', listed.get_deferred_fields())
+        self.assertContains(response, post.excerpt_html)
@@ -0,0 +1,161 @@
+import math
+import random
+from collections import defaultdict
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import work
+
+from .. import recommendations
+from ..follow_graph import follow_graph
+from ..freshness import VERSION_KEY, markers
+from ..models import Follow, FollowSuggestion
+from ..recommendations import (CoFollowModel, build_suggestions,
+                               suggested_authors)
+from ..tasks import rebuild_suggestions
+
+User = get_user_model()
+
+
+def reference_scores(pairs):
+    following = defaultdict(set)
+    followers = defaultdict(set)
+    for user, author in pairs:
+        following[user].add(author)
+        followers[author].add(user)
+    scores = defaultdict(lambda: defaultdict(float))
+    for user in following:
+        for other in following:
+            common = len(following[user] & following[other])
+            if other == user or not common:
+                continue
+            weight = common / math.sqrt(
+                len(following[user]) * len(following[other])
+            )
+            for author in following[other] - following[user] - {user}:
+                scores[user][author] += weight
+    return scores
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_scores_match_reference(self):
+        """Векторный расчёт совпадает с прямым перебором."""
+        rng = random.Random(1)
+        pairs = {
+            (rng.randrange(40), rng.randrange(40)) for _ in range(300)
+        }
+        pairs = [(user, author) for user, author in pairs if user != author]
+        model = CoFollowModel(pairs)
+        rows = model.active_rows()
+        owners, candidates, totals = model.scores(rows)
+        expected = reference_scores(pairs)
+        found = defaultdict(dict)
+        for owner, candidate, total in zip(owners, candidates, totals):
+            found[model.ids[rows[owner]]][model.ids[candidate]] = total
+        self.assertEqual(
+            {user: set(items) for user, items in found.items()},
+            {user: set(items) for user, items in expected.items() if items},
+        )
+        for user, items in expected.items():
+            for author, score in items.items():
+                self.assertAlmostEqual(found[user][author], score)
+
+    def test_suggestions_on_profile(self):
+        """Рекомендации сохраняются и показываются без уже подписанных."""
+        users = [
+            User.objects.create_user(username=f'user{number}')
+            for number in range(4)
+        ]
+        for user, author in ((0, 1), (2, 1), (2, 3)):
+            Follow.objects.create(user=users[user], author=users[author])
+        build_suggestions()
+        self.assertEqual(
+            FollowSuggestion.objects.get(user=users[0]).author_ids,
+            f'[{users[3].id}]',
+        )
+        follow_graph.invalidate()
+        client = Client()
+        client.force_login(users[0])
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['suggestions'], [users[3]])
+
+    @override_settings(SUGGESTIONS_REBUILD_DELAY=0)
+    def test_rebuild_scheduled_on_follow(self):
+        """Подписки ставят по одному отложенному пересчёту на подписчика и
+        сбрасывают только его личную область, а не весь сайт."""
+        users = [
+            User.objects.create_user(username=f'user{number}')
+            for number in range(4)
+        ]
+        for user, author in ((0, 1), (2, 1), (2, 3)):
+            Follow.objects.create(user=users[user], author=users[author])
+        self.assertEqual(
+            Job.objects.filter(task=rebuild_suggestions.task_name).count(), 2
+        )
+        markers(['site'])
+        site = cache.get(VERSION_KEY.format('site'))
+        work('test', once=True)
+        work('test', once=True)
+        self.assertEqual(
+            FollowSuggestion.objects.get(user=users[0]).author_ids,
+            f'[{users[3].id}]',
+        )
+        self.assertEqual(cache.get(VERSION_KEY.format('site')), site)
+        self.assertIsNotNone(cache.get(VERSION_KEY.format(
+            f'viewer:{users[0].id}'
+        )))
+
+    def test_partial_build_matches_full(self):
+        """Пересчёт одного пользователя совпадает с полным пересчётом."""
+        rng = random.Random(2)
+        users = [
+            User.objects.create_user(username=f'user{number}')
+            for number in range(15)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=users[user], author=users[author])
+            for user, author in {
+                (rng.randrange(15), rng.randrange(15)) for _ in range(60)
+            }
+            if user != author
+        )
+        build_suggestions()
+        full = dict(FollowSuggestion.objects.values_list(
+            'user_id', 'author_ids'
+        ))
+        FollowSuggestion.objects.all().delete()
+        for user in users:
+            build_suggestions(user_ids=[user.id])
+        self.assertEqual(dict(FollowSuggestion.objects.values_list(
+            'user_id', 'author_ids'
+        )), full)
+
+    def test_popular_authors_not_expanded(self):
+        """Через автора с подписчиками сверх MAX_FAN_OUT похожие
+        пользователи не ищутся."""
+        pairs = [(1, 10), (2, 10), (3, 10), (2, 20), (4, 20), (4, 30)]
+        with mock.patch.object(recommendations, 'MAX_FAN_OUT', 2):
+            model = CoFollowModel(pairs)
+        top = model.top(model.active_rows())
+        self.assertNotIn(1, top)
+        self.assertEqual(top[2], [30])
+
+    def test_inactive_authors_hidden(self):
+        """Неактивные авторы не попадают в выдачу рекомендаций."""
+        reader = User.objects.create_user(username='reader')
+        active = User.objects.create_user(username='active')
+        inactive = User.objects.create_user(
+            username='inactive', is_active=False
+        )
+        FollowSuggestion.objects.create(
+            user=reader, author_ids=f'[{inactive.id}, {active.id}]'
+        )
+        self.assertEqual(suggested_authors(reader.id), [active])
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from outbox.log import drain, reset
+from outbox.models import OutboxEvent
+
+from ..models import Post, RelatedPost
+from .. import related
+from ..related import rebuild, related_posts, update
+
+User = get_user_model()
+
+TEXTS = (
+    'Кошки любят молоко и спать на солнце',
+    'Кошки и котята пьют молоко',
+    'Собаки любят гулять в парке',
+    'Собаки и щенки гуляют в парке утром',
+    'Рецепт борща со свёклой и капустой',
+    'Борщ варят со свёклой, капустой и мясом',
+)
+
+
+class RelatedPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.posts = [
+            Post.objects.create(text=text, author=cls.user) for text in TEXTS
+        ]
+
+    def test_rebuild(self):
+        """Ближайший сосед поста — пост на ту же тему."""
+        rebuild(chunk_size=4, k=2)
+        for first, second in ((0, 1), (2, 3), (4, 5)):
+            self.assertEqual(
+                related_posts(self.posts[first].id)[0], self.posts[second]
+            )
+            self.assertEqual(
+                related_posts(self.posts[second].id)[0], self.posts[first]
+            )
+
+    def test_failed_rebuild_keeps_old_links(self):
+        """Сбой посреди пересчёта не оставляет таблицу соседей пустой."""
+        rebuild(chunk_size=4, k=2)
+        before = RelatedPost.objects.count()
+        with mock.patch.object(related, 'nearest', side_effect=MemoryError):
+            with self.assertRaises(MemoryError):
+                rebuild(chunk_size=4, k=2)
+        self.assertEqual(RelatedPost.objects.count(), before)
+        self.assertTrue(related_posts(self.posts[0].id))
+
+    def test_incremental_update(self):
+        """Новый пост получает соседей и сам попадает в их списки."""
+        rebuild()
+        reset('related_posts', OutboxEvent.objects.last().id)
+        post = Post.objects.create(
+            text='Котята и кошки пьют молоко на солнце', author=self.user
+        )
+        drain('related_posts')
+        self.assertIn(self.posts[1], list(related_posts(post.id)))
+        self.assertTrue(RelatedPost.objects.filter(
+            post=self.posts[0], related=post
+        ).exists())
+
+    def test_update_tokenizes_only_changed_posts(self):
+        """Остальные посты берутся из сохранённых векторов."""
+        rebuild()
+        post = Post.objects.create(
+            text='Котята и кошки пьют молоко на солнце', author=self.user
+        )
+        with mock.patch.object(
+            related, 'tokenize', wraps=related.tokenize
+        ) as tokenize:
+            update([post.id])
+        self.assertEqual(tokenize.call_count, 1)
+        self.assertIn(self.posts[1], list(related_posts(post.id)))
+
+    def test_update_refills_sources(self):
+        """Пост, потерявший соседа после правки, получает следующего
+        по близости."""
+        rebuild(k=1)
+        self.assertEqual(related_posts(self.posts[0].id)[0], self.posts[1])
+        Post.objects.filter(id=self.posts[1].id).update(
+            text='Борщ варят с капустой'
+        )
+        update([self.posts[1].id], k=1)
+        self.assertEqual(
+            list(related_posts(self.posts[0].id)), [self.posts[2]]
+        )
+
+    def test_post_detail_block(self):
+        """Страница поста показывает похожие посты."""
+        rebuild()
+        cache.clear()
+        response = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': self.posts[0].id})
+        )
+        self.assertEqual(response.context['related_posts'][0], self.posts[1])
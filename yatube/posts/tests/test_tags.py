@@ -0,0 +1,105 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Mention, Post, PostTag, Tag
+from ..rendering import MAX_TAG_LENGTH, render_text
+from ..tags import extract_mentions, extract_tags
+
+User = get_user_model()
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.friend = User.objects.create_user(username='leo.t')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_extract(self):
+        """Теги нормализуются и не повторяются, точка в конце упоминания
+        отбрасывается, экранированные сущности не считаются тегами."""
+        self.assertEqual(
+            extract_tags('#Кошки и #кошки, а#нет &#39; #котята_2'),
+            ['кошки', 'котята_2'],
+        )
+        self.assertEqual(
+            extract_mentions('Привет, @leo.t. Почта a@b.ru и @calypsol'),
+            ['leo.t', 'calypsol'],
+        )
+
+    def test_long_tag_not_linked(self):
+        """Тег длиннее MAX_TAG_LENGTH не индексируется и не становится
+        ссылкой на пустую ленту."""
+        text = '#' + 'к' * (MAX_TAG_LENGTH + 1)
+        self.assertEqual(extract_tags(text), [])
+        self.assertEqual(render_text(text), text)
+        self.assertIn('<a href=', render_text('#' + 'к' * MAX_TAG_LENGTH))
+
+    def test_index_on_save(self):
+        """Теги и упоминания пересобираются при изменении текста."""
+        post = Post.objects.create(
+            text='#Кошки для @leo.t и @nobody', author=self.user
+        )
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['кошки'],
+        )
+        self.assertEqual(
+            list(post.mentions.values_list('user', flat=True)),
+            [self.friend.id],
+        )
+        self.assertIn(
+            f'<a href="{reverse("posts:tag_posts", args=["кошки"])}">',
+            post.text_html,
+        )
+        post.text = '#собаки'
+        post.save(update_fields=['text'])
+        self.assertEqual(
+            list(post.post_tags.values_list('tag__name', flat=True)),
+            ['собаки'],
+        )
+        self.assertFalse(post.mentions.exists())
+
+    @override_settings(LIMIT_POST=2)
+    def test_tag_feed_cursor(self):
+        """Лента тега идёт от новых к старым страницами по курсору."""
+        posts = [
+            Post.objects.create(text=f'#кошки {number}', author=self.user)
+            for number in range(3)
+        ]
+        Post.objects.create(text='#собаки', author=self.user)
+        client = Client()
+        url = reverse('posts:tag_posts', args=['Кошки'])
+        response = client.get(url)
+        self.assertEqual(response.context['posts'], posts[:0:-1])
+        response = client.get(
+            url, {'before': response.context['next_cursor']}
+        )
+        self.assertEqual(response.context['posts'], posts[:1])
+        self.assertIsNone(response.context['next_cursor'])
+        response = client.get(reverse('posts:tag_posts', args=['нет']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_mentions_feed(self):
+        """Лента упоминаний показывает посты, где упомянут пользователь."""
+        post = Post.objects.create(text='Привет, @leo.t', author=self.user)
+        response = Client().get(reverse('posts:mentions', args=['leo.t']))
+        self.assertEqual(response.context['posts'], [post])
+
+    def test_backfill_command(self):
+        """index_tags заново строит связи для уже сохранённых постов."""
+        Post.objects.create(text='#кошки @leo.t', author=self.user)
+        PostTag.objects.all().delete()
+        Mention.objects.all().delete()
+        Tag.objects.all().delete()
+        call_command('index_tags', chunk_size=1, stdout=StringIO())
+        self.assertEqual(PostTag.objects.get().tag.name, 'кошки')
+        self.assertEqual(Mention.objects.get().user, self.friend)
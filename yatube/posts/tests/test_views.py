@@ -297,6 +297,7 @@ class FollowsViewsTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.author_client = Client()
         self.author_client.force_login(self.second_user)
         self.follower_client = Client()
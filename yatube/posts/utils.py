@@ -1,8 +1,35 @@
+import base64
+import binascii
+
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.utils.dateparse import parse_datetime
+
+# Лентам хватает готового excerpt_html, полный текст нужен только на
+# странице поста.
+FEED_DEFERRED = ('text', 'text_html')
 
 
 def paginate(posts, request):
     paginator = Paginator(posts, settings.LIMIT_POST)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def encode_cursor(pub_date, post_id):
+    """Курсор ленты по (pub_date, id) для API и страниц тегов."""
+    raw = f'{pub_date.isoformat()}|{post_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    """(pub_date, post_id) из курсора или None, если он испорчен."""
+    try:
+        pub_date, post_id = base64.urlsafe_b64decode(
+            value.encode()
+        ).decode().split('|')
+        pub_date = parse_datetime(pub_date)
+        post_id = int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return pub_date and (pub_date, post_id)
@@ -1,15 +1,62 @@
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.cache import cache_page
 
+from .archive import author_posts, get_post
+from .follow_graph import follow_graph
+from .fingerprints import find_duplicate
+from .follows import follow, unfollow
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
-from .utils import paginate
+from .freshness import conditional_page
+from .live import RETRY_MS, broadcaster, event_stream
+from .models import ArchivedPost, Group, Post, Tag, User
+from .recommendations import suggested_authors
+from .related import related_posts
+from .tags import feed_page
+from .utils import FEED_DEFERRED, decode_cursor, encode_cursor, paginate
+
+
+def index_scopes(request):
+    return ['posts', 'groups', 'users']
+
+
+def tag_scopes(request, **kwargs):
+    return ['posts', 'groups', 'users']
+
+
+def group_scopes(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    return group_id and [f'group:{group_id}', 'groups', 'users']
+
+
+def profile_scopes(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True
+    ).first()
+    return author_id and [f'author:{author_id}', 'groups']
 
 
+def post_scopes(request, post_id):
+    post = Post.objects.filter(id=post_id).values_list(
+        'author_id', 'group_id'
+    ).first() or ArchivedPost.objects.filter(id=post_id).values_list(
+        'author_id', 'group_id'
+    ).first()
+    return post and [
+        f'post:{post_id}', f'author:{post[0]}', f'group:{post[1]}'
+    ]
+
+
+@conditional_page(index_scopes)
 @cache_page(20, key_prefix='index_page')
 def index(request):
-    posts = Post.objects.select_related('group')
+    posts = Post.objects.select_related('group').defer(*FEED_DEFERRED)
     page_obj = paginate(posts, request)
     context = {
         'page_obj': page_obj,
@@ -17,9 +64,12 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@conditional_page(group_scopes)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author', 'group')
+    posts = group.posts.select_related('author', 'group').defer(
+        *FEED_DEFERRED
+    )
     page_obj = paginate(posts, request)
     context = {
         'group': group,
@@ -29,30 +79,63 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional_page(profile_scopes)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    posts = author_posts(author)
     page_obj = paginate(posts, request)
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=author
-    ).exists()
+    following = request.user.is_authenticated and follow_graph.is_following(
+        request.user.id, author.id
+    )
     context = {
         'posts': posts,
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'followers_count': follow_graph.followers_count(author.id),
+        'following_count': follow_graph.following_count(author.id),
+        'suggestions': request.user.is_authenticated and suggested_authors(
+            request.user.id
+        ),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def tag_feed(request, links, title):
+    before = decode_cursor(request.GET.get('before', ''))
+    posts, next_cursor = feed_page(links, before, settings.LIMIT_POST)
+    context = {
+        'title': title,
+        'posts': posts,
+        'next_cursor': next_cursor and encode_cursor(*next_cursor),
+    }
+    return render(request, 'posts/tag_list.html', context)
+
+
+@conditional_page(tag_scopes)
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    return tag_feed(request, tag.post_tags.all(), str(tag))
+
+
+@conditional_page(tag_scopes)
+def mentions(request, username):
+    user = get_object_or_404(User, username=username)
+    return tag_feed(
+        request, user.mentions.all(), f'Упоминания @{user.username}'
+    )
+
+
+@conditional_page(post_scopes)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post, comments = get_post(post_id)
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.filter(post_id=post_id)
     context = {
         'post': post,
         'comments': comments,
         'form': form,
+        'archived': isinstance(post, ArchivedPost),
+        'related_posts': related_posts(post_id),
     }
     return render(request, 'posts/post_detail.html', context)
 
@@ -63,6 +146,7 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
+        post.duplicate_of_id = find_duplicate(post.text, Post.objects.all())
         post.save()
         return redirect('posts:profile', request.user)
     return render(request, 'posts/create_post.html', {'form': form})
@@ -104,27 +188,50 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = Post.objects.filter(
+        author__following__user=request.user
+    ).defer(*FEED_DEFERRED)
     page_obj = paginate(posts, request)
-    context = {'page_obj': page_obj}
+    context = {
+        'page_obj': page_obj,
+        'suggestions': suggested_authors(request.user.id),
+    }
     return render(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
-    user = get_object_or_404(User, username=username)
-    if request.user != user:
-        Follow.objects.get_or_create(
-            user_id=request.user.id,
-            author_id=user.id
-        )
+    author_id = get_object_or_404(
+        User.objects.values_list('id', flat=True), username=username
+    )
+    follow(request.user.id, [author_id])
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    user = get_object_or_404(User, username=username)
-    Follow.objects.filter(
-        user_id=request.user.id,
-        author_id=user.id).delete()
+    unfollow(request.user.id, author__username=username)
     return redirect('posts:profile', username=username)
+
+
+def live(request):
+    """Поток server-sent events о новых постах; ?feed=follow — только
+    от авторов, на которых подписан пользователь."""
+    last_id = request.META.get(
+        'HTTP_LAST_EVENT_ID', request.GET.get('last_event_id')
+    )
+    last_id = int(last_id) if last_id and last_id.isdigit() else None
+    user_id = None
+    if request.GET.get('feed') == 'follow' and request.user.is_authenticated:
+        user_id = request.user.id
+    subscriber = broadcaster.subscribe(user_id)
+    if subscriber is None:
+        response = HttpResponse(status=HTTPStatus.SERVICE_UNAVAILABLE)
+        response['Retry-After'] = str(RETRY_MS // 1000)
+        return response
+    response = StreamingHttpResponse(
+        event_stream(subscriber, last_id), content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
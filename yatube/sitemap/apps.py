@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class SitemapConfig(AppConfig):
+    name = 'sitemap'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,215 @@
+import heapq
+import os
+from bisect import bisect_right
+from itertools import islice
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core.compression import SUFFIXES, precompress_file
+from posts.models import ArchivedPost, Group, Post
+
+from .models import SitemapChunk
+
+User = get_user_model()
+
+INDEX_NAME = 'sitemap.xml'
+ITERATOR_CHUNK_SIZE = 2000
+# Метка, по которой адрес раздела из reverse() один раз делится на
+# неизменные начало и конец; из цифр, чтобы подходить и для int, и для
+# slug и str.
+PLACEHOLDER = '9081726354'
+HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+          '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+FOOTER = '</urlset>\n'
+
+
+class Section:
+    """Раздел карты: один или несколько источников с общими id, например
+    горячая и архивная таблицы постов."""
+
+    def __init__(self, name, querysets, url_name, key_field,
+                 lastmod_field=None):
+        self.name = name
+        self.querysets = querysets
+        self.url_name = url_name
+        self.key_field = key_field
+        self.lastmod_field = lastmod_field
+
+    def rows(self, first_id, last_id=None):
+        """Строки (id, ключ адреса, дата изменения) по возрастанию id;
+        каждый источник читается курсором через .iterator()."""
+        sources = []
+        for queryset in self.querysets:
+            queryset = queryset.filter(id__gte=first_id)
+            if last_id is not None:
+                queryset = queryset.filter(id__lte=last_id)
+            sources.append(queryset.order_by('id').values_list(
+                'id', self.key_field, self.lastmod_field or 'id'
+            ).iterator(chunk_size=ITERATOR_CHUNK_SIZE))
+        for object_id, key, lastmod in heapq.merge(*sources):
+            yield object_id, key, lastmod if self.lastmod_field else None
+
+    def has_after(self, object_id):
+        return any(
+            queryset.filter(id__gt=object_id).exists()
+            for queryset in self.querysets
+        )
+
+    @cached_property
+    def template(self):
+        return reverse(self.url_name, args=[PLACEHOLDER]).split(PLACEHOLDER)
+
+    def url(self, key):
+        """То же, что reverse(), но без разбора шаблонов на каждый
+        адрес."""
+        prefix, suffix = self.template
+        return (settings.SITE_URL + prefix
+                + quote(str(key), safe="/~:@!$&'()*+,;=") + suffix)
+
+
+SECTIONS = {
+    section.name: section for section in (
+        Section('posts', (Post.objects.all(), ArchivedPost.objects.all()),
+                'posts:post_detail', 'id', 'pub_date'),
+        Section('profiles', (User.objects.filter(is_active=True),),
+                'posts:profile', 'username'),
+        Section('groups', (Group.objects.all(),),
+                'posts:group_list', 'slug'),
+    )
+}
+
+
+def file_path(name):
+    return os.path.join(settings.SITEMAP_ROOT, name)
+
+
+def chunk_name(chunk):
+    return f'{chunk.section}-{chunk.number}.xml'
+
+
+def w3c_date(value):
+    return value.isoformat(timespec='seconds')
+
+
+def replace_file(path, lines):
+    """Пишет файл построчно во временный и атомарно подменяет им старый,
+    затем обновляет сжатые копии."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as target:
+        target.writelines(lines)
+    os.replace(temporary, path)
+    for suffix in SUFFIXES.values():
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    precompress_file(path)
+
+
+def write_chunk(section, chunk):
+    """Пересобирает файл по диапазону id. Открытый файл забирает не
+    больше SITEMAP_CHUNK_SIZE адресов и закрывается, когда заполнится;
+    границы закрытого файла не меняются, даже если объекты удалены."""
+    size = settings.SITEMAP_CHUNK_SIZE
+    rows = section.rows(
+        chunk.first_id, None if chunk.is_open else chunk.last_id
+    )
+    chunk.count = 0
+    chunk.lastmod = None
+
+    def lines():
+        yield HEADER
+        for object_id, key, lastmod in islice(rows, size):
+            chunk.count += 1
+            if chunk.is_open:
+                chunk.last_id = object_id
+            entry = f'<url><loc>{escape(section.url(key))}</loc>'
+            if lastmod:
+                entry += f'<lastmod>{w3c_date(lastmod)}</lastmod>'
+                chunk.lastmod = max(chunk.lastmod or lastmod, lastmod)
+            yield entry + '</url>\n'
+        yield FOOTER
+
+    replace_file(file_path(chunk_name(chunk)), lines())
+    if chunk.is_open and chunk.count == size:
+        chunk.is_open = False
+    chunk.dirty = False
+    chunk.save()
+
+
+def build_section(section, full=False):
+    """Пересобирает грязные файлы раздела и открытый файл, если в нём
+    появились новые id; возвращает число записанных файлов."""
+    chunks = SitemapChunk.objects.filter(section=section.name)
+    if full:
+        chunks.update(dirty=True)
+    chunks = list(chunks.order_by('number'))
+    if not chunks:
+        chunks = [SitemapChunk(section=section.name, number=0, first_id=0)]
+    written = 0
+    for chunk in chunks[:-1]:
+        if chunk.dirty:
+            write_chunk(section, chunk)
+            written += 1
+    tail = chunks[-1]
+    while tail.dirty or tail.pk is None or section.has_after(tail.last_id):
+        write_chunk(section, tail)
+        written += 1
+        if tail.is_open:
+            break
+        tail = SitemapChunk(
+            section=section.name, number=tail.number + 1,
+            first_id=tail.last_id + 1, last_id=tail.last_id,
+        )
+    return written
+
+
+def write_index():
+    """Индекс со ссылками на все непустые файлы разделов."""
+    now = w3c_date(timezone.now())
+
+    def lines():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex '
+               'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for chunk in SitemapChunk.objects.filter(count__gt=0).iterator():
+            location = settings.SITE_URL + reverse(
+                'sitemap:chunk', args=[chunk.section, chunk.number]
+            )
+            lastmod = w3c_date(chunk.lastmod) if chunk.lastmod else now
+            yield (f'<sitemap><loc>{escape(location)}</loc>'
+                   f'<lastmod>{lastmod}</lastmod></sitemap>\n')
+        yield '</sitemapindex>\n'
+
+    replace_file(file_path(INDEX_NAME), lines())
+
+
+def build(names=None, full=False):
+    """Обновляет разделы и индекс; возвращает число записанных файлов
+    по разделам."""
+    written = {
+        name: build_section(SECTIONS[name], full)
+        for name in names or SECTIONS
+    }
+    write_index()
+    return written
+
+
+def mark_changed(section, ids):
+    """Отмечает файлы, в диапазоны которых попадают изменённые id."""
+    chunks = list(SitemapChunk.objects.filter(section=section).order_by(
+        'first_id'
+    ).values_list('id', 'first_id'))
+    first_ids = [first_id for _, first_id in chunks]
+    dirty = set()
+    for object_id in ids:
+        position = bisect_right(first_ids, object_id)
+        if position:
+            dirty.add(chunks[position - 1][0])
+    if dirty:
+        SitemapChunk.objects.filter(id__in=dirty).update(dirty=True)
+    return len(dirty)
@@ -0,0 +1,24 @@
+from outbox.log import consumer, topic_of
+from outbox.models import OutboxEvent
+from posts.models import Group, Post
+
+from .builder import mark_changed
+
+SECTION_OF_TOPIC = {
+    topic_of(Post): 'posts',
+    topic_of(Group): 'groups',
+}
+
+
+@consumer('sitemap', topics=list(SECTION_OF_TOPIC))
+def sitemap(events):
+    """Отмечает файлы карты, в которых появились, изменились или исчезли
+    адреса; архивация адрес поста не меняет."""
+    changed = {}
+    for event in events:
+        if event.action != OutboxEvent.ARCHIVED:
+            changed.setdefault(SECTION_OF_TOPIC[event.topic], set()).add(
+                event.object_id
+            )
+    for section, ids in changed.items():
+        mark_changed(section, ids)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from outbox.log import drain
+from sitemap.builder import SECTIONS, build
+
+
+class Command(BaseCommand):
+    help = ('Обновляет карту сайта: пересобирает только файлы с '
+            'изменившимися диапазонами id и дописывает новые объекты.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sections', nargs='*',
+            help=f'Разделы из {", ".join(SECTIONS)}; по умолчанию все'
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересобрать все файлы разделов'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['sections']) - set(SECTIONS)
+        if unknown:
+            raise CommandError(f'Нет разделов: {", ".join(sorted(unknown))}')
+        drain('sitemap')
+        written = build(options['sections'], options['full'])
+        for section, count in written.items():
+            self.stdout.write(f'{section}: файлов записано {count}')
+        self.stdout.write(self.style.SUCCESS('Карта сайта обновлена'))
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20, verbose_name='Раздел:')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер файла:')),
+                ('first_id', models.PositiveIntegerField(verbose_name='Первый id:')),
+                ('last_id', models.PositiveIntegerField(default=0, verbose_name='Последний записанный id:')),
+                ('is_open', models.BooleanField(default=True, verbose_name='Принимает новые id:')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Адресов в файле:')),
+                ('lastmod', models.DateTimeField(blank=True, null=True, verbose_name='Последнее изменение объектов:')),
+                ('dirty', models.BooleanField(default=True, verbose_name='Нужно пересобрать:')),
+            ],
+            options={
+                'ordering': ['section', 'number'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sitemapchunk',
+            constraint=models.UniqueConstraint(fields=('section', 'number'), name='unique_sitemap_chunk'),
+        ),
+    ]
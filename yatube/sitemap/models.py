@@ -0,0 +1,52 @@
+from django.db import models
+
+
+class SitemapChunk(models.Model):
+    """Файл карты сайта с объектами раздела из диапазона id.
+
+    Заполненный файл закрыт: его диапазон [first_id, last_id] больше не
+    меняется. Последний файл раздела открыт и забирает все новые id.
+    """
+    section = models.CharField(
+        max_length=20,
+        verbose_name='Раздел:'
+    )
+    number = models.PositiveIntegerField(
+        verbose_name='Номер файла:'
+    )
+    first_id = models.PositiveIntegerField(
+        verbose_name='Первый id:'
+    )
+    last_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Последний записанный id:'
+    )
+    is_open = models.BooleanField(
+        default=True,
+        verbose_name='Принимает новые id:'
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Адресов в файле:'
+    )
+    lastmod = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Последнее изменение объектов:'
+    )
+    dirty = models.BooleanField(
+        default=True,
+        verbose_name='Нужно пересобрать:'
+    )
+
+    class Meta:
+        ordering = ['section', 'number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['section', 'number'],
+                name='unique_sitemap_chunk'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.section}-{self.number}'
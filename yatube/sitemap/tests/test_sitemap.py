@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from outbox.log import reset
+from outbox.models import OutboxEvent
+from posts.models import ArchivedPost, Group, Post
+
+from ..builder import file_path
+from ..models import SitemapChunk
+
+User = get_user_model()
+
+SITEMAP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(SITEMAP_ROOT=SITEMAP_ROOT, SITEMAP_CHUNK_SIZE=2,
+                   SITE_URL='http://testserver')
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        Group.objects.create(title='Группа', slug='group', description='-')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.user)
+            for number in range(3)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        reset('sitemap', OutboxEvent.objects.last().id)
+
+    def build(self, *args):
+        call_command('build_sitemaps', *args, stdout=StringIO())
+
+    def read(self, name):
+        with open(file_path(name), encoding='utf-8') as source:
+            return source.read()
+
+    def test_chunks_by_id_range(self):
+        """Посты делятся на файлы по диапазонам id, в индексе — только
+        непустые файлы."""
+        ArchivedPost.objects.create(
+            id=self.posts[-1].id + 1, text='Архив', author=self.user,
+            pub_date=self.posts[0].pub_date,
+        )
+        self.build()
+        chunks = SitemapChunk.objects.filter(section='posts')
+        self.assertEqual(
+            list(chunks.values_list('count', 'is_open')),
+            [(2, False), (2, False), (0, True)],
+        )
+        first = self.read('posts-0.xml')
+        self.assertIn(
+            'http://testserver'
+            + reverse('posts:post_detail', args=[self.posts[0].id]),
+            first,
+        )
+        self.assertIn('<lastmod>', first)
+        self.assertIn(
+            reverse('posts:post_detail', args=[self.posts[-1].id + 1]),
+            self.read('posts-1.xml'),
+        )
+        index = self.read('sitemap.xml')
+        self.assertIn(reverse('sitemap:chunk', args=['posts', 1]), index)
+        self.assertNotIn(reverse('sitemap:chunk', args=['posts', 2]), index)
+        self.assertIn(reverse('posts:profile', args=['calypsol']),
+                      self.read('profiles-0.xml'))
+
+    def test_incremental(self):
+        """Новый id пересобирает только хвост, удаление — только файл со
+        своим диапазоном."""
+        self.build()
+        self.assertFalse(SitemapChunk.objects.filter(dirty=True).exists())
+        first_mtime = os.stat(file_path('posts-0.xml')).st_mtime_ns
+        Post.objects.create(text='Новый пост', author=self.user)
+        out = StringIO()
+        call_command('build_sitemaps', 'posts', stdout=out)
+        self.assertIn('posts: файлов записано 2', out.getvalue())
+        self.assertEqual(
+            os.stat(file_path('posts-0.xml')).st_mtime_ns, first_mtime
+        )
+        deleted_id = self.posts[0].id
+        Post.objects.filter(id=deleted_id).delete()
+        out = StringIO()
+        call_command('build_sitemaps', 'posts', stdout=out)
+        self.assertIn('posts: файлов записано 1', out.getvalue())
+        self.assertNotIn(
+            reverse('posts:post_detail', args=[deleted_id]),
+            self.read('posts-0.xml'),
+        )
+
+    def test_views(self):
+        """Индекс и части карты сайта отдаются, лишние — 404."""
+        self.build()
+        client = Client()
+        response = client.get(reverse('sitemap:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'<sitemapindex', b''.join(response.streaming_content))
+        response = client.get(reverse('sitemap:chunk', args=['groups', 0]))
+        self.assertIn(b'/group/group/', b''.join(response.streaming_content))
+        response = client.get(reverse('sitemap:chunk', args=['groups', 5]))
+        self.assertEqual(response.status_code, 404)
+        response = client.get(reverse('sitemap:chunk', args=['other', 0]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(os.path.exists(file_path('other-0.xml')))
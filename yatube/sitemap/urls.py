@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'sitemap'
+
+urlpatterns = [
+    path('sitemap.xml', views.index, name='index'),
+    path(
+        'sitemaps/<slug:section>-<int:number>.xml',
+        views.chunk,
+        name='chunk'
+    ),
+]
@@ -0,0 +1,19 @@
+from django.http import Http404
+
+from core.files import serve_file
+
+from .builder import INDEX_NAME, SECTIONS, file_path
+
+CACHE_CONTROL = {'public': True, 'max_age': 60 * 60}
+
+
+def index(request):
+    return serve_file(request, file_path(INDEX_NAME), CACHE_CONTROL)
+
+
+def chunk(request, section, number):
+    if section not in SECTIONS:
+        raise Http404
+    return serve_file(
+        request, file_path(f'{section}-{number}.xml'), CACHE_CONTROL
+    )
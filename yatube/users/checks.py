@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+LOCAL_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """CachedModelBackend сбрасывает пользователя из любого процесса, поэтому
+    кэш в памяти процесса оставил бы в других процессах старые права и
+    пароли."""
+    if 'users.backends.CachedModelBackend' not in (
+        settings.AUTHENTICATION_BACKENDS
+    ):
+        return []
+    if settings.CACHES['default']['BACKEND'] != LOCAL_CACHE:
+        return []
+    return [Warning(
+        'CachedModelBackend требует общего для процессов кэша.',
+        hint='Укажите адреса memcached в CACHE_LOCATION.',
+        id='users.W001',
+    )]
@@ -0,0 +1,221 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+
+from core.db import raw_delete
+from notifications.inbox import forget_unread
+from notifications.models import EmailNotification, Notification
+from outbox.log import record_many, topic_of
+from outbox.models import OutboxEvent
+from posts.api import POST_KEY, USER_KEY
+from posts.autocomplete import autocomplete
+from posts.follow_graph import follow_graph
+from posts.freshness import bump
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                          FollowSuggestion, Mention, Post, PostTag,
+                          RelatedPost, RelatedVector)
+from sitemap.builder import mark_changed
+
+from .backends import user_cache_key
+from .models import Deletion
+
+User = get_user_model()
+
+BATCH_SIZE = 200
+
+
+def forget_user(user_id):
+    cache.delete_many([user_cache_key(user_id), USER_KEY.format(user_id)])
+    autocomplete.remove_user(user_id)
+    mark_changed('profiles', [user_id])
+    bump('users', f'author:{user_id}', f'viewer:{user_id}')
+
+
+def delete_follows(user_id, batch_size):
+    rows = list(Follow.objects.filter(
+        Q(user_id=user_id) | Q(author_id=user_id)
+    ).values_list('id', 'user_id', 'author_id')[:batch_size])
+    raw_delete(Follow.objects.filter(id__in=[row[0] for row in rows]))
+    record_many(topic_of(Follow), OutboxEvent.DELETED, (
+        (follow_id, {'user_id': follower_id, 'author_id': author_id})
+        for follow_id, follower_id, author_id in rows
+    ))
+
+    def forget():
+        follow_graph.remove_many([row[1:] for row in rows])
+        bump(*{f'author:{row[column]}' for row in rows for column in (1, 2)})
+    transaction.on_commit(forget)
+    return len(rows)
+
+
+def delete_notifications(user_id, batch_size):
+    """Уведомления от пользователя, ему и о его постах и комментариях,
+    чтобы при удалении постов и самого пользователя каскад их не
+    задевал."""
+    rows = list(Notification.objects.filter(
+        Q(actor_id=user_id) | Q(recipient_id=user_id)
+        | Q(post__author_id=user_id) | Q(comment__author_id=user_id)
+        | Q(comment__post__author_id=user_id)
+    ).values_list('id', 'recipient_id')[:batch_size])
+    raw_delete(Notification.objects.filter(id__in=[row[0] for row in rows]))
+    forget_unread({row[1] for row in rows})
+    return len(rows)
+
+
+def rows_deleter(model, *conditions):
+    """Этап, удаляющий пачку строк model, подходящих под любое из условий
+    вида lookup=..., где значение — id пользователя."""
+    def delete_rows(user_id, batch_size):
+        query = Q()
+        for lookup in conditions:
+            query |= Q(**{lookup: user_id})
+        ids = list(model.objects.filter(query).values_list(
+            'pk', flat=True
+        )[:batch_size])
+        raw_delete(model.objects.filter(pk__in=ids))
+        return len(ids)
+    return delete_rows
+
+
+def comments_deleter(model, lookup):
+    def delete_comments(user_id, batch_size):
+        rows = list(model.objects.filter(**{lookup: user_id}).values_list(
+            'id', 'post_id', 'author_id'
+        )[:batch_size])
+        raw_delete(model.objects.filter(id__in=[row[0] for row in rows]))
+        if model is Comment:
+            record_many(topic_of(Comment), OutboxEvent.DELETED, (
+                (comment_id, {'post_id': post_id, 'author_id': author_id})
+                for comment_id, post_id, author_id in rows
+            ))
+        transaction.on_commit(
+            lambda: bump(*{f'post:{row[1]}' for row in rows})
+        )
+        return len(rows)
+    return delete_comments
+
+
+def forget_duplicates(user_id, batch_size):
+    """Снимает у чужих постов ссылку на удаляемые посты-оригиналы."""
+    ids = list(Post.objects.filter(duplicate_of__author_id=user_id).exclude(
+        author_id=user_id
+    ).values_list('id', flat=True)[:batch_size])
+    Post.objects.filter(id__in=ids).update(duplicate_of=None)
+    return len(ids)
+
+
+def posts_deleter(model):
+    def delete_posts(user_id, batch_size):
+        rows = list(model.objects.filter(author_id=user_id).values_list(
+            'id', 'group_id', 'image'
+        )[:batch_size])
+        raw_delete(model.objects.filter(id__in=[row[0] for row in rows]))
+        if model is Post:
+            record_many(topic_of(Post), OutboxEvent.DELETED, (
+                (post_id, {'author_id': user_id, 'group_id': group_id})
+                for post_id, group_id, _ in rows
+            ))
+
+        def forget():
+            cache.delete_many([POST_KEY.format(row[0]) for row in rows])
+            for _, _, image in rows:
+                if image:
+                    default_storage.delete(image)
+            bump(
+                'posts',
+                *(f'post:{row[0]}' for row in rows),
+                *{f'group:{row[1]}' for row in rows if row[1]},
+            )
+        transaction.on_commit(forget)
+        return len(rows)
+    return delete_posts
+
+
+# Каждая зависимая таблица удаляется своими пачками до постов и до самого
+# пользователя, чтобы их каскад не вырос в одну большую транзакцию.
+STAGES = (
+    ('follows', delete_follows),
+    ('notifications', delete_notifications),
+    ('email_notifications', rows_deleter(
+        EmailNotification, 'recipient_id'
+    )),
+    ('mentions', rows_deleter(Mention, 'user_id', 'post__author_id')),
+    ('post_comments', comments_deleter(Comment, 'post__author_id')),
+    ('comments', comments_deleter(Comment, 'author_id')),
+    ('archived_post_comments', comments_deleter(
+        ArchivedComment, 'post__author_id'
+    )),
+    ('archived_comments', comments_deleter(ArchivedComment, 'author_id')),
+    ('post_tags', rows_deleter(PostTag, 'post__author_id')),
+    ('related', rows_deleter(
+        RelatedPost, 'post__author_id', 'related__author_id'
+    )),
+    ('related_vectors', rows_deleter(RelatedVector, 'post__author_id')),
+    ('duplicates', forget_duplicates),
+    ('posts', posts_deleter(Post)),
+    ('archived_posts', posts_deleter(ArchivedPost)),
+    ('suggestions', rows_deleter(FollowSuggestion, 'user_id')),
+)
+
+
+def start_deletion(user_id, username):
+    """Заводит ход удаления с первого этапа."""
+    deletion, _ = Deletion.objects.update_or_create(user_id=user_id, defaults={
+        'username': username,
+        'stage': STAGES[0][0],
+        'deleted': json.dumps({name: 0 for name, _ in STAGES}),
+        'done': False,
+    })
+    return deletion
+
+
+def progress(user_id):
+    """Ход удаления: этап, сколько строк удалено на каждом, готово ли."""
+    deletion = Deletion.objects.filter(user_id=user_id).first()
+    return None if deletion is None else deletion.state
+
+
+def deactivate(user):
+    """Сразу выключает учётную запись: вход и страницы автора закрыты,
+    а содержимое удаляется позже пачками."""
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    user.is_active = False
+    start_deletion(user.pk, user.username)
+    transaction.on_commit(lambda: forget_user(user.pk))
+
+
+def delete_step(user_id, batch_size=BATCH_SIZE):
+    """Удаляет одну пачку строк текущего этапа в отдельной транзакции.
+
+    Ход сохраняется в той же транзакции под блокировкой строки Deletion,
+    поэтому после сбоя удаление продолжается с того же места. Возвращает
+    False, когда удалять больше нечего и сам пользователь удалён.
+    """
+    stages = dict(STAGES)
+    names = [name for name, _ in STAGES]
+    with transaction.atomic():
+        deletion = Deletion.objects.select_for_update().filter(
+            user_id=user_id
+        ).first() or start_deletion(user_id, User.objects.filter(
+            pk=user_id
+        ).values_list('username', flat=True).first() or '')
+        if deletion.done:
+            return False
+        deleted = json.loads(deletion.deleted)
+        if deletion.stage in stages:
+            count = stages[deletion.stage](user_id, batch_size)
+            deleted[deletion.stage] = deleted.get(deletion.stage, 0) + count
+            if count < batch_size:
+                index = names.index(deletion.stage) + 1
+                deletion.stage = names[index] if index < len(names) else 'user'
+        else:
+            raw_delete(User.objects.filter(pk=user_id))
+            transaction.on_commit(lambda: forget_user(user_id))
+            deletion.done = True
+        deletion.deleted = json.dumps(deleted)
+        deletion.save()
+    return not deletion.done
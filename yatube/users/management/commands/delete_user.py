@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users.deletion import deactivate, delete_step, progress
+from users.models import Deletion
+from users.tasks import schedule_deletion
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Выключает пользователя и удаляет его подписки, комментарии, '
+            'посты и файлы пачками в фоновой задаче.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--now', action='store_true',
+            help='Удалить сразу в этом процессе, а не через очередь задач'
+        )
+        parser.add_argument(
+            '--status', action='store_true',
+            help='Только показать ход уже запущенного удаления'
+        )
+
+    def report(self, user_id):
+        state = progress(user_id)
+        if state is None:
+            self.stdout.write('Удаление не запускалось')
+            return
+        deleted = ', '.join(
+            f'{name}: {count}' for name, count in state['deleted'].items()
+        )
+        stage = 'готово' if state['done'] else state['stage']
+        self.stdout.write(f'{stage} ({deleted})')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if options['status']:
+            user_id = user.pk if user else Deletion.objects.filter(
+                username=options['username']
+            ).values_list('user_id', flat=True).last()
+            if user_id is None:
+                raise CommandError('Пользователь не найден')
+            return self.report(user_id)
+        if user is None:
+            raise CommandError('Пользователь не найден')
+        deactivate(user)
+        if not options['now']:
+            schedule_deletion(user.pk)
+            self.stdout.write('Пользователь выключен, удаление поставлено '
+                              'в очередь')
+            return
+        while delete_step(user.pk):
+            self.report(user.pk)
+        self.report(user.pk)
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Deletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.PositiveIntegerField(unique=True, verbose_name='Пользователь:')),
+                ('username', models.CharField(db_index=True, max_length=150, verbose_name='Имя пользователя:')),
+                ('stage', models.CharField(max_length=30, verbose_name='Этап:')),
+                ('deleted', models.TextField(default='{}', verbose_name='Удалено строк по этапам (JSON):')),
+                ('done', models.BooleanField(default=False, verbose_name='Готово:')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлено:')),
+            ],
+        ),
+    ]
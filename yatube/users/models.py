@@ -0,0 +1,48 @@
+import json
+
+from django.db import models
+
+
+class Deletion(models.Model):
+    """Ход фонового удаления пользователя.
+
+    Хранится в базе, а не в кэше, чтобы delete_user --status видел его из
+    любого процесса; строка переживает самого пользователя.
+    """
+
+    user_id = models.PositiveIntegerField(
+        unique=True,
+        verbose_name='Пользователь:'
+    )
+    username = models.CharField(
+        max_length=150,
+        db_index=True,
+        verbose_name='Имя пользователя:'
+    )
+    stage = models.CharField(
+        max_length=30,
+        verbose_name='Этап:'
+    )
+    deleted = models.TextField(
+        default='{}',
+        verbose_name='Удалено строк по этапам (JSON):'
+    )
+    done = models.BooleanField(
+        default=False,
+        verbose_name='Готово:'
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Обновлено:'
+    )
+
+    def __str__(self):
+        return f'{self.username}: {self.stage}'
+
+    @property
+    def state(self):
+        return {
+            'stage': self.stage,
+            'deleted': json.loads(self.deleted),
+            'done': self.done,
+        }
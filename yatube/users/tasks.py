@@ -0,0 +1,25 @@
+from jobs.queue import enqueue, task
+
+from .deletion import delete_step, progress
+
+STEPS_PER_JOB = 20
+
+
+def schedule_deletion(user_id, delay=None):
+    enqueue(
+        delete_user,
+        {'user_id': user_id},
+        delay=delay,
+        dedup_key=f'users:delete:{user_id}',
+    )
+
+
+@task
+def delete_user(user_id):
+    """Удаляет содержимое пользователя пачками; после STEPS_PER_JOB пачек
+    ставит продолжение, чтобы не держать одну задачу дольше аренды."""
+    for _ in range(STEPS_PER_JOB):
+        if not delete_step(user_id):
+            return progress(user_id)
+    schedule_deletion(user_id)
+    return progress(user_id)
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from ..backends import user_cache_key
+from ..checks import LOCAL_CACHE, shared_cache_check
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_session_and_user_from_cache(self):
+        """Сессия и пользователь повторно читаются из кэша без запросов."""
+        self.authorized_client.get(reverse('about:author'))
+        with self.assertNumQueries(0):
+            response = self.authorized_client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'].pk, self.user.pk)
+
+    @override_settings(CACHES={'default': {'BACKEND': LOCAL_CACHE}})
+    def test_local_cache_warning(self):
+        """Кэш в памяти процесса отмечается предупреждением проверок."""
+        self.assertEqual(
+            [warning.id for warning in shared_cache_check(None)],
+            ['users.W001'],
+        )
+
+
+class UserInvalidationTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='calypsol')
+        self.client.force_login(self.user)
+
+    def test_password_change_invalidates_user_on_commit(self):
+        """Пользователь удаляется из кэша после фиксации транзакции, чтобы
+        параллельный запрос не вернул в кэш старую версию."""
+        self.client.get(reverse('about:author'))
+        key = user_cache_key(self.user.id)
+        with transaction.atomic():
+            user = User.objects.get(pk=self.user.pk)
+            user.set_password('new-password')
+            user.save()
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
@@ -0,0 +1,115 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from jobs.models import Job
+from jobs.queue import work
+from notifications.models import EmailNotification, Notification
+from outbox.models import OutboxEvent
+from posts.models import Comment, Follow, Post
+
+from ..deletion import delete_step, progress
+from ..tasks import delete_user
+
+User = get_user_model()
+
+
+class UserDeletionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='calypsol')
+        cls.other = User.objects.create_user(username='calyps')
+        Follow.objects.create(user=cls.user, author=cls.other)
+        Follow.objects.create(user=cls.other, author=cls.user)
+        cls.other_post = Post.objects.create(text='Чужой', author=cls.other)
+        for number in range(5):
+            post = Post.objects.create(text=f'Текст {number}', author=cls.user)
+            Comment.objects.create(post=post, author=cls.other, text='Ок')
+            Comment.objects.create(
+                post=cls.other_post, author=cls.user, text='Ок'
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_background_deletion(self):
+        """Пользователь сразу выключается, а содержимое удаляет задача."""
+        call_command('delete_user', 'calypsol', stdout=StringIO())
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        self.assertTrue(Post.objects.filter(author=self.user).exists())
+        work('test', once=True)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(list(Post.objects.all()), [self.other_post])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(
+            Job.objects.filter(task=delete_user.task_name).exists()
+        )
+        self.assertTrue(progress(self.user.pk)['done'])
+
+    def test_steps_are_small(self):
+        """Каждый шаг удаляет не больше пачки строк и отмечает ход."""
+        delete_step(self.user.pk, batch_size=2)
+        delete_step(self.user.pk, batch_size=2)
+        state = progress(self.user.pk)
+        self.assertEqual(state['deleted']['follows'], 2)
+        self.assertEqual(state['stage'], 'notifications')
+        while delete_step(self.user.pk, batch_size=2):
+            pass
+        state = progress(self.user.pk)
+        self.assertEqual(state['deleted']['posts'], 5)
+        self.assertEqual(state['deleted']['comments'], 5)
+
+    def test_dependents_deleted_before_user(self):
+        """К последнему шагу на пользователя и его посты не ссылается ни
+        одна строка, и удаление самой записи ничего не каскадирует."""
+        Notification.objects.create(
+            recipient=self.user, actor=self.other, verb=Notification.FOLLOW
+        )
+        Notification.objects.create(
+            recipient=self.other, actor=self.other, verb=Notification.POST,
+            post=Post.objects.filter(author=self.user).first(),
+        )
+        EmailNotification.objects.create(
+            recipient=self.user, kind=EmailNotification.FOLLOW, text='Ок'
+        )
+        emails = EmailNotification.objects.filter(recipient=self.user).count()
+        while progress(self.user.pk) is None or (
+            progress(self.user.pk)['stage'] != 'user'
+        ):
+            delete_step(self.user.pk, batch_size=2)
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(
+            EmailNotification.objects.filter(recipient=self.user).exists()
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Post.objects.filter(author=self.user).exists())
+        deleted = progress(self.user.pk)['deleted']
+        self.assertEqual(deleted['post_comments'], 5)
+        self.assertEqual(deleted['email_notifications'], emails)
+
+    def test_status_survives_cache(self):
+        """Ход удаления хранится в базе: --status виден после очистки кэша
+        и после удаления самого пользователя."""
+        call_command('delete_user', 'calypsol', '--now', stdout=StringIO())
+        cache.clear()
+        out = StringIO()
+        call_command('delete_user', 'calypsol', '--status', stdout=out)
+        self.assertIn('готово (follows: 2', out.getvalue())
+
+    def test_outbox_events(self):
+        """Удалённые в обход сигналов подписки, комментарии и посты
+        попадают в журнал изменений, включая чужие комментарии к постам."""
+        start = OutboxEvent.objects.last().id
+        while delete_step(self.user.pk):
+            pass
+        events = OutboxEvent.objects.filter(id__gt=start, action='deleted')
+        self.assertEqual(
+            {topic: events.filter(topic=topic).count()
+             for topic in ('posts.follow', 'posts.comment', 'posts.post')},
+            {'posts.follow': 2, 'posts.comment': 10, 'posts.post': 5},
+        )
@@ -41,7 +41,11 @@ LIMIT_POST: int = 10
 INSTALLED_APPS = [
     'about.apps.AboutConfig',
     'core.apps.CoreConfig',
+    'jobs.apps.JobsConfig',
+    'notifications.apps.NotificationsConfig',
+    'outbox.apps.OutboxConfig',
     'posts.apps.PostsConfig',
+    'sitemap.apps.SitemapConfig',
     'users.apps.UsersConfig',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -56,6 +60,7 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -81,6 +86,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.notifications.unread_notifications',
             ],
         },
     },
@@ -99,11 +105,33 @@ DATABASES = {
     }
 }
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# Кэш обязан быть общим для всех веб-процессов и воркеров: в нём лежат
+# версии для ETag, счётчики графа подписок и автодополнения, сессии и
+# пользователи, которые сбрасываются из любого процесса. В продакшене
+# укажите адреса memcached через запятую в CACHE_LOCATION; без неё кэш
+# живёт в памяти процесса, что годится только для разработки и тестов.
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': CACHE_LOCATION.split(','),
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+
+JOBS_LEASE_SECONDS = 10 * 60
+JOBS_WORKER_PROCESSES = 1
+JOBS_WORKER_THREADS = 4
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -128,6 +156,28 @@ AUTH_PASSWORD_VALIDATORS = [
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+NOTIFICATIONS_DIGEST_DELAY = 60
+NOTIFICATIONS_EMAIL_INTERVAL = 60 * 60
+
+OUTBOX_RETENTION_DAYS = 7
+# Столько ждём событие с пропущенным id, пока его транзакция не завершится.
+OUTBOX_GAP_SECONDS = 5 * 60
+
+POSTS_ARCHIVE_AFTER_DAYS = 365
+# Изменения подписок за это время сливаются в один пересчёт рекомендаций.
+SUGGESTIONS_REBUILD_DELAY = 60 * 60
+
+LIVE_POLL_INTERVAL = 1
+LIVE_HEARTBEAT = 15
+LIVE_STREAM_SECONDS = 5 * 60
+# Поток /live/ держит синхронный воркер WSGI до LIVE_STREAM_SECONDS, поэтому
+# их число на процесс ограничено; сверх него клиент получает 503.
+LIVE_MAX_STREAMS = 4
+
+# Абсолютные адреса для карты сайта, которая собирается вне запроса.
+SITE_URL = 'http://127.0.0.1:8000'
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_CHUNK_SIZE = 50000
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
@@ -147,5 +197,11 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# 'X-Accel-Redirect' для nginx или 'X-Sendfile' для Apache/lighttpd;
+# None — файлы отдаёт само приложение.
+MEDIA_SENDFILE_HEADER = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'